@@ -22,6 +22,10 @@ const nextConfig = {
       'remark-gfm',
       'rehype-slug',
     ],
+    // /api/search reads these with fs at request time - ship them with the function
+    outputFileTracingIncludes: {
+      '/api/search': ['./content/search/**/*', './content/manifest.json', './content/posts/**/*'],
+    },
   },
   
   // Compiler optimizations
@@ -0,0 +1,644 @@
+#!/usr/bin/env python3
+"""
+RetrofitAge Content Benchmark
+=============================
+generate_content.py'yi gerçek Gemini kotası harcamadan ölçer.
+
+- Lokal sahte model (FakeBackend): gecikme, token streaming, 429/kota,
+  503 aşırı yük, bozuk JSON/MDX - hepsi ayarlanabilir ve seed'li
+- Sanal saat: bekleme/cooldown/backoff --time-scale ile hızlandırılır,
+  raporlanan süreler "gerçekte ne kadar sürerdi" cinsinden
+- Senaryolar: retry (generate_with_retry), topic (generate_new_topic),
+  topics (generate_topic_batch),
+  article (generate_article), main (main() --all)
+- Rapor: makale/dk, p50/p95 gecikme, retry ve boşa giden çağrı sayısı;
+  --json ile kaydedilir, --compare ile önceki sonuçla karşılaştırılır
+
+Kullanım:
+    python scripts/benchmark_content.py --scenario all --articles 10 --json baseline.json
+    python scripts/benchmark_content.py --scenario main --compare baseline.json -- --concurrency 4
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import types
+import random
+import asyncio
+import hashlib
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+from typing import Optional, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+import generate_content as gc
+
+
+# ============================================
+# VIRTUAL CLOCK
+# ============================================
+
+class VirtualClock:
+    """scale=0.01 → 60s cooldown gerçekte 0.6s sürer; monotonic() sanal saniye döner"""
+
+    def __init__(self, scale: float):
+        self.scale = scale
+        self.real_start = time.monotonic()
+
+    def monotonic(self) -> float:
+        return self.real_start + (time.monotonic() - self.real_start) / self.scale
+
+    async def sleep(self, delay: float, *args, **kwargs):
+        return await asyncio.sleep(max(0.0, delay) * self.scale, *args, **kwargs)
+
+    async def wait_for(self, awaitable, timeout: Optional[float]):
+        return await asyncio.wait_for(awaitable, None if timeout is None else timeout * self.scale)
+
+
+class _ModuleProxy(types.ModuleType):
+    """Modülün kendisine yönlenir, sadece override edilen isimler değişir"""
+
+    def __init__(self, module, **overrides):
+        super().__init__(module.__name__)
+        self._module = module
+        self.__dict__.update(overrides)
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+
+def install_clock(clock: VirtualClock):
+    """generate_content'in time/asyncio referanslarını sanal saate bağla"""
+    gc.time = _ModuleProxy(time, monotonic=clock.monotonic)
+    gc.asyncio = _ModuleProxy(asyncio, sleep=clock.sleep, wait_for=clock.wait_for)
+
+
+def uninstall_clock():
+    gc.time = time
+    gc.asyncio = asyncio
+
+
+# ============================================
+# FAKE GEMINI BACKEND
+# ============================================
+
+FILLER = """
+grab bars anchor into wall studs and we recommend checking every mounting screw twice a year
+most families start with the bathroom because wet floors cause the majority of falls at home
+a licensed contractor typically quotes between two and five thousand dollars for this work
+lighting matters more than people expect since aging eyes need three times as much light
+we have seen clients save money by bundling several small retrofits into one project
+motion sensors can alert caregivers without cameras which keeps dignity and privacy intact
+measure door widths first because wheelchairs usually need at least thirty two inches
+non slip flooring with a high friction rating is worth the modest extra cost per square foot
+""".split()
+# İnsan üslubu: kısaltmayla başlayan, uzunluğu değişen cümleler
+HUMAN_OPENERS = ["It's", "Don't", "You'll", "We've", "That's", "There's"]
+HUMAN_SENTENCE_WORDS = (3, 5, 8, 12, 18, 26)
+# Taslak üslubu → humanize_plan'ın seçmesi beklenen mod (HUMANIZE_MODE=auto)
+#   flat: tek düze uzun cümle, kısaltma yok → full
+#   human: değişken ritim + kısaltma → skip
+#   phrases: human + birkaç paragrafta yasak ifade → paragraphs
+DRAFT_STYLES = ("flat", "human", "phrases")
+
+
+class ResourceExhausted(Exception):
+    """google.api_core.exceptions.ResourceExhausted taklidi (tip adı + status kodu)"""
+    code = 429
+
+    def __init__(self, message: str, retry_delay: Optional[float] = None):
+        super().__init__(message)
+        self.details = []
+        if retry_delay is not None:
+            seconds = int(retry_delay)
+            self.details.append(types.SimpleNamespace(retry_delay=types.SimpleNamespace(
+                seconds=seconds, nanos=int((retry_delay - seconds) * 1e9))))
+
+
+class ServiceUnavailable(Exception):
+    """google.api_core.exceptions.ServiceUnavailable taklidi"""
+    code = 503
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.usage_metadata = types.SimpleNamespace(total_token_count=gc.estimate_tokens(text))
+
+
+class FakeChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeStream:
+    """generate_content_async(stream=True) cevabı - chunk'lar token hızında gelir"""
+
+    def __init__(self, backend: "FakeBackend", text: str):
+        self.backend = backend
+        self.text = text
+        self.usage_metadata = types.SimpleNamespace(total_token_count=gc.estimate_tokens(text))
+
+    async def __aiter__(self):
+        chunk_chars = 64
+        delay = chunk_chars / 4 / self.backend.tokens_per_sec
+        for i in range(0, len(self.text), chunk_chars):
+            await self.backend.clock.sleep(delay)
+            yield FakeChunk(self.text[i:i + chunk_chars])
+
+
+class FakeModel:
+    def __init__(self, backend: "FakeBackend", api_key: str):
+        self.backend = backend
+        self.api_key = api_key
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, **kwargs):
+        return await self.backend.call(self.api_key, prompt, stream)
+
+
+class FakeModelPool(gc.ModelProvider):
+    """gc.MODEL_POOL yerine geçer (--provider fake) - create_model() sahte modeli döndürür"""
+
+    name = "fake"
+
+    def __init__(self, backend: "FakeBackend"):
+        self.backend = backend
+
+    def get(self, api_key: str, *args, **kwargs) -> FakeModel:
+        return FakeModel(self.backend, api_key)
+
+
+class FakeBackend:
+    """Ayarlanabilir hata/gecikme profiliyle lokal Gemini yerine geçen backend"""
+
+    def __init__(self, clock: VirtualClock, latency: float = 4.0, jitter: float = 1.0,
+                 tokens_per_sec: float = 400.0, p429: float = 0.0, p503: float = 0.0,
+                 p_malformed: float = 0.0, server_rpm: Optional[int] = None, seed: int = 0):
+        self.clock = clock
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_sec = tokens_per_sec
+        self.p429 = p429
+        self.p503 = p503
+        self.p_malformed = p_malformed
+        self.server_rpm = server_rpm
+        self.rng = random.Random(seed)
+        self.key_calls = {}   # api_key -> [sanal zaman]
+        self.calls = []       # {"kind", "stage", "slug", "prompt", "outcome", "latency"}
+        self.topic_counter = 0
+
+    # --- içerik ---
+
+    @staticmethod
+    def prompt_kind(prompt: str) -> str:
+        if prompt.startswith((gc.HUMANIZATION_PROMPT, gc.SECTION_HUMANIZATION_PROMPT,
+                              gc.PARAGRAPH_HUMANIZATION_PROMPT)):
+            return "humanize"
+        if "Respond in EXACT JSON" in prompt:
+            return "topic"
+        return "draft"
+
+    @staticmethod
+    def _sentence(rng: random.Random, size: int) -> str:
+        words = [rng.choice(FILLER) for _ in range(size)]
+        if rng.random() < 0.3:
+            return " ".join([rng.choice(HUMAN_OPENERS)] + words) + "."
+        return " ".join(words).capitalize() + "."
+
+    def _paragraphs(self, rng: random.Random, words: int, style: str = "flat") -> List[str]:
+        paragraphs = []
+        while words > 0:
+            size = min(words, rng.randint(60, 110))
+            if style == "flat":
+                paragraphs.append(" ".join(rng.choice(FILLER) for _ in range(size)).capitalize() + ".")
+            else:
+                sentences, left = [], size
+                while left > 0:
+                    sentences.append(self._sentence(rng, min(left, rng.choice(HUMAN_SENTENCE_WORDS))))
+                    left -= len(sentences[-1].split())
+                paragraphs.append(" ".join(sentences))
+            words -= size
+        return paragraphs
+
+    def article(self, prompt: str) -> str:
+        """Doğrulama kapısını geçen sentetik makale (prompt'taki frontmatter ile)
+
+        Üslup (DRAFT_STYLES) prompt'a göre seçilir; auto humanize'ın üç modu da çalışır.
+        """
+        rng = random.Random(hashlib.sha256(prompt.encode()).hexdigest())
+        style = rng.choice(DRAFT_STYLES)
+        paragraphs = lambda words: self._paragraphs(rng, words, style)
+        match = re.search(r'FORMAT \(include frontmatter\):\n(---\n.*?\n---)', prompt, re.DOTALL)
+        frontmatter = match.group(1).replace("[150-160 char meta description]",
+                                             "A practical aging-in-place guide with costs and steps.")
+        sections = [
+            ("Executive Summary", ["✓ " + " ".join(rng.choice(FILLER) for _ in range(12)) for _ in range(5)]),
+            ("The Problem", paragraphs(320)),
+            ("Technical Solutions", paragraphs(480)),
+            ("Cost Analysis", ["| Option | Cost |", "| --- | --- |", "| Basic | $500 |", "| Pro | $2,500 |"]
+             + paragraphs(260)),
+            ("Installation Guide", paragraphs(360)),
+        ]
+        if style == "phrases":
+            phrases = gc.load_ai_phrases()
+            for _, body in sections[1:]:
+                i = rng.choice([n for n, line in enumerate(body) if not line.startswith("|")])
+                body[i] = f"{rng.choice(phrases).capitalize()} {body[i][0].lower()}{body[i][1:]}"
+        lines = [frontmatter, "", " ".join(paragraphs(120))]
+        for title, body in sections:
+            lines += ["", f"## {title}", ""] + body
+        lines += ["", "## Frequently Asked Questions"]
+        for i in range(4):
+            lines += ["", f"### Question number {i + 1} about this retrofit?", ""] + paragraphs(70)
+        lines += ["", "## Conclusion", ""] + paragraphs(120)
+        return "\n".join(lines) + "\n"
+
+    def topic(self, prompt: str) -> str:
+        """Prompt'taki "- kategori: adet" listesine uyan JSON modu cevabı"""
+        topics = []
+        for category, count in re.findall(r'^- ([a-z-]+): (\d+)$', prompt, re.MULTILINE):
+            for _ in range(int(count)):
+                self.topic_counter += 1
+                words = self.rng.sample(FILLER, 4)
+                title = f"{' '.join(w.capitalize() for w in words)} Guide {self.topic_counter}"
+                topics.append({
+                    "title": title,
+                    "slug": re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-'),
+                    "keywords": words,
+                    "category": category,
+                    "outline": ["Intro", "Problem", "Solutions", "Costs", "FAQ"],
+                })
+        return json.dumps({"topics": topics})
+
+    def respond(self, kind: str, prompt: str) -> str:
+        if kind == "topic":
+            return self.topic(prompt)
+        if kind == "humanize":
+            return prompt.split("\n\n---\n\n", 1)[1]
+        return self.article(prompt)
+
+    def malformed(self, kind: str, text: str) -> str:
+        if kind == "topic":
+            return text[:len(text) // 2]  # yarım JSON
+        return "Sure! Here is the article you asked for:\n```mdx\n" + text  # frontmatter'sız
+
+    # --- çağrı ---
+
+    def _rate_limited(self, api_key: str, now: float) -> Optional[float]:
+        """Sunucu tarafı RPM aşıldıysa pencerenin açılmasına kalan süre"""
+        if not self.server_rpm:
+            return None
+        recent = [t for t in self.key_calls.get(api_key, []) if now - t < 60]
+        self.key_calls[api_key] = recent + [now]
+        return recent[0] + 60 - now if len(recent) >= self.server_rpm else None
+
+    async def call(self, api_key: str, prompt: str, stream: bool):
+        kind = self.prompt_kind(prompt)
+        started = self.clock.monotonic()
+        # Telemetri stage/slug etiketi + prompt özeti: aynı işi tekrar eden çağrılar ayırt edilir
+        stage, slug = gc._telemetry_stage.get()
+        record = {"kind": kind, "stage": stage, "slug": slug,
+                  "prompt": hashlib.sha256(prompt.encode()).hexdigest()[:16],
+                  "outcome": "cancelled", "latency": 0.0}
+        self.calls.append(record)
+        try:
+            roll = self.rng.random()
+            retry_delay = self._rate_limited(api_key, started)
+            if retry_delay is not None or roll < self.p429:
+                await self.clock.sleep(0.2)
+                record["outcome"] = "429"
+                raise ResourceExhausted("429 Resource has been exhausted (e.g. check quota).", retry_delay)
+            if roll < self.p429 + self.p503:
+                await self.clock.sleep(0.5)
+                record["outcome"] = "503"
+                raise ServiceUnavailable("503 The model is overloaded. Please try again later.")
+
+            text = self.respond(kind, prompt)
+            if self.rng.random() < self.p_malformed:
+                text = self.malformed(kind, text)
+                record["outcome"] = "malformed"
+            else:
+                record["outcome"] = "ok"
+
+            await self.clock.sleep(max(0.05, self.rng.gauss(self.latency, self.jitter)))
+            if stream:
+                return FakeStream(self, text)
+            await self.clock.sleep(gc.estimate_tokens(text) / self.tokens_per_sec)
+            return FakeResponse(text)
+        finally:
+            record["latency"] = self.clock.monotonic() - started
+
+
+# ============================================
+# SANDBOX
+# ============================================
+
+def synthetic_topics(count: int, seed: int) -> List[dict]:
+    rng = random.Random(seed)
+    topics = []
+    for i in range(count):
+        words = rng.sample(FILLER, 3)
+        title = f"Benchmark {' '.join(w.capitalize() for w in words)} {i}"
+        topics.append({
+            "title": title,
+            "slug": f"benchmark-{i}-{'-'.join(words)}",
+            "keywords": words,
+            "category": gc.CONTENT_CATEGORIES[i % len(gc.CONTENT_CATEGORIES)],
+            "status": "pending",
+        })
+    return topics
+
+
+@contextlib.contextmanager
+def sandbox(backend: FakeBackend, keys: int, topics: List[dict]):
+    """Tüm dosya yollarını temp dizine, modeli sahte backend'e yönlendir"""
+    saved = {name: getattr(gc, name) for name in (
+        "CONTENT_DIR", "HISTORY_FILE", "TOPICS_FILE", "CACHE_DIR", "KEY_LEDGER_FILE",
+        "CONTENT_DB_FILE", "MANIFEST_FILE", "MANIFEST_STAMPS_FILE", "SEARCH_INDEX_DIR",
+        "SIMILARITY_INDEX_FILE", "RELATED_INDEX_FILE", "RESPONSE_CACHE", "CHECKPOINT_DIR", "TELEMETRY_DIR",
+        "MODEL_POOL", "REQUEST_TIMEOUT", "STREAM_OUTPUT")}
+    saved_env = {k: v for k, v in os.environ.items() if k.startswith("GEMINI_API_KEY")}
+
+    with tempfile.TemporaryDirectory(prefix="retrofitage-bench-") as tmp:
+        tmp = Path(tmp)
+        gc.CONTENT_DIR = tmp / "content" / "posts"
+        gc.HISTORY_FILE = tmp / "content-history.json"
+        gc.TOPICS_FILE = tmp / "topics.json"
+        gc.CACHE_DIR = tmp / ".cache"
+        gc.KEY_LEDGER_FILE = gc.CACHE_DIR / "key-usage.json"
+        gc.CONTENT_DB_FILE = gc.CACHE_DIR / "content.db"
+        gc.MANIFEST_FILE = tmp / "content" / "manifest.json"
+        gc.MANIFEST_STAMPS_FILE = gc.CACHE_DIR / "manifest-stamps.json"
+        gc.SEARCH_INDEX_DIR = tmp / "content" / "search"
+        gc.SIMILARITY_INDEX_FILE = gc.CACHE_DIR / "similarity-index.json"
+        gc.RELATED_INDEX_FILE = gc.CACHE_DIR / "related-index.json"
+        gc.CHECKPOINT_DIR = gc.CACHE_DIR / "checkpoints"
+        gc.TELEMETRY_DIR = gc.CACHE_DIR / "telemetry"
+        gc.RESPONSE_CACHE = gc.ResponseCache(gc.CACHE_DIR / "responses", 0, 0, enabled=False)
+        gc.MODEL_POOL = FakeModelPool(backend)
+        gc.MODEL_PROVIDERS["fake"] = lambda: gc.MODEL_POOL
+        gc.write_json_atomic(gc.TOPICS_FILE, {"topics": topics, "future_topics": []})
+
+        for name in saved_env:
+            del os.environ[name]
+        for i in range(keys):
+            os.environ[f"GEMINI_API_KEY_{i + 1}"] = f"bench-key-{i + 1}"
+        install_clock(backend.clock)
+        try:
+            yield tmp
+        finally:
+            uninstall_clock()
+            for name in [k for k in os.environ if k.startswith("GEMINI_API_KEY")]:
+                del os.environ[name]
+            os.environ.update(saved_env)
+            for name, value in saved.items():
+                setattr(gc, name, value)
+            gc.MODEL_PROVIDERS.pop("fake", None)
+
+
+# ============================================
+# SCENARIOS
+# ============================================
+
+def minimum_calls(calls: List[dict]) -> int:
+    """Gerçekten gereken çağrı: başarılı cevap alan her (stage, slug, prompt) birimi bir kez
+
+    Sayı çağrı kayıtlarından gelir, sabitten değil: humanize atlanan (skip)
+    makalede humanize çağrısı yok, paragraphs tek çağrı, bölüm modunda bölüm
+    başına bir çağrı. Hata, bozuk çıktı ve aynı birimin tekrarı boşa sayılır.
+    """
+    return len({(c["stage"], c["slug"], c["prompt"]) for c in calls if c["outcome"] == "ok"})
+
+
+def scenario_retry(args, backend: FakeBackend) -> List[tuple]:
+    """N eşzamanlı generate_with_retry (draft prompt'u, cache'siz)"""
+    key_manager = gc.APIKeyManager()
+    prompts = [gc.generate_article_prompt(t) for t in synthetic_topics(args.articles, args.seed)]
+
+    async def one(prompt):
+        started = backend.clock.monotonic()
+        try:
+            await gc.generate_with_retry(key_manager, prompt, use_cache=False)
+            return True, backend.clock.monotonic() - started
+        except Exception:
+            return False, backend.clock.monotonic() - started
+
+    async def run():
+        return await asyncio.gather(*(one(p) for p in prompts))
+
+    return asyncio.run(run())
+
+
+def scenario_topic(args, backend: FakeBackend) -> List[tuple]:
+    """Ardışık generate_new_topic + kuyruğa ekleme"""
+    key_manager = gc.APIKeyManager()
+    store = gc.ContentStore()
+    results = []
+    try:
+        index = gc.load_similarity_index(store)
+        for i in range(args.articles):
+            category = gc.CONTENT_CATEGORIES[i % len(gc.CONTENT_CATEGORIES)]
+            started = backend.clock.monotonic()
+            try:
+                topic = gc.generate_new_topic(key_manager, store, category, use_cache=False, index=index)
+                ok = bool(topic) and gc.add_new_topic(store, index, topic)
+            except Exception:
+                ok = False
+            results.append((ok, backend.clock.monotonic() - started))
+    finally:
+        store.close()
+    return results
+
+
+def scenario_topics(args, backend: FakeBackend) -> List[tuple]:
+    """Tek generate_topic_batch ile --articles kadar konu (her konu bir iş)"""
+    key_manager = gc.APIKeyManager()
+    store = gc.ContentStore()
+    try:
+        index = gc.load_similarity_index(store)
+        started = backend.clock.monotonic()
+        try:
+            topics = gc.generate_topic_batch(key_manager, store, args.articles, use_cache=False, index=index)
+            added = sum(1 for topic in topics if gc.add_new_topic(store, index, topic))
+        except Exception:
+            added = 0
+        elapsed = backend.clock.monotonic() - started
+    finally:
+        store.close()
+    return [(i < added, elapsed) for i in range(args.articles)]
+
+
+def scenario_article(args, backend: FakeBackend) -> List[tuple]:
+    """Ardışık generate_article (draft + humanize + doğrulama)"""
+    key_manager = gc.APIKeyManager()
+    results = []
+    for topic in synthetic_topics(args.articles, args.seed):
+        started = backend.clock.monotonic()
+        try:
+            gc.generate_article(key_manager, topic, gc.new_checkpoint(topic))
+            ok = True
+        except Exception:
+            ok = False
+        results.append((ok, backend.clock.monotonic() - started))
+    return results
+
+
+def scenario_main(args, backend: FakeBackend) -> List[tuple]:
+    """main() --all --no-push --no-cache --provider fake [ek argümanlar]"""
+    argv = sys.argv
+    sys.argv = ["generate_content.py", "--all", "--no-push", "--no-cache", "--provider", "fake"] + args.main_args
+    started = backend.clock.monotonic()
+    try:
+        gc.main()
+    finally:
+        sys.argv = argv
+    elapsed = backend.clock.monotonic() - started
+    written = len(list(gc.CONTENT_DIR.glob("*.mdx")))
+    # main tek iş; makale başına ortalama süre raporlanır
+    return [(True, elapsed / max(written, 1))] * written + [(False, 0.0)] * (args.articles - written)
+
+
+SCENARIOS = {
+    "retry": scenario_retry,
+    "topic": scenario_topic,
+    "topics": scenario_topics,
+    "article": scenario_article,
+    "main": scenario_main,
+}
+
+
+# ============================================
+# REPORT
+# ============================================
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_scenario(name: str, args) -> dict:
+    clock = VirtualClock(args.time_scale)
+    backend = FakeBackend(clock, latency=args.latency, jitter=args.jitter,
+                          tokens_per_sec=args.tokens_per_sec, p429=args.p429, p503=args.p503,
+                          p_malformed=args.malformed, server_rpm=args.server_rpm, seed=args.seed)
+    topics = synthetic_topics(args.articles, args.seed) if name == "main" else []
+
+    with sandbox(backend, args.keys, topics):
+        gc.STREAM_OUTPUT = args.stream
+        if args.timeout:
+            gc.REQUEST_TIMEOUT = args.timeout
+        started = clock.monotonic()
+        log = io.StringIO()
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else log):
+            results = SCENARIOS[name](args, backend)
+        elapsed = clock.monotonic() - started
+
+    ok = [latency for success, latency in results if success]
+    calls = backend.calls
+    failed_calls = [c for c in calls if c["outcome"] != "ok"]
+    return {
+        "scenario": name,
+        "ops": len(results),
+        "ok": len(ok),
+        "elapsed": elapsed,
+        "per_min": len(ok) / elapsed * 60 if elapsed else 0.0,
+        "op_p50": percentile(ok, 50),
+        "op_p95": percentile(ok, 95),
+        "call_p50": percentile([c["latency"] for c in calls if c["outcome"] == "ok"], 50),
+        "call_p95": percentile([c["latency"] for c in calls if c["outcome"] == "ok"], 95),
+        "calls": len(calls),
+        "retries": len(failed_calls),
+        "wasted": len(calls) - minimum_calls(calls),
+        "outcomes": {o: sum(1 for c in calls if c["outcome"] == o)
+                     for o in sorted({c["outcome"] for c in calls})},
+    }
+
+
+COLUMNS = [
+    ("scenario", "senaryo", "{}"),
+    ("ok", "başarılı", "{}"),
+    ("per_min", "iş/dk", "{:.2f}"),
+    ("op_p50", "p50 s", "{:.1f}"),
+    ("op_p95", "p95 s", "{:.1f}"),
+    ("call_p50", "çağrı p50", "{:.1f}"),
+    ("call_p95", "çağrı p95", "{:.1f}"),
+    ("calls", "çağrı", "{}"),
+    ("retries", "retry", "{}"),
+    ("wasted", "boşa", "{}"),
+]
+
+
+def print_table(rows: List[dict], baseline: Optional[dict] = None):
+    header = [title for _, title, _ in COLUMNS]
+    lines = []
+    for row in rows:
+        cells = []
+        for key, _, fmt in COLUMNS:
+            cell = fmt.format(row[key])
+            base = (baseline or {}).get(row["scenario"])
+            if base and key not in ("scenario",) and isinstance(row[key], (int, float)):
+                cell += f" ({row[key] - base[key]:+.1f})"
+            cells.append(cell)
+        lines.append(cells)
+    widths = [max(len(h), *(len(line[i]) for line in lines)) for i, h in enumerate(header)]
+    print("  ".join(h.ljust(w) for h, w in zip(header, widths)))
+    print("  ".join("-" * w for w in widths))
+    for line in lines:
+        print("  ".join(c.ljust(w) for c, w in zip(line, widths)))
+    for row in rows:
+        outcomes = ", ".join(f"{k}={v}" for k, v in row["outcomes"].items())
+        print(f"   {row['scenario']}: {row['ok']}/{row['ops']} iş, {row['elapsed']:.0f}s sanal süre, {outcomes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RetrofitAge offline benchmark (fake Gemini backend)")
+    parser.add_argument("--scenario", choices=list(SCENARIOS) + ["all"], default="all")
+    parser.add_argument("--articles", type=int, default=10, help="Operations per scenario")
+    parser.add_argument("--keys", type=int, default=10, help="Number of fake API keys")
+    parser.add_argument("--latency", type=float, default=4.0, help="Mean time to first token (s)")
+    parser.add_argument("--jitter", type=float, default=1.0, help="Latency std deviation (s)")
+    parser.add_argument("--tokens-per-sec", type=float, default=400.0, help="Output token rate")
+    parser.add_argument("--p429", type=float, default=0.05, help="Probability of a 429/quota error")
+    parser.add_argument("--p503", type=float, default=0.05, help="Probability of a 503 overload error")
+    parser.add_argument("--malformed", type=float, default=0.05, help="Probability of malformed output")
+    parser.add_argument("--server-rpm", type=int, default=None, help="Server-side per-key RPM (429 above)")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-request timeout (s)")
+    parser.add_argument("--stream", action="store_true", help="Use --stream mode")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="Real seconds per simulated second")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, default=None, help="Write results to this file")
+    parser.add_argument("--compare", type=Path, default=None, help="Show deltas against a saved --json")
+    parser.add_argument("--verbose", action="store_true", help="Show generate_content output")
+    parser.add_argument("main_args", nargs="*", help="Extra generate_content.py args for the main scenario (after --)")
+    args = parser.parse_args()
+
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    print(f"⏱️ Benchmark: {', '.join(names)} | {args.articles} iş, {args.keys} key, "
+          f"gecikme {args.latency}±{args.jitter}s, 429={args.p429} 503={args.p503} bozuk={args.malformed}")
+
+    rows = []
+    for name in names:
+        rows.append(run_scenario(name, args))
+        print(f"✅ {name}: {rows[-1]['ok']}/{rows[-1]['ops']}")
+
+    baseline = None
+    if args.compare:
+        baseline = {row["scenario"]: row for row in json.loads(args.compare.read_text())["results"]}
+    print()
+    print_table(rows, baseline)
+
+    if args.json:
+        args.json.write_text(json.dumps({"args": {k: str(v) for k, v in vars(args).items()},
+                                         "results": rows}, indent=2))
+        print(f"💾 Sonuçlar: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
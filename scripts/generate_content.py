@@ -12,27 +12,41 @@ Günde 1 makale üretir, tekrarları önler, kategori rotasyonu yapar.
 
 Usage:
     python generate_content.py              # Günlük 1 makale
-    python generate_content.py --all        # Tüm bekleyenleri yaz
+    python generate_content.py --all        # Tüm bekleyenleri yaz (paralel)
+    python generate_content.py --all --concurrency 4
+    python generate_content.py --all --draft-keys 1-4 --humanize-keys 5-10
+    python generate_content.py --resume     # Yarım kalanları checkpoint'ten tamamla
+    python generate_content.py --section-humanize  # Humanize'ı H2 bölümleri halinde paralel yap
+    python generate_content.py --humanize full  # Lokal AI-üslup puanına bakmadan her zaman tam humanize
+    python generate_content.py --provider stub  # Offline kuru çalıştırma (SDK/key gerekmez, çıktı temp dizine)
+    python generate_content.py --provider stub --output /tmp/stub  # Aynı dizinden devam eden kuru çalıştırma
     python generate_content.py --new-topic  # Yeni konu öner (Gemini ile)
+    python generate_content.py --new-topics 30  # Toplu konu (kategorilere dağıtılır, ~2 çağrı)
 """
 
 import os
 import re
 import json
+import math
 import time
 import random
+import asyncio
+import heapq
+import hashlib
 import argparse
+import shutil
+import sqlite3
 import subprocess
-from datetime import datetime
+import tempfile
+import zlib
+import contextvars
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, List
-
-try:
-    import google.generativeai as genai
-except ImportError:
-    print("Installing google-generativeai...")
-    subprocess.run(["pip", "install", "google-generativeai"], check=True)
-    import google.generativeai as genai
+from typing import Callable, Optional, List, Tuple
 
 # ============================================
 # PATHS & CONFIG
@@ -45,6 +59,10 @@ SCRIPTS_DIR = Path(__file__).parent
 TOPICS_FILE = SCRIPTS_DIR / "topics.json"
 HISTORY_FILE = SCRIPTS_DIR / "content-history.json"
 
+# Çalıştırmalar arası yerel durum (git'e girmez, CI'da actions/cache ile saklanır)
+CACHE_DIR = SCRIPTS_DIR / ".cache"
+KEY_LEDGER_FILE = CACHE_DIR / "key-usage.json"
+
 # İçerik kategorileri
 CONTENT_CATEGORIES = [
     "bathroom-safety",
@@ -59,21 +77,131 @@ CONTENT_CATEGORIES = [
     "accessibility"
 ]
 
+# Aynı alanı kapsayan kategoriler: kapsama sayımında birleşir, planlamada seçilmez
+CATEGORY_ALIASES = {"finance": "finance-insurance"}
+SCHEDULE_CATEGORIES = [c for c in CONTENT_CATEGORIES if c not in CATEGORY_ALIASES]
+
 # ============================================
 # API KEY MANAGER
 # ============================================
 
+# Key başına kota (Gemini free tier, gemini-2.0-flash). Env ile değiştirilebilir.
+KEY_RPM_LIMIT = int(os.environ.get("GEMINI_RPM_LIMIT", "15"))
+KEY_TPM_LIMIT = int(os.environ.get("GEMINI_TPM_LIMIT", "1000000"))
+KEY_RPD_LIMIT = int(os.environ.get("GEMINI_RPD_LIMIT", "1500"))
+
+# 429 sonrası sunucu süre vermezse bekleme (dakikalık pencere)
+DEFAULT_COOLDOWN = 60.0
+
+# Ledger her çağrıda değil, en fazla bu aralıkla yazılır (süreç öldürülürse kayıp bu kadar)
+LEDGER_FLUSH_SECONDS = 10.0
+
+# Circuit breaker: art arda bu kadar 5xx/timeout alan key devreden çıkar
+CIRCUIT_FAILURES = int(os.environ.get("GEMINI_CIRCUIT_FAILURES", "3"))
+CIRCUIT_COOLDOWN = 30.0
+CIRCUIT_MAX_COOLDOWN = 300.0
+
+
+def _quota_day() -> str:
+    """Gemini günlük kotası Pasifik gece yarısında sıfırlanır"""
+    try:
+        from zoneinfo import ZoneInfo
+        return datetime.now(ZoneInfo("America/Los_Angeles")).strftime("%Y-%m-%d")
+    except Exception:
+        return datetime.utcnow().strftime("%Y-%m-%d")
+
+
+def quota_window() -> Tuple[datetime, datetime]:
+    """Şu anki kota gününün (başlangıç, bitiş) anı - yerel saat, naive"""
+    try:
+        from zoneinfo import ZoneInfo
+        now = datetime.now(ZoneInfo("America/Los_Angeles"))
+    except Exception:
+        now = datetime.now(timezone.utc)
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    end = start + timedelta(days=1)
+    return start.astimezone().replace(tzinfo=None), end.astimezone().replace(tzinfo=None)
+
+
+def estimate_tokens(text: str) -> int:
+    """Kaba token tahmini (~4 karakter = 1 token)"""
+    return max(1, len(text) // 4)
+
+
+class KeyState:
+    """Tek bir key'in kota durumu (key'in kendisi tutulmaz)"""
+    
+    def __init__(self, index: int, fingerprint: str):
+        self.index = index
+        self.fingerprint = fingerprint
+        self.requests = deque()          # son 60s içindeki istek zamanları
+        self.tokens = deque()            # son 60s içindeki (zaman, token)
+        self.cooldown_until = 0.0
+        self.failures = 0                # art arda 5xx/timeout
+        self.circuit_opens = 0
+        self.circuit_until = 0.0
+        self.in_flight = 0
+        self.day_requests = 0
+        self.day_tokens = 0
+    
+    def _trim(self, now: float):
+        while self.requests and now - self.requests[0] >= 60:
+            self.requests.popleft()
+        while self.tokens and now - self.tokens[0][0] >= 60:
+            self.tokens.popleft()
+    
+    def ready_at(self, now: float, est_tokens: int) -> float:
+        """Bu key'in istek kabul edebileceği en erken zaman (inf = bugün bitti)"""
+        self._trim(now)
+        if self.day_requests >= KEY_RPD_LIMIT:
+            return float("inf")
+        
+        ready = max(now, self.cooldown_until, self.circuit_until)
+        if len(self.requests) >= KEY_RPM_LIMIT:
+            ready = max(ready, self.requests[0] + 60)
+        used = sum(t for _, t in self.tokens)
+        if used + est_tokens > KEY_TPM_LIMIT and self.tokens:
+            ready = max(ready, self.tokens[0][0] + 60)
+        return ready
+    
+    def score(self, now: float) -> tuple:
+        """Düşük skor = başarı ihtimali yüksek"""
+        rpm_load = len(self.requests) / KEY_RPM_LIMIT
+        day_load = self.day_requests / KEY_RPD_LIMIT
+        return (self.in_flight, rpm_load, day_load)
+
+
+class QuotaExhaustedError(Exception):
+    """Tüm key'lerin (ya da seçilen havuzun) günlük kotası doldu - kota gününe kadar dur"""
+
+
 class APIKeyManager:
-    """10 Gemini API key rotation sistemi"""
+    """10 Gemini API key - kota farkında scheduler
     
-    def __init__(self):
-        self.keys = self._load_keys()
-        self.current_index = 0
-        self.exhausted_keys = set()
+    - Her key için RPM/TPM/RPD bütçesi ve cooldown süresi tutulur
+    - Her çağrı o an en boş, cooldown'da olmayan key'e gider
+    - Hiç uygun key yoksa tam olarak gereken süre kadar beklenir
+    - Günlük kullanım KEY_LEDGER_FILE'a yazılır, sonraki çalıştırma kalan kotayı bilir
+      (en fazla LEDGER_FLUSH_SECONDS'ta bir; çıkışta save_ledger() ile flush)
+    - Art arda CIRCUIT_FAILURES kez 5xx/timeout alan key'in devresi açılır
+      (her açılışta süre ikiye katlanır), ilk başarıda kapanır
+    """
+    
+    def __init__(self, ledger_file: Optional[Path] = None, keys: Optional[List[str]] = None):
+        self.keys = keys or self._load_keys()
         
         if not self.keys:
             raise ValueError("❌ API key bulunamadı! GEMINI_API_KEY_1 ... _10 ayarla")
         
+        self.states = [
+            KeyState(i, hashlib.sha256(k.encode()).hexdigest()[:12])
+            for i, k in enumerate(self.keys)
+        ]
+        self.ledger_file = ledger_file or KEY_LEDGER_FILE
+        self.day = _quota_day()
+        self._ledger_saved = 0.0
+        self._load_ledger()
+        
         print(f"🔑 {len(self.keys)} API key yüklendi")
     
     def _load_keys(self) -> List[str]:
@@ -91,32 +219,304 @@ class APIKeyManager:
         
         return keys
     
-    def get_key(self) -> str:
-        """Kullanılabilir key al"""
-        if len(self.exhausted_keys) >= len(self.keys):
-            print("⚠️ Tüm keyler exhausted, sıfırlanıyor...")
-            self.exhausted_keys.clear()
+    # --- Günlük ledger ---
+    
+    def _load_ledger(self):
+        if not self.ledger_file.exists():
+            return
+        try:
+            ledger = json.loads(self.ledger_file.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError):
+            return
+        if ledger.get("day") != self.day:
+            return
         
-        available = [k for i, k in enumerate(self.keys) if i not in self.exhausted_keys]
-        if not available:
-            raise Exception("❌ Kullanılabilir API key yok!")
+        usage = ledger.get("keys", {})
+        for state in self.states:
+            entry = usage.get(state.fingerprint, {})
+            state.day_requests = entry.get("requests", 0)
+            state.day_tokens = entry.get("tokens", 0)
+    
+    def save_ledger(self, throttle: bool = False):
+        """Günlük kullanım defterini kaydet (key değil, parmak izi yazılır)
+        
+        throttle=True: son yazmadan LEDGER_FLUSH_SECONDS geçmediyse atla.
+        """
+        if throttle and time.monotonic() - self._ledger_saved < LEDGER_FLUSH_SECONDS:
+            return
+        self._ledger_saved = time.monotonic()
+        ledger = {
+            "day": self.day,
+            "keys": {
+                s.fingerprint: {"requests": s.day_requests, "tokens": s.day_tokens}
+                for s in self.states
+            },
+        }
+        self.ledger_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.ledger_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(ledger, indent=2), encoding='utf-8')
+        os.replace(tmp, self.ledger_file)
+    
+    def _roll_day(self):
+        day = _quota_day()
+        if day != self.day:
+            self.day = day
+            for state in self.states:
+                state.day_requests = 0
+                state.day_tokens = 0
+    
+    # --- Scheduling ---
+    
+    def _pick(self, est_tokens: int, pool: Optional[List[int]] = None) -> tuple:
+        """(en iyi state, hazır olma zamanı) - pool verilirse sadece o key indeksleri"""
+        self._roll_day()
+        now = time.monotonic()
+        best = None
+        best_ready = float("inf")
+        states = [self.states[i] for i in pool] if pool else self.states
+        for state in states:
+            ready = state.ready_at(now, est_tokens)
+            if best is None or (ready, state.score(now)) < (best_ready, best.score(now)):
+                best, best_ready = state, ready
+        return best, best_ready
+    
+    def remaining_today(self) -> int:
+        """Tüm keylerde bugün kalan istek sayısı"""
+        self._roll_day()
+        return sum(max(0, KEY_RPD_LIMIT - s.day_requests) for s in self.states)
+    
+    async def acquire(self, est_tokens: int = 0, pool: Optional[List[int]] = None,
+                      deadline: Optional[float] = None) -> str:
+        """En uygun key'i al; hiçbiri hazır değilse gerektiği kadar bekle
         
-        key = random.choice(available)
-        return key
+        deadline (monotonic) verilirse ve hiçbir key o zamana kadar hazır
+        olmayacaksa beklemeden RetryDeadlineError. Günlük kota bittiyse
+        QuotaExhaustedError.
+        """
+        while True:
+            state, ready = self._pick(est_tokens, pool)
+            if ready == float("inf"):
+                raise QuotaExhaustedError("❌ Tüm key'lerin günlük kotası doldu!")
+            if deadline is not None and ready > deadline:
+                raise RetryDeadlineError(
+                    f"❌ Deadline'a kadar hazır key yok ({ready - time.monotonic():.0f}s sonra)")
+            
+            wait = ready - time.monotonic()
+            if wait <= 0:
+                now = time.monotonic()
+                state.requests.append(now)
+                state.tokens.append((now, est_tokens))
+                state.in_flight += 1
+                state.day_requests += 1
+                return self.keys[state.index]
+            
+            await asyncio.sleep(wait)
+    
+    def release(self, key: str, tokens_used: Optional[int] = None, reserved: int = 0):
+        """Çağrı bitti - tahmini token rezervasyonunu gerçek kullanımla düzelt"""
+        state = self._state(key)
+        if state is None:
+            return
+        state.in_flight = max(0, state.in_flight - 1)
+        if tokens_used:
+            state.day_tokens += tokens_used
+            state.tokens.append((time.monotonic(), tokens_used - reserved))
+        self.save_ledger(throttle=True)
+    
+    def get_key(self) -> str:
+        """Beklemeden en uygun key'i döndür (senkron kullanım için)"""
+        state, _ = self._pick(0)
+        return self.keys[state.index]
+    
+    def mark_exhausted(self, key: str, retry_after: Optional[float] = None):
+        """429 alan key'i cooldown'a al (sunucunun verdiği süre ya da 60s)"""
+        state = self._state(key)
+        if state is None:
+            return
+        wait = retry_after if retry_after is not None else DEFAULT_COOLDOWN
+        state.cooldown_until = max(state.cooldown_until, time.monotonic() + wait)
+        print(f"⚠️ Key #{state.index + 1} exhausted, {wait:.0f}s cooldown")
+    
+    def mark_day_exhausted(self, key: str):
+        """Günlük kotası biten key bugün bir daha seçilmesin"""
+        state = self._state(key)
+        if state is None:
+            return
+        state.day_requests = max(state.day_requests, KEY_RPD_LIMIT)
+        self.save_ledger()
+        print(f"⚠️ Key #{state.index + 1} günlük kotası doldu")
+    
+    def record_success(self, key: str):
+        state = self._state(key)
+        if state is not None:
+            state.failures = 0
+            state.circuit_opens = 0
+    
+    def record_failure(self, key: str):
+        """5xx/timeout say; eşik aşılınca devreyi aç (yarı açıkta tek hata yeniden açar)"""
+        state = self._state(key)
+        if state is None:
+            return
+        state.failures += 1
+        if state.failures < CIRCUIT_FAILURES or time.monotonic() < state.circuit_until:
+            return  # eşik altında ya da devre zaten açık (aynı anda uçuşan istekler)
+        wait = min(CIRCUIT_COOLDOWN * 2 ** state.circuit_opens, CIRCUIT_MAX_COOLDOWN)
+        state.circuit_opens += 1
+        state.circuit_until = time.monotonic() + wait
+        print(f"⚡ Key #{state.index + 1}: {state.failures} ardışık hata, devre {wait:.0f}s açık")
     
-    def mark_exhausted(self, key: str):
+    def parse_pool(self, spec: Optional[str]) -> Optional[List[int]]:
+        """"1,2,5-7" (GEMINI_API_KEY_N numaraları) → 0 tabanlı yüklü key indeksleri"""
+        if not spec:
+            return None
+        pool = set()
+        for part in spec.split(","):
+            part = part.strip()
+            if "-" in part:
+                lo, hi = part.split("-", 1)
+                pool.update(range(int(lo), int(hi) + 1))
+            elif part:
+                pool.add(int(part))
+        indices = sorted(n - 1 for n in pool if 1 <= n <= len(self.keys))
+        if not indices:
+            raise ValueError(f"❌ Key havuzu boş: {spec}")
+        return indices
+    
+    def _state(self, key: str) -> Optional[KeyState]:
         try:
-            idx = self.keys.index(key)
-            self.exhausted_keys.add(idx)
-            print(f"⚠️ Key #{idx + 1} exhausted")
-        except:
-            pass
+            return self.states[self.keys.index(key)]
+        except ValueError:
+            return None
+
+
+# ============================================
+# RETRY POLICY
+# ============================================
+
+# Hata sınıfları (SDK exception tipi / HTTP status kodu ile belirlenir)
+RATE_LIMITED = "rate_limited"
+OVERLOADED = "overloaded"
+TIMEOUT = "timeout"
+FATAL = "fatal"
+
+RATE_LIMIT_ERRORS = ("ResourceExhausted", "TooManyRequests")
+OVERLOAD_ERRORS = ("ServiceUnavailable", "InternalServerError", "BadGateway", "ServerError")
+TIMEOUT_ERRORS = ("DeadlineExceeded", "GatewayTimeout")
+
+# "Please retry in 34.5s", "retry_delay { seconds: 34 }", "retryDelay": "34s"
+RETRY_DELAY_RE = re.compile(r'retry[ _-]?(?:in|after|delay)\D{0,20}?(\d+(?:\.\d+)?)', re.IGNORECASE)
+
+
+class RetryDeadlineError(Exception):
+    """İstek veya run deadline'ı doldu - daha fazla beklemenin anlamı yok"""
+
+
+class RetryPolicy:
+    """Gemini çağrıları için yeniden deneme politikası
+    
+    - Hatalar metin eşleştirmesiyle değil, google.api_core exception tipi ve
+      status kodu ile sınıflanır (429 → rate_limited, 5xx → overloaded, 504 → timeout)
+    - Sunucunun verdiği retry süresi (RetryInfo, Retry-After) aynen kullanılır
+    - Vermezse full jitter: uniform(0, min(max_delay, base_delay * 2^deneme))
+    - İstek başına (request_deadline) ve run başına (start_run) üst süre;
+      bekleme deadline'ı aşacaksa uyumadan RetryDeadlineError
+    """
+    
+    def __init__(self, max_attempts: int = 15, base_delay: float = 1.0, max_delay: float = 32.0,
+                 request_deadline: Optional[float] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.request_deadline = request_deadline
+        self.run_deadline = None
+    
+    def start_run(self, seconds: Optional[float]):
+        """Run deadline'ını şimdiden itibaren başlat (None = sınırsız)"""
+        self.run_deadline = time.monotonic() + seconds if seconds else None
+    
+    def deadline(self) -> Optional[float]:
+        """Yeni bir istek için geçerli deadline (monotonic)"""
+        deadlines = [self.run_deadline] if self.run_deadline is not None else []
+        if self.request_deadline:
+            deadlines.append(time.monotonic() + self.request_deadline)
+        return min(deadlines) if deadlines else None
+    
+    @staticmethod
+    def status_code(exc: BaseException) -> Optional[int]:
+        for attr in ("code", "status_code"):
+            code = getattr(exc, attr, None)
+            if isinstance(code, int):
+                return code
+        return None
+    
+    def classify(self, exc: BaseException) -> str:
+        if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+            return TIMEOUT
+        names = {cls.__name__ for cls in type(exc).__mro__}
+        code = self.status_code(exc)
+        if code == 429 or names & set(RATE_LIMIT_ERRORS):
+            return RATE_LIMITED
+        if code == 504 or names & set(TIMEOUT_ERRORS):
+            return TIMEOUT
+        if (code is not None and code >= 500) or names & set(OVERLOAD_ERRORS):
+            return OVERLOADED
+        if isinstance(exc, ConnectionError):
+            return OVERLOADED
+        return FATAL
+    
+    @staticmethod
+    def retry_after(exc: BaseException) -> Optional[float]:
+        """Sunucunun önerdiği bekleme süresi (saniye) - yoksa None"""
+        details = getattr(exc, "details", None)
+        for detail in (details if isinstance(details, (list, tuple)) else []):
+            delay = getattr(detail, "retry_delay", None)  # google.rpc.RetryInfo
+            if delay is not None:
+                return delay.seconds + delay.nanos / 1e9
+            if isinstance(detail, dict) and "retryDelay" in detail:
+                try:
+                    return float(str(detail["retryDelay"]).rstrip("s"))
+                except ValueError:
+                    pass
+        
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+        if headers is not None:
+            try:
+                return float(headers.get("Retry-After"))
+            except (TypeError, ValueError):
+                pass
+        
+        match = RETRY_DELAY_RE.search(str(exc))
+        return float(match.group(1)) if match else None
+    
+    @staticmethod
+    def daily_quota(exc: BaseException) -> bool:
+        """429'un sebebi günlük kota mı (QuotaFailure: ...PerDay...)"""
+        return "PerDay" in str(exc)
+    
+    def backoff(self, attempt: int) -> float:
+        """Full jitter - aynı anda düşen worker'lar aynı anda geri gelmesin"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+    
+    def check(self, deadline: Optional[float], wait: float = 0.0):
+        """wait kadar bekledikten sonra deadline aşılacaksa hemen vazgeç"""
+        if deadline is not None and time.monotonic() + wait > deadline:
+            raise RetryDeadlineError(f"❌ Deadline aşılacak ({wait:.0f}s bekleme gerekiyordu)")
+
+
+RETRY_POLICY = RetryPolicy(
+    max_attempts=int(os.environ.get("GEMINI_MAX_ATTEMPTS", "15")),
+    max_delay=float(os.environ.get("GEMINI_MAX_BACKOFF", "32")),
+    request_deadline=float(os.environ.get("GEMINI_REQUEST_DEADLINE", "900")) or None,
+)
 
 
 # ============================================
 # CONTENT HISTORY MANAGER
 # ============================================
 
+CONTENT_DB_FILE = CACHE_DIR / "content.db"
+
+
 def scan_existing_posts() -> List[str]:
     """Mevcut .mdx dosyalarının slug'larını tara"""
     existing_slugs = []
@@ -127,195 +527,2100 @@ def scan_existing_posts() -> List[str]:
     return existing_slugs
 
 
-def load_history() -> dict:
-    """İçerik geçmişini yükle"""
-    if HISTORY_FILE.exists():
-        with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-            history = json.load(f)
-            # Mevcut dosyaları da kontrol et
-            existing = scan_existing_posts()
-            for slug in existing:
-                if slug not in history.get("publishedSlugs", []):
-                    history["publishedSlugs"].append(slug)
-            return history
-    
-    # Yeni oluştur - mevcut dosyaları tara
-    existing_slugs = scan_existing_posts()
-    history = {
-        "publishedSlugs": existing_slugs,
-        "publishedTitles": [],
-        "publishedKeywords": [],
-        "lastCategory": None,
-        "totalPosts": len(existing_slugs),
-        "lastPublishDate": None,
-        "categoryRotation": 0
-    }
-    save_history(history)
-    return history
+FRONTMATTER_RE = re.compile(r'^\s*---\s*\n(.*?)\n---\s*(?:\n|$)', re.DOTALL)
+
+
+def read_frontmatter(text: str) -> dict:
+    """MDX başındaki basit YAML frontmatter'ı oku (key: value ve [liste])"""
+    match = FRONTMATTER_RE.match(text)
+    if not match:
+        return {}
+    
+    data = {}
+    for line in match.group(1).split('\n'):
+        field = re.match(r'^(\w+):\s*(.*)$', line)
+        if not field:
+            continue
+        key, value = field.group(1), field.group(2).strip()
+        if value.startswith('['):
+            try:
+                data[key] = json.loads(value)
+                continue
+            except json.JSONDecodeError:
+                pass
+        if value in ('true', 'false'):
+            data[key] = value == 'true'
+        else:
+            data[key] = value.strip('"').strip("'")
+    return data
+
+
+def write_json_atomic(path: Path, data: dict, compact: bool = False):
+    """Temp dosyaya yaz, fsync, os.replace - yarım yazılmış JSON kalmaz"""
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+        else:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_json_file(path: Path, default: dict) -> dict:
+    if not path.exists():
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
 
-def save_history(history: dict):
-    """Geçmişi kaydet"""
-    with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-        json.dump(history, f, indent=2, ensure_ascii=False)
+class ContentStore:
+    """History + topic store (SQLite)
+    
+    - slug / başlık / keyword / kategori için indeksli sorgular
+    - Her yayın tek bir transaction: yarım güncelleme kalmaz
+    - content-history.json ve topics.json git'teki kaynak; açılışta değişmişlerse
+      import edilir, flush() ile atomik olarak geri yazılır
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS published (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            slug TEXT NOT NULL UNIQUE,
+            category TEXT,
+            published_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS published_category ON published(category);
+        CREATE TABLE IF NOT EXISTS titles (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            title_norm TEXT NOT NULL UNIQUE,
+            slug TEXT
+        );
+        CREATE TABLE IF NOT EXISTS keywords (
+            keyword TEXT NOT NULL,
+            slug TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (keyword, slug)
+        );
+        CREATE TABLE IF NOT EXISTS topics (
+            slug TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            status TEXT,
+            category TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS topics_position ON topics(position);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+    
+    def __init__(self, db_path: Optional[Path] = None, history_file: Optional[Path] = None,
+                 topics_file: Optional[Path] = None, content_dir: Optional[Path] = None):
+        self.db_path = db_path or CONTENT_DB_FILE
+        self.history_file = history_file or HISTORY_FILE
+        self.topics_file = topics_file or TOPICS_FILE
+        self.content_dir = content_dir or CONTENT_DIR
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(self.SCHEMA)
+        
+        if self._json_hash() != self.get_meta("jsonHash"):
+            self.import_json()
+        self.sync_posts()
+    
+    def close(self):
+        self.flush()
+        self.conn.close()
+    
+    # --- meta ---
+    
+    def get_meta(self, key: str, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+    
+    def _set_meta(self, key: str, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                          (key, json.dumps(value, ensure_ascii=False)))
+    
+    @property
+    def total_posts(self) -> int:
+        return self.get_meta("totalPosts", 0)
+    
+    @property
+    def category_rotation(self) -> int:
+        return self.get_meta("categoryRotation", 0)
+    
+    @property
+    def last_publish_date(self) -> Optional[str]:
+        return self.get_meta("lastPublishDate")
+    
+    # --- lookups ---
+    
+    def is_published(self, slug: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM published WHERE slug = ?", (slug,)).fetchone() is not None
+    
+    def has_title(self, title: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM titles WHERE title_norm = ?",
+                                 (title.strip().lower(),)).fetchone() is not None
+    
+    def slugs_for_keyword(self, keyword: str) -> List[str]:
+        rows = self.conn.execute("SELECT slug FROM keywords WHERE keyword = ? AND slug != ''",
+                                 (keyword.strip().lower(),))
+        return [r[0] for r in rows]
+    
+    def slugs_in_category(self, category: str) -> List[str]:
+        rows = self.conn.execute("SELECT slug FROM published WHERE category = ? ORDER BY seq", (category,))
+        return [r[0] for r in rows]
+    
+    def published_slugs(self) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT slug FROM published ORDER BY seq")]
+    
+    def published_between(self, start: datetime, end: datetime) -> int:
+        """[start, end) aralığında yayınlanan post sayısı (published_at yerel ISO)"""
+        row = self.conn.execute("SELECT COUNT(*) FROM published WHERE published_at >= ? AND published_at < ?",
+                                (start.isoformat(), end.isoformat())).fetchone()
+        return row[0]
+    
+    def published_categories(self) -> List[tuple]:
+        """[(slug, kategori)] yayın sırasıyla"""
+        return self.conn.execute("SELECT slug, category FROM published ORDER BY seq").fetchall()
+    
+    def keyword_rows(self) -> List[tuple]:
+        """[(keyword, slug)] - slug'ı eşlenemeyenlerde ''"""
+        return self.conn.execute("SELECT keyword, slug FROM keywords ORDER BY rowid").fetchall()
+    
+    def recent_titles(self, limit: int) -> List[str]:
+        rows = self.conn.execute("SELECT title FROM titles ORDER BY seq DESC LIMIT ?", (limit,))
+        return [r[0] for r in rows][::-1]
+    
+    def recent_keywords(self, limit: Optional[int] = None) -> List[str]:
+        """Tekrarsız keyword'ler, en yeniler sonda"""
+        rows = self.conn.execute(
+            "SELECT keyword FROM keywords GROUP BY keyword ORDER BY MIN(rowid) DESC LIMIT ?",
+            (limit if limit is not None else -1,))
+        return [r[0] for r in rows][::-1]
+    
+    # --- topics ---
+    
+    def get_topic(self, slug: str) -> Optional[dict]:
+        row = self.conn.execute("SELECT data FROM topics WHERE slug = ?", (slug,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def has_topic(self, slug: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM topics WHERE slug = ?", (slug,)).fetchone() is not None
+    
+    def pending_topics(self) -> List[dict]:
+        """Yazılmamış konular (topics.json sırasıyla)"""
+        rows = self.conn.execute("""
+            SELECT t.data FROM topics t
+            WHERE (t.status IS NULL OR t.status NOT IN ('published', 'failed'))
+              AND NOT EXISTS (SELECT 1 FROM published p WHERE p.slug = t.slug)
+            ORDER BY t.position
+        """)
+        return [json.loads(r[0]) for r in rows]
+    
+    def _put_topic(self, topic: dict, position: Optional[int] = None):
+        if position is None:
+            row = self.conn.execute("SELECT position FROM topics WHERE slug = ?", (topic["slug"],)).fetchone()
+            if row:
+                position = row[0]
+            else:
+                row = self.conn.execute("SELECT MAX(position) FROM topics").fetchone()
+                position = (row[0] if row[0] is not None else -1) + 1
+        self.conn.execute(
+            "INSERT OR REPLACE INTO topics (slug, position, status, category, data) VALUES (?, ?, ?, ?, ?)",
+            (topic["slug"], position, topic.get("status"), topic.get("category"),
+             json.dumps(topic, ensure_ascii=False)))
+    
+    def mark_topic_failed(self, slug: str):
+        """Konu kuyruktan düşer (status=failed); topics.json'da "pending" yapılınca geri döner"""
+        topic = self.get_topic(slug)
+        if topic is None:
+            return
+        topic["status"] = "failed"
+        with self.conn:
+            self._put_topic(topic)
+            self._set_meta("dirty", True)
+    
+    def add_topic(self, topic: dict) -> bool:
+        """Yeni konu ekle; slug zaten varsa (veya yayınlandıysa) dokunma"""
+        if self.has_topic(topic["slug"]) or self.is_published(topic["slug"]):
+            return False
+        with self.conn:
+            self._put_topic(topic)
+            self._set_meta("dirty", True)
+        return True
+    
+    # --- writes ---
+    
+    def _insert_post(self, slug: str, category: Optional[str], published_at: Optional[str]):
+        self.conn.execute(
+            "INSERT OR IGNORE INTO published (slug, category, published_at) VALUES (?, ?, ?)",
+            (slug, category, published_at))
+    
+    def _insert_title(self, title: str, slug: Optional[str] = None):
+        self.conn.execute("INSERT OR IGNORE INTO titles (title, title_norm, slug) VALUES (?, ?, ?)",
+                          (title, title.strip().lower(), slug))
+    
+    def _insert_keywords(self, keywords: List[str], slug: str = ''):
+        for keyword in keywords:
+            self.conn.execute("INSERT OR IGNORE INTO keywords (keyword, slug) VALUES (?, ?)",
+                              (keyword.strip().lower(), slug))
+    
+    def record_published(self, topic: dict):
+        """Yayını tek transaction'da işle (history + topic status)"""
+        now = datetime.now().isoformat()
+        with self.conn:
+            self._insert_post(topic["slug"], topic.get("category"), now)
+            if topic.get("title"):
+                self._insert_title(topic["title"], topic["slug"])
+            self._insert_keywords(topic.get("keywords", []), topic["slug"])
+            stored = self.get_topic(topic["slug"]) or dict(topic)
+            stored["status"] = "published"
+            stored["publishedAt"] = now
+            self._put_topic(stored)
+            
+            self._set_meta("lastCategory", topic.get("category"))
+            self._set_meta("totalPosts", self.total_posts + 1)
+            self._set_meta("lastPublishDate", now)
+            self._set_meta("categoryRotation", self.category_rotation + 1)
+            self._set_meta("dirty", True)
+    
+    def _post_frontmatter(self, slug: str) -> dict:
+        path = self.content_dir / f"{slug}.mdx"
+        if not path.exists():
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return read_frontmatter(f.read(4096))
+    
+    def sync_posts(self) -> int:
+        """content/posts'ta olup geçmişte olmayan dosyaları ekle (slug PK lookup)
+        
+        Başlık ve tag'ler frontmatter'dan: elle eklenen post'un konusu da tekrar üretilmez.
+        """
+        if not self.content_dir.exists():
+            return 0
+        added = 0
+        with self.conn:
+            for path in self.content_dir.glob("*.mdx"):
+                if self.is_published(path.stem):
+                    continue
+                meta = self._post_frontmatter(path.stem)
+                self._insert_post(path.stem, meta.get("category"), meta.get("date"))
+                if meta.get("title"):
+                    self._insert_title(meta["title"], path.stem)
+                self._insert_keywords(meta.get("tags") or [], path.stem)
+                added += 1
+            if added:
+                self._set_meta("dirty", True)
+        return added
+    
+    # --- JSON import / export ---
+    
+    def _json_hash(self) -> str:
+        digest = hashlib.sha256()
+        for path in (self.history_file, self.topics_file):
+            digest.update(path.read_bytes() if path.exists() else b"")
+        return digest.hexdigest()
+    
+    def import_json(self):
+        """JSON dosyalarından store'u yeniden kur (başlık/kategori frontmatter'dan eşlenir)"""
+        history = load_json_file(self.history_file, {})
+        topics_data = load_json_file(self.topics_file, {"topics": [], "future_topics": []})
+        topics_by_slug = {t.get("slug"): t for t in topics_data.get("topics", []) if t.get("slug")}
+        
+        with self.conn:
+            for table in ("published", "titles", "keywords", "topics", "meta"):
+                self.conn.execute(f"DELETE FROM {table}")
+            
+            title_slugs = {}
+            keyword_slugs = {}
+            for slug in history.get("publishedSlugs", []):
+                meta = self._post_frontmatter(slug)
+                topic = topics_by_slug.get(slug, {})
+                self._insert_post(slug, meta.get("category") or topic.get("category"),
+                                  topic.get("publishedAt") or meta.get("date"))
+                for keyword in topic.get("keywords") or meta.get("tags") or []:
+                    keyword_slugs.setdefault(keyword.strip().lower(), slug)
+                title = meta.get("title") or topic.get("title")
+                if title:
+                    title_slugs[title.strip().lower()] = slug
+            
+            # Sıra history'deki gibi kalır; eşlenemeyen başlık/keyword'ler de korunur
+            for title in history.get("publishedTitles", []):
+                self._insert_title(title, title_slugs.get(title.strip().lower()))
+            # Tekrarlanan keyword tek satır: ikinci kopya slug'sız (yetim) sayılmasın
+            seen = set()
+            for keyword in history.get("publishedKeywords", []):
+                keyword = keyword.strip().lower()
+                if keyword not in seen:
+                    seen.add(keyword)
+                    self._insert_keywords([keyword], keyword_slugs.get(keyword, ''))
+            for keyword, slug in keyword_slugs.items():
+                if keyword not in seen:
+                    self._insert_keywords([keyword], slug)
+            
+            for position, topic in enumerate(topics_data.get("topics", [])):
+                if topic.get("slug"):
+                    self._put_topic(topic, position)
+            
+            self._set_meta("futureTopics", topics_data.get("future_topics", []))
+            self._set_meta("lastCategory", history.get("lastCategory"))
+            self._set_meta("totalPosts", history.get("totalPosts", 0))
+            self._set_meta("lastPublishDate", history.get("lastPublishDate"))
+            self._set_meta("categoryRotation", history.get("categoryRotation", 0))
+            self._set_meta("jsonHash", self._json_hash())
+            self._set_meta("dirty", False)
+    
+    def export_history(self) -> dict:
+        return {
+            "publishedSlugs": self.published_slugs(),
+            "publishedTitles": [r[0] for r in self.conn.execute("SELECT title FROM titles ORDER BY seq")],
+            "publishedKeywords": self.recent_keywords(),
+            "lastCategory": self.get_meta("lastCategory"),
+            "totalPosts": self.total_posts,
+            "lastPublishDate": self.last_publish_date,
+            "categoryRotation": self.category_rotation,
+        }
+    
+    def export_topics(self) -> dict:
+        rows = self.conn.execute("SELECT data FROM topics ORDER BY position")
+        return {
+            "topics": [json.loads(r[0]) for r in rows],
+            "future_topics": self.get_meta("futureTopics", []),
+        }
+    
+    def export_json(self):
+        """Store'u JSON dosyalarına atomik olarak yaz"""
+        write_json_atomic(self.history_file, self.export_history())
+        write_json_atomic(self.topics_file, self.export_topics())
+        with self.conn:
+            self._set_meta("jsonHash", self._json_hash())
+            self._set_meta("dirty", False)
+    
+    def flush(self):
+        """Yazılmamış değişiklik varsa JSON'a aktar"""
+        if self.get_meta("dirty", False):
+            self.export_json()
+    
+    def snapshot(self) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """Geri alma noktası: flush edilmiş history/topics JSON'unun byte'ları"""
+        self.flush()
+        return tuple(path.read_bytes() if path.exists() else None
+                     for path in (self.history_file, self.topics_file))
+    
+    def restore(self, snapshot: Tuple[Optional[bytes], Optional[bytes]]):
+        """snapshot() anına dön: JSON byte byte geri yazılır, store ondan yeniden kurulur"""
+        for path, data in zip((self.history_file, self.topics_file), snapshot):
+            if data is None:
+                path.unlink(missing_ok=True)
+                continue
+            tmp = path.with_name(f".{path.name}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        self.import_json()
 
 
-def already_posted_today(history: dict) -> bool:
+def already_posted_today(store: ContentStore) -> bool:
     """Bugün zaten post atıldı mı?"""
-    if not history.get("lastPublishDate"):
+    if not store.last_publish_date:
         return False
     
     today = datetime.now().strftime("%Y-%m-%d")
-    last = history["lastPublishDate"].split("T")[0]
+    last = store.last_publish_date.split("T")[0]
     
     return today == last
 
 
-def get_next_category(history: dict) -> str:
-    """Rotasyon ile sıradaki kategori"""
-    idx = history.get("categoryRotation", 0) % len(CONTENT_CATEGORIES)
-    return CONTENT_CATEGORIES[idx]
+def get_next_category(store: ContentStore, coverage: Optional["CoverageIndex"] = None) -> str:
+    """En az yazılmış kategori (eşitlikte rotasyon sırası)"""
+    return (coverage or load_coverage_index(store)).next_category()
 
 
 # ============================================
-# TOPIC MANAGER
+# POST MANIFEST (content/manifest.json)
 # ============================================
 
-def load_topics() -> dict:
-    """topics.json yükle"""
-    if TOPICS_FILE.exists():
-        with open(TOPICS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {"topics": [], "future_topics": []}
+MANIFEST_FILE = BASE_DIR / "content" / "manifest.json"
+MANIFEST_STAMPS_FILE = CACHE_DIR / "manifest-stamps.json"
+# 3: readingTime reading-time paketiyle birebir (mdx.ts dosyayı hiç okumaz)
+MANIFEST_VERSION = 3
+# reading-time 1.5.0 (countWords) ile aynı aralıklar
+READING_WORDS_PER_MINUTE = 200
+READING_CJK_RANGES = ((0x3040, 0x309f), (0x4e00, 0x9fff), (0xac00, 0xd7a3), (0x20000, 0x2ebe0))
+READING_PUNCT_RANGES = ((0x21, 0x2f), (0x3a, 0x40), (0x5b, 0x60), (0x7b, 0x7e), (0x3000, 0x303f), (0xff00, 0xffef))
 
 
-def save_topics(data: dict):
-    """topics.json kaydet"""
-    with open(TOPICS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def _in_ranges(char: str, ranges) -> bool:
+    code = ord(char)
+    return any(low <= code <= high for low, high in ranges)
 
 
-def get_next_topic(topics: dict, history: dict) -> Optional[dict]:
-    """Yazılmamış sıradaki konuyu al"""
-    published = set(history.get("publishedSlugs", []))
+def reading_time_text(body: str) -> str:
+    """reading-time paketinin text çıktısı ("N min read") - gray-matter content'i üzerinden"""
+    bound = lambda c: c in ' \n\r\t'
+    cjk = lambda c: _in_ranges(c, READING_CJK_RANGES)
     
-    for topic in topics.get("topics", []):
-        if topic.get("slug") not in published and topic.get("status") != "published":
-            return topic
+    start, end = 0, len(body) - 1
+    while start < len(body) and bound(body[start]):
+        start += 1
+    while end >= 0 and bound(body[end]):
+        end -= 1
+    text = body + '\n'
     
-    return None
+    words, i = 0, start
+    while i <= end:
+        if cjk(text[i]) or (not bound(text[i]) and (bound(text[i + 1]) or cjk(text[i + 1]))):
+            words += 1
+        if cjk(text[i]):
+            while i <= end and (_in_ranges(text[i + 1], READING_PUNCT_RANGES) or bound(text[i + 1])):
+                i += 1
+        i += 1
+    
+    minutes = words / READING_WORDS_PER_MINUTE
+    return f"{math.ceil(round(minutes, 2))} min read"
+
+
+def post_manifest_entry(slug: str, raw: bytes, digest: str) -> dict:
+    """Tek post'un manifest kaydı - alan/varsayılanlar src/lib/mdx.ts PostMeta ile aynı"""
+    text = raw.decode('utf-8')
+    meta = read_frontmatter(text)
+    match = FRONTMATTER_RE.match(text)
+    body = text[match.end():] if match else text
+    words = len(body.split())
+    return {
+        "title": meta.get("title") or "Untitled",
+        "description": meta.get("description") or "",
+        "date": meta.get("date") or None,
+        "category": meta.get("category") or "general",
+        "image": meta.get("image") or None,
+        "author": meta.get("author") or "RetrofitAge Team",
+        "tags": meta.get("tags") or [],
+        "featured": meta.get("featured") is True,
+        "wordCount": words,
+        "readingTime": reading_time_text(body),
+        "size": len(raw),
+        "hash": digest,
+    }
+
+
+def update_post_manifest(content_dir: Optional[Path] = None, manifest_file: Optional[Path] = None,
+                         stamps_file: Optional[Path] = None) -> dict:
+    """content/posts → manifest, artımlı
+    
+    - mtime/boyutu değişmeyen dosya hiç okunmaz (stamp'ler CACHE_DIR'de,
+      commit edilen manifest checkout mtime'ından etkilenmesin)
+    - okunan dosyanın hash'i aynıysa yeniden parse edilmez
+    - manifest sadece içerik değişince yazılır
+    """
+    content_dir = content_dir or CONTENT_DIR
+    manifest_file = manifest_file or MANIFEST_FILE
+    stamps_file = stamps_file or MANIFEST_STAMPS_FILE
+    
+    manifest = load_json_file(manifest_file, {})
+    old_posts = manifest.get("posts", {}) if manifest.get("version") == MANIFEST_VERSION else {}
+    old_stamps = load_json_file(stamps_file, {})
+    posts, stamps = {}, {}
+    parsed = 0
+    
+    paths = sorted(content_dir.glob("*.mdx")) if content_dir.exists() else []
+    for path in paths:
+        slug = path.stem
+        st = path.stat()
+        stamp = [st.st_mtime_ns, st.st_size]
+        entry = old_posts.get(slug)
+        
+        if entry and old_stamps.get(slug) == {"stamp": stamp, "hash": entry["hash"]}:
+            posts[slug] = entry
+        else:
+            raw = path.read_bytes()
+            digest = hashlib.sha256(raw).hexdigest()
+            if entry and entry["hash"] == digest:
+                posts[slug] = entry
+            else:
+                posts[slug] = post_manifest_entry(slug, raw, digest)
+                parsed += 1
+        stamps[slug] = {"stamp": stamp, "hash": posts[slug]["hash"]}
+    
+    if posts != old_posts or manifest.get("version") != MANIFEST_VERSION:
+        manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(manifest_file, {"version": MANIFEST_VERSION, "posts": posts})
+        print(f"🗂️ Manifest güncellendi: {parsed} post parse edildi, {len(posts)} toplam")
+    if stamps != old_stamps:
+        stamps_file.parent.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(stamps_file, stamps)
+    
+    return posts
 
 
 # ============================================
-# GEMINI CONTENT GENERATION
+# SEARCH INDEX (content/search, BM25)
 # ============================================
 
-SYSTEM_PROMPT = """You are the Chief Engineer at RetrofitAge.com, a world-class expert in Aging-in-Place technology with 25+ years of experience helping families make homes safer for seniors.
+SEARCH_INDEX_DIR = BASE_DIR / "content" / "search"
+SEARCH_INDEX_VERSION = 1
+# Alan ağırlıkları (BM25F benzeri: tf = ağırlıklı toplam)
+SEARCH_FIELD_WEIGHTS = {"title": 4, "tags": 3, "description": 2, "body": 1}
+SEARCH_STOPWORDS = set("""
+a an and are as at be by can do for from has have how if in into is it its of on or
+our that the their them they this to was what when which who why will with you your
+""".split())
 
-WRITING STYLE:
-- Write like a real human expert, NOT AI
-- Use contractions naturally (it's, don't, we've, I've)
-- Include personal observations ("In my experience...", "I've seen...")
-- Vary sentence length - mix short punchy with longer explanatory
-- Add subtle humor and personality where appropriate
-- Use first person plural (we) when giving advice
-- Include specific numbers, measurements, prices (USD)
-- Reference real brands and products
 
-NEVER USE:
-- "In this article", "Welcome to", "Let's dive in"
-- "Without further ado", "In conclusion", "To summarize"
-- "Unleash", "Delve into", "Journey" metaphorically
-- Excessive exclamation marks
-- Robotic or overly formal tone"""
+def search_terms(text: str) -> List[str]:
+    """src/app/api/search/route.ts'teki tokenize ile birebir aynı olmalı"""
+    terms = []
+    for token in re.findall(r'[a-z0-9]+', text.lower()):
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        if len(token) > 1 and token not in SEARCH_STOPWORDS:
+            terms.append(token)
+    return terms
 
 
-HUMANIZATION_PROMPT = """Rewrite this article to sound more naturally human-written:
+def search_body_text(text: str) -> str:
+    """MDX gövdesi: frontmatter, URL ve JSX etiketleri hariç"""
+    match = FRONTMATTER_RE.match(text)
+    body = text[match.end():] if match else text
+    body = re.sub(r'https?://\S+', ' ', body)
+    return re.sub(r'<[^>]+>', ' ', body)
 
-1. Add personal touches - "I've found...", "In my experience...", "What we recommend..."
-2. Vary rhythm - mix short punchy sentences with longer ones
-3. Add conversational asides in parentheses where natural
-4. Include specific anecdotes ("I once worked with a family...")
-5. Use contractions throughout
-6. Add occasional hedging ("typically", "often", "in most cases")
-7. Remove any remaining AI-ish phrases
 
-Keep ALL technical content, markdown formatting, and structure intact.
-Return the full rewritten article:"""
+def search_doc_terms(entry: dict, text: str) -> dict:
+    """term -> ağırlıklı tf"""
+    tf = {}
+    fields = {
+        "title": entry.get("title", ""),
+        "tags": " ".join(entry.get("tags") or []),
+        "description": entry.get("description", ""),
+        "body": search_body_text(text),
+    }
+    for field, value in fields.items():
+        weight = SEARCH_FIELD_WEIGHTS[field]
+        for term in search_terms(value):
+            tf[term] = tf.get(term, 0) + weight
+    return tf
 
 
-def create_model(api_key: str):
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel(
-        model_name="gemini-2.0-flash",  # Fixed: 2.0-flash for text, 2.5 is for image gen
-        generation_config={
-            "temperature": 0.8,
-            "top_p": 0.95,
-            "max_output_tokens": 8192,
-        },
-        system_instruction=SYSTEM_PROMPT
-    )
+def update_search_index(posts: dict, content_dir: Optional[Path] = None,
+                        index_dir: Optional[Path] = None) -> int:
+    """Manifest'e göre ters indeksi artımlı güncelle, değişen doküman sayısını döndür
+    
+    - meta.json: N, toplam uzunluk, doküman listesi (id, slug, hash, uzunluk,
+      sonuç kartı alanları, dokunduğu shard'lar)
+    - <ilk harf>.json: term -> [[doc id, tf], ...]
+    - Sadece hash'i değişen/silinen post'ların shard'ları okunup yazılır
+    """
+    content_dir = content_dir or CONTENT_DIR
+    index_dir = index_dir or SEARCH_INDEX_DIR
+    meta_file = index_dir / "meta.json"
+    
+    meta = load_json_file(meta_file, {})
+    if meta.get("version") != SEARCH_INDEX_VERSION:
+        meta = {"version": SEARCH_INDEX_VERSION, "nextId": 0, "totalLength": 0, "docs": {}}
+    docs = meta["docs"]
+    ids_by_slug = {doc["slug"]: doc_id for doc_id, doc in docs.items()}
+    
+    removed = [ids_by_slug[slug] for slug in ids_by_slug
+               if slug not in posts or posts[slug]["hash"] != docs[ids_by_slug[slug]]["hash"]]
+    added = [slug for slug in posts if slug not in ids_by_slug or ids_by_slug[slug] in removed]
+    if not removed and not added:
+        return 0
+    
+    shards = {}
+    
+    def shard(prefix: str) -> dict:
+        if prefix not in shards:
+            shards[prefix] = load_json_file(index_dir / f"{prefix}.json", {})
+        return shards[prefix]
+    
+    for doc_id in removed:
+        doc = docs.pop(doc_id)
+        meta["totalLength"] -= doc["length"]
+        num = int(doc_id)
+        for prefix in doc["shards"]:
+            postings = shard(prefix)
+            for term in [t for t in postings if t[0] == prefix]:
+                postings[term] = [p for p in postings[term] if p[0] != num]
+                if not postings[term]:
+                    del postings[term]
+    
+    for slug in added:
+        entry = posts[slug]
+        tf = search_doc_terms(entry, (content_dir / f"{slug}.mdx").read_text(encoding='utf-8'))
+        num = meta["nextId"]
+        meta["nextId"] += 1
+        length = sum(tf.values())
+        for term, count in tf.items():
+            shard(term[0]).setdefault(term, []).append([num, count])
+        docs[str(num)] = {
+            "slug": slug,
+            "hash": entry["hash"],
+            "length": length,
+            "shards": "".join(sorted({term[0] for term in tf})),
+            "title": entry["title"],
+            "description": entry["description"],
+            "category": entry["category"],
+            "date": entry["date"],
+            "tags": entry["tags"],
+        }
+        meta["totalLength"] += length
+    
+    index_dir.mkdir(parents=True, exist_ok=True)
+    for prefix, postings in shards.items():
+        path = index_dir / f"{prefix}.json"
+        if postings:
+            write_json_atomic(path, dict(sorted(postings.items())), compact=True)
+        elif path.exists():
+            path.unlink()
+    write_json_atomic(meta_file, meta, compact=True)
+    
+    changed = len(set(added) | {s for s in ids_by_slug if s not in posts})
+    print(f"🔎 Arama indeksi güncellendi: {changed} post, {len(shards)} shard")
+    return changed
 
 
-def get_unsplash_image(keywords: List[str], category: str) -> str:
-    """Unsplash'tan konuya uygun görsel URL'i oluştur"""
-    # Kategori bazlı önceden seçilmiş yüksek kaliteli Unsplash fotoğrafları
-    # Her kategoride 5 farklı görsel - rotasyonla kullanılacak
-    category_images = {
-        "bathroom-safety": [
-            "https://images.unsplash.com/photo-1552321554-5fefe8c9ef14?w=1200&h=630&fit=crop&q=80",  # Modern bathroom
-            "https://images.unsplash.com/photo-1584622650111-993a426fbf0a?w=1200&h=630&fit=crop&q=80",  # Clean bathroom
-            "https://images.unsplash.com/photo-1620626011761-996317b8d101?w=1200&h=630&fit=crop&q=80",  # Bathroom interior
-            "https://images.unsplash.com/photo-1507652313519-d4e9174996dd?w=1200&h=630&fit=crop&q=80",  # Spa bathroom
-            "https://images.unsplash.com/photo-1600566752355-35792bedcfea?w=1200&h=630&fit=crop&q=80",  # Luxury bath
-        ],
-        "smart-home": [
-            "https://images.unsplash.com/photo-1558002038-1055907df827?w=1200&h=630&fit=crop&q=80",  # Smart speaker
-            "https://images.unsplash.com/photo-1556909114-f6e7ad7d3136?w=1200&h=630&fit=crop&q=80",  # Home automation
-            "https://images.unsplash.com/photo-1585503418537-88331351ad99?w=1200&h=630&fit=crop&q=80",  # Smart devices
-            "https://images.unsplash.com/photo-1593359677879-a4bb92f829d1?w=1200&h=630&fit=crop&q=80",  # Living room tech
-            "https://images.unsplash.com/photo-1518455027359-f3f8164ba6bd?w=1200&h=630&fit=crop&q=80",  # Smart home setup
-        ],
-        "smart-monitoring": [
-            "https://images.unsplash.com/photo-1576091160550-2173dba999ef?w=1200&h=630&fit=crop&q=80",  # Health tech
-            "https://images.unsplash.com/photo-1551288049-bebda4e38f71?w=1200&h=630&fit=crop&q=80",  # Dashboard
-            "https://images.unsplash.com/photo-1559757175-5700dde675bc?w=1200&h=630&fit=crop&q=80",  # Medical device
-            "https://images.unsplash.com/photo-1576671081837-49000212a370?w=1200&h=630&fit=crop&q=80",  # Health monitor
-            "https://images.unsplash.com/photo-1434494878577-86c23bcb06b9?w=1200&h=630&fit=crop&q=80",  # Smartwatch
-        ],
-        "finance-insurance": [
-            "https://images.unsplash.com/photo-1554224155-6726b3ff858f?w=1200&h=630&fit=crop&q=80",  # Financial planning
-            "https://images.unsplash.com/photo-1450101499163-c8848c66ca85?w=1200&h=630&fit=crop&q=80",  # Documents
-            "https://images.unsplash.com/photo-1554224154-26032ffc0d07?w=1200&h=630&fit=crop&q=80",  # Calculator
-            "https://images.unsplash.com/photo-1563013544-824ae1b704d3?w=1200&h=630&fit=crop&q=80",  # Insurance
-            "https://images.unsplash.com/photo-1579621970563-ebec7560ff3e?w=1200&h=630&fit=crop&q=80",  # Money planning
-        ],
-        "finance": [
-            "https://images.unsplash.com/photo-1579621970563-ebec7560ff3e?w=1200&h=630&fit=crop&q=80",  # Savings
-            "https://images.unsplash.com/photo-1554224155-6726b3ff858f?w=1200&h=630&fit=crop&q=80",  # Planning
-            "https://images.unsplash.com/photo-1553729459-efe14ef6055d?w=1200&h=630&fit=crop&q=80",  # Money
-            "https://images.unsplash.com/photo-1518458028785-8fbcd101ebb9?w=1200&h=630&fit=crop&q=80",  # Home investment
-            "https://images.unsplash.com/photo-1560472355-536de3962603?w=1200&h=630&fit=crop&q=80",  # Budget
-        ],
-        "structural-retrofit": [
-            "https://images.unsplash.com/photo-1581578731548-c64695cc6952?w=1200&h=630&fit=crop&q=80",  # Construction
-            "https://images.unsplash.com/photo-1504307651254-35680f356dfd?w=1200&h=630&fit=crop&q=80",  # Renovation
-            "https://images.unsplash.com/photo-1585128792020-803d29415281?w=1200&h=630&fit=crop&q=80",  # Home improvement
-            "https://images.unsplash.com/photo-1523413363574-c30aa1c2a516?w=1200&h=630&fit=crop&q=80",  # Tools
-            "https://images.unsplash.com/photo-1558618666-fcd25c85cd64?w=1200&h=630&fit=crop&q=80",  # Building
-        ],
-        "housing-options": [
-            "https://images.unsplash.com/photo-1564013799919-ab600027ffc6?w=1200&h=630&fit=crop&q=80",  # Modern house
-            "https://images.unsplash.com/photo-1518780664697-55e3ad937233?w=1200&h=630&fit=crop&q=80",  # Family home
-            "https://images.unsplash.com/photo-1449844908441-8829872d2607?w=1200&h=630&fit=crop&q=80",  # Cottage
-            "https://images.unsplash.com/photo-1512917774080-9991f1c4c750?w=1200&h=630&fit=crop&q=80",  # Luxury home
-            "https://images.unsplash.com/photo-1480074568708-e7b720bb3f09?w=1200&h=630&fit=crop&q=80",  # Cozy house
-        ],
-        "kitchen-safety": [
-            "https://images.unsplash.com/photo-1556909114-f6e7ad7d3136?w=1200&h=630&fit=crop&q=80",  # Modern kitchen
-            "https://images.unsplash.com/photo-1556909172-54557c7e4fb7?w=1200&h=630&fit=crop&q=80",  # Clean kitchen
-            "https://images.unsplash.com/photo-1565538810643-b5bdb714032a?w=1200&h=630&fit=crop&q=80",  # Kitchen interior
-            "https://images.unsplash.com/photo-1507089947368-19c1da9775ae?w=1200&h=630&fit=crop&q=80",  # Cooking
+# ============================================
+# RELATED POSTS (TF-IDF, iç linkler)
+# ============================================
+
+RELATED_INDEX_FILE = CACHE_DIR / "related-index.json"
+RELATED_INDEX_VERSION = 1
+RELATED_TOP_K = int(os.environ.get("RELATED_TOP_K", "5"))
+RELATED_MIN_SCORE = 0.05
+# Kırık linkin etiketi bir post'a bu kadar benziyorsa link o post'a çevrilir
+RELATED_RESOLVE_SCORE = 0.2
+# Matris sütunları: df'e göre en yaygın terimler (bellek: post sayısı x bu x 4 bayt)
+RELATED_MAX_FEATURES = 4096
+# Gövde uzun olduğu için tf alan içinde log'lanır, sonra ağırlıklanır - başlık/tag baskın kalsın
+RELATED_FIELD_WEIGHTS = {"title": 4, "tags": 3, "description": 2, "body": 1}
+
+
+def _numpy():
+    """NumPy yüklüyse modül, değilse None (saf Python yoluna düşülür)"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def related_doc_terms(entry: dict, text: str = "") -> dict:
+    """term -> Σ alan ağırlığı * (1 + log tf_alan)"""
+    fields = {
+        "title": entry.get("title", ""),
+        "tags": " ".join(entry.get("tags") or []),
+        "description": entry.get("description", ""),
+        "body": search_body_text(text) if text else "",
+    }
+    terms = {}
+    for field, value in fields.items():
+        counts = {}
+        for term in search_terms(value):
+            counts[term] = counts.get(term, 0) + 1
+        for term, n in counts.items():
+            terms[term] = terms.get(term, 0) + RELATED_FIELD_WEIGHTS[field] * (1 + math.log(n))
+    return terms
+
+
+class RelatedIndex:
+    """content/posts için TF-IDF vektörleri - gerçek post'lara iç link
+    
+    - Terimler related_doc_terms ile (arama indeksiyle aynı tokenize), post
+      hash'iyle RELATED_INDEX_FILE'da saklanır; sadece hash'i değişen post
+      yeniden okunur
+    - Ağırlık terim skoru * idf, satırlar L2 normlu; sorgu tek matris-vektör
+      çarpımı (NumPy), NumPy yoksa seyrek saf Python çarpım
+    - Manifest değişmedikçe matris yeniden kurulmaz
+    """
+    
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or RELATED_INDEX_FILE
+        self.docs = {}       # slug -> {"hash", "title", "category", "tf"}
+        self.stamp = None    # manifest (mtime, boyut)
+        self.slugs = []
+        self.vocab = {}      # terim -> sütun
+        self.idf = []
+        self.matrix = None   # numpy: (post, terim); yoksa satır başına {sütun: ağırlık}
+    
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "RelatedIndex":
+        index = cls(path)
+        data = load_json_file(index.path, {})
+        if data.get("version") == RELATED_INDEX_VERSION:
+            index.docs = data.get("docs", {})
+        return index
+    
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(self.path, {"version": RELATED_INDEX_VERSION, "docs": self.docs}, compact=True)
+    
+    def sync(self):
+        """Manifest'e göre değişen post'ları yeniden terimlendir, gerekirse matrisi kur"""
+        try:
+            st = MANIFEST_FILE.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self.stamp and self.matrix is not None:
+            return
+        
+        posts = load_json_file(MANIFEST_FILE, {}).get("posts", {})
+        changed = False
+        for slug, entry in posts.items():
+            if self.docs.get(slug, {}).get("hash") == entry.get("hash"):
+                continue
+            path = CONTENT_DIR / f"{slug}.mdx"
+            if not path.exists():
+                continue
+            self.docs[slug] = {"hash": entry.get("hash"), "title": entry.get("title") or slug,
+                               "category": entry.get("category"),
+                               "tf": related_doc_terms(entry, path.read_text(encoding='utf-8'))}
+            changed = True
+        for slug in [s for s in self.docs if s not in posts]:
+            del self.docs[slug]
+            changed = True
+        
+        self.stamp = stamp
+        if changed:
+            self.save()
+        if changed or self.matrix is None:
+            self._build()
+    
+    def _weights(self, tf: dict) -> dict:
+        """sütun -> normlu tf-idf"""
+        weights = {self.vocab[t]: score * self.idf[self.vocab[t]]
+                   for t, score in tf.items() if t in self.vocab and score > 0}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {col: w / norm for col, w in weights.items()}
+    
+    def _build(self):
+        self.slugs = sorted(self.docs)
+        df = {}
+        for slug in self.slugs:
+            for term in self.docs[slug]["tf"]:
+                df[term] = df.get(term, 0) + 1
+        terms = heapq.nlargest(RELATED_MAX_FEATURES, df, key=lambda t: (df[t], t))
+        self.vocab = {term: col for col, term in enumerate(sorted(terms))}
+        n = len(self.slugs)
+        self.idf = [0.0] * len(self.vocab)
+        for term, col in self.vocab.items():
+            self.idf[col] = math.log((1 + n) / (1 + df[term])) + 1
+        
+        rows = [self._weights(self.docs[slug]["tf"]) for slug in self.slugs]
+        np = _numpy()
+        if np is None:
+            self.matrix = rows
+            return
+        matrix = np.zeros((n, len(self.vocab)), dtype=np.float32)
+        for i, row in enumerate(rows):
+            if row:
+                matrix[i, list(row)] = list(row.values())
+        self.matrix = matrix
+    
+    def top(self, tf: dict, k: int, exclude: Optional[str] = None) -> List[tuple]:
+        """En benzer k post: [(kosinüs, slug)] azalan sırada"""
+        self.sync()
+        if not self.slugs:
+            return []
+        query = self._weights(tf)
+        np = _numpy()
+        if np is not None and not isinstance(self.matrix, list):
+            vector = np.zeros(len(self.vocab), dtype=np.float32)
+            if query:
+                vector[list(query)] = list(query.values())
+            sims = self.matrix @ vector
+            count = min(k + 1, len(self.slugs))
+            best = np.argpartition(-sims, count - 1)[:count]
+            scored = [(float(sims[i]), self.slugs[i]) for i in best]
+        else:
+            scored = [(sum(row.get(col, 0.0) * w for col, w in query.items()), slug)
+                      for row, slug in zip(self.matrix, self.slugs)]
+        return heapq.nlargest(k, (m for m in scored if m[1] != exclude))
+    
+    def related(self, topic: dict, k: Optional[int] = None) -> List[dict]:
+        """Konuya en yakın k post: [{"slug", "title", "url", "score"}]"""
+        tf = related_doc_terms({"title": topic.get("title", ""), "tags": topic.get("keywords") or []})
+        return [{"slug": slug, "title": self.docs[slug]["title"], "url": self.url(slug),
+                 "score": round(score, 3)}
+                for score, slug in self.top(tf, k or RELATED_TOP_K, exclude=topic.get("slug"))
+                if score >= RELATED_MIN_SCORE]
+    
+    def url(self, slug: str) -> str:
+        return f"/{self.docs[slug].get('category') or 'general'}/{slug}"
+    
+    def resolve(self, label: str) -> Optional[str]:
+        """Kırık linkin etiketine en çok benzeyen post'un URL'i (eşik altındaysa None)"""
+        label = re.sub(r'^Related:\s*', '', label)
+        best = self.top(related_doc_terms({"title": label}), 1)
+        if not best or best[0][0] < RELATED_RESOLVE_SCORE:
+            return None
+        return self.url(best[0][1])
+
+
+_related_index = None
+
+
+def related_index() -> RelatedIndex:
+    """Süreç boyunca tek indeks (daemon'da sıcak kalır); yol değişirse yeniden yüklenir"""
+    global _related_index
+    if _related_index is None or _related_index.path != RELATED_INDEX_FILE:
+        _related_index = RelatedIndex.load()
+    return _related_index
+
+
+# ============================================
+# TOPIC MANAGER
+# ============================================
+
+def get_next_topic(store: ContentStore, coverage: Optional["CoverageIndex"] = None) -> Optional[dict]:
+    """Yazılmamış konulardan kapsamayı en çok artıranı al"""
+    return (coverage or load_coverage_index(store)).next_topic(get_pending_topics(store))
+
+
+def get_pending_topics(store: ContentStore) -> List[dict]:
+    """Yazılmamış tüm konular (sırayla)"""
+    return store.pending_topics()
+
+
+class CoverageIndex:
+    """Yayınlanmış içeriğin kategori ve keyword/tag sayaçları (bellekte)
+    
+    - Kaynak: store (history + content/posts senkronu) ve manifest'teki tag'ler
+    - Kategori: en az yazılmış olan; eşitlikte rotasyondaki sıra
+    - Konu: en az kapsanan kategorideki bekleyenlerden keyword'lerinin marjinal
+      kazancı en yüksek olan; terim başına kazanç 1 / (1 + yayınlanmış sayısı)
+    - Seçim sadece sayaç lookup'ı, model çağrısı yok
+    """
+    
+    def __init__(self, rotation: int = 0):
+        self.rotation = rotation
+        self.categories = dict.fromkeys(SCHEDULE_CATEGORIES, 0)
+        self.terms = {}
+    
+    def copy(self) -> "CoverageIndex":
+        clone = CoverageIndex(self.rotation)
+        clone.categories = dict(self.categories)
+        clone.terms = dict(self.terms)
+        return clone
+    
+    @staticmethod
+    def category_of(category: Optional[str]) -> Optional[str]:
+        return CATEGORY_ALIASES.get(category, category)
+    
+    @staticmethod
+    def topic_terms(topic: dict) -> set:
+        keywords = topic.get("keywords") or [topic.get("title", "")]
+        return set(similarity_tokens(" ".join(keywords)))
+    
+    def add(self, category: Optional[str], keywords: List[str]):
+        category = self.category_of(category)
+        if category:
+            self.categories[category] = self.categories.get(category, 0) + 1
+        for term in set(similarity_tokens(" ".join(keywords))):
+            self.terms[term] = self.terms.get(term, 0) + 1
+    
+    def add_topic(self, topic: dict):
+        """Yayınlanan konuyu say, rotasyonu ilerlet"""
+        self.add(topic.get("category"), topic.get("keywords") or [topic.get("title", "")])
+        self.rotation += 1
+    
+    def gain(self, topic: dict) -> float:
+        return sum(1 / (1 + self.terms.get(term, 0)) for term in self.topic_terms(topic))
+    
+    def _category_key(self, category: str) -> tuple:
+        if category in SCHEDULE_CATEGORIES:
+            order = (SCHEDULE_CATEGORIES.index(category) - self.rotation) % len(SCHEDULE_CATEGORIES)
+        else:
+            order = len(SCHEDULE_CATEGORIES)
+        return self.categories.get(self.category_of(category), 0), order
+    
+    def next_category(self, categories: Optional[List[str]] = None) -> str:
+        return min(categories or SCHEDULE_CATEGORIES, key=self._category_key)
+    
+    def next_topic(self, pending: List[dict]) -> Optional[dict]:
+        if not pending:
+            return None
+        category = self.next_category(list(dict.fromkeys(t.get("category") for t in pending)))
+        # max() eşitlikte ilkini döndürür - kuyruk sırası korunur
+        return max((t for t in pending if t.get("category") == category), key=self.gain)
+    
+    def plan(self, pending: List[dict], days: int) -> List[tuple]:
+        """Sonraki `days` yayının simülasyonu: [(kategori, konu veya None, kazanç)]
+        
+        Bekleyen konu kalmayınca None - o gün yeni konu üretilecek.
+        """
+        sim = self.copy()
+        remaining = list(pending)
+        schedule = []
+        for _ in range(days):
+            topic = sim.next_topic(remaining)
+            if topic:
+                remaining.remove(topic)
+                schedule.append((topic.get("category"), topic, sim.gain(topic)))
+                sim.add_topic(topic)
+            else:
+                category = sim.next_category()
+                schedule.append((category, None, 0.0))
+                sim.add_topic({"category": category})
+        return schedule
+
+
+def load_coverage_index(store: ContentStore) -> CoverageIndex:
+    """Store + manifest tag'lerinden sayaçları kur"""
+    coverage = CoverageIndex(store.category_rotation)
+    manifest = load_json_file(MANIFEST_FILE, {}).get("posts", {})
+    keywords = {}
+    for keyword, slug in store.keyword_rows():
+        keywords.setdefault(slug, []).append(keyword)
+    
+    for slug, category in store.published_categories():
+        tags = manifest.get(slug, {}).get("tags") or []
+        coverage.add(category, keywords.pop(slug, []) + tags)
+    # Post'u bilinmeyen keyword'ler (eski history) tek tek sayılır
+    for orphan in keywords.values():
+        for keyword in orphan:
+            coverage.add(None, [keyword])
+    return coverage
+
+
+def print_plan(store: ContentStore, days: int):
+    """--plan: sonraki N günün kategori/konu takvimi (model çağrısı yok)"""
+    started = time.perf_counter()
+    coverage = load_coverage_index(store)
+    built = time.perf_counter()
+    schedule = coverage.plan(get_pending_topics(store), days)
+    planned = time.perf_counter()
+    
+    first = datetime.now() + timedelta(days=1 if already_posted_today(store) else 0)
+    print(f"📅 {days} günlük plan ({len(get_pending_topics(store))} bekleyen konu)")
+    for day, (category, topic, gain) in enumerate(schedule):
+        date = (first + timedelta(days=day)).strftime("%Y-%m-%d")
+        title = f"{topic['title']}  (+{gain:.2f})" if topic else "🆕 yeni konu üretilecek"
+        print(f"   {date}  {category:<20} {title}")
+    
+    counts = ", ".join(f"{c}={n}" for c, n in sorted(coverage.categories.items(), key=lambda x: x[1]))
+    print(f"📊 Kapsama: {counts}")
+    print(f"⏱️ İndeks {(built - started) * 1000:.1f} ms, {days} seçim "
+          f"{(planned - built) * 1000:.2f} ms ({len(coverage.terms)} terim)")
+
+
+# ============================================
+# NEAR-DUPLICATE INDEX (MinHash / LSH)
+# ============================================
+
+SIMILARITY_INDEX_FILE = CACHE_DIR / "similarity-index.json"
+
+# 64 permütasyon, 32 band x 2 satır → 0.35 benzerlikte aday olma olasılığı ≈ %98
+MINHASH_PERMS = 64
+LSH_BANDS = 32
+DUPLICATE_THRESHOLD = float(os.environ.get("DUPLICATE_THRESHOLD", "0.35"))
+
+_MINHASH_PRIME = (1 << 31) - 1
+_MINHASH_COEFFS = [
+    (random.Random(i).randrange(1, _MINHASH_PRIME), random.Random(-i - 1).randrange(0, _MINHASH_PRIME))
+    for i in range(MINHASH_PERMS)
+]
+
+# Konu kimliği taşımayan kelimeler (şablon başlıkları dahil)
+SIMILARITY_STOPWORDS = set("""
+a an and are as at be by can do does for from guide how in is it its of on or our the their this to
+vs what when which who why will with your you seniors senior elderly aging place home homes complete
+ultimate best executive summary problem technical solutions cost costs analysis installation
+frequently asked questions conclusion faq step 2024 2025 2026
+""".split())
+
+
+def similarity_tokens(text: str) -> List[str]:
+    """Küçük harf, noktalama yok, stopword yok, kaba tekil hale getirme"""
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in SIMILARITY_STOPWORDS or len(word) < 2:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def similarity_shingles(text: str) -> set:
+    """Unigram + bigram kümesi"""
+    tokens = similarity_tokens(text)
+    shingles = set(tokens)
+    shingles.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return shingles
+
+
+def minhash_signature(shingles: set) -> List[int]:
+    if not shingles:
+        return [_MINHASH_PRIME] * MINHASH_PERMS
+    hashes = [zlib.crc32(sh.encode('utf-8')) for sh in shingles]
+    return [min((a * h + b) % _MINHASH_PRIME for h in hashes) for a, b in _MINHASH_COEFFS]
+
+
+def signature_similarity(a: List[int], b: List[int]) -> float:
+    """İki imzanın tahmini Jaccard benzerliği"""
+    return sum(1 for x, y in zip(a, b) if x == y) / MINHASH_PERMS
+
+
+def topic_similarity_text(topic: dict) -> str:
+    return " ".join([topic.get("title", ""), " ".join(topic.get("keywords", []) or [])])
+
+
+def post_similarity_text(text: str) -> str:
+    """Post'un konu kimliği: frontmatter başlık + tag'ler
+    
+    Konu adayıyla aynı şekil (başlık + keyword) - gövde/başlık metni eklemek
+    kümeyi büyütüp Jaccard'ı gerçek tekrarlarda bile eşiğin altına çekiyor.
+    """
+    meta = read_frontmatter(text)
+    return " ".join([meta.get("title", ""), " ".join(meta.get("tags", []) or [])])
+
+
+class SimilarityIndex:
+    """Yayınlanmış ve kuyruktaki konular için MinHash/LSH indeksi
+    
+    - Doküman: content/posts'taki post (frontmatter başlık + tag) veya
+      topics.json'daki konu (başlık + keyword); imzası 64 MinHash değeri
+    - LSH band bucket'ları ile aday bulma O(band) - aday konu LLM'e hiç
+      gitmeden mikrosaniyeler içinde reddedilir
+    - SIMILARITY_INDEX_FILE'a yazılır; post'lar mtime/boyut, konular
+      başlık/keyword hash'i değişince yeniden imzalanır, gerisi diskten gelir
+    """
+    
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or SIMILARITY_INDEX_FILE
+        self.docs = {}       # doc_id -> {"title", "sig", "stamp"}
+        self.buckets = {}    # (band, hash) -> set(doc_id)
+        self.dirty = False
+    
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "SimilarityIndex":
+        index = cls(path)
+        if index.path.exists():
+            try:
+                data = json.loads(index.path.read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError):
+                data = {}
+            if data.get("perms") == MINHASH_PERMS:
+                for doc_id, doc in data.get("docs", {}).items():
+                    index._insert(doc_id, doc)
+        return index
+    
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(self.path, {"perms": MINHASH_PERMS, "docs": self.docs})
+        self.dirty = False
+    
+    def _band_keys(self, sig: List[int]) -> List[tuple]:
+        rows = MINHASH_PERMS // LSH_BANDS
+        return [(band, hash(tuple(sig[band * rows:(band + 1) * rows]))) for band in range(LSH_BANDS)]
+    
+    def _insert(self, doc_id: str, doc: dict):
+        self._remove(doc_id)
+        self.docs[doc_id] = doc
+        for key in self._band_keys(doc["sig"]):
+            self.buckets.setdefault(key, set()).add(doc_id)
+    
+    def _remove(self, doc_id: str):
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for key in self._band_keys(doc["sig"]):
+            bucket = self.buckets.get(key)
+            if bucket:
+                bucket.discard(doc_id)
+    
+    def add(self, doc_id: str, title: str, text: str, stamp=None):
+        self._insert(doc_id, {"title": title, "sig": minhash_signature(similarity_shingles(text)),
+                              "stamp": stamp})
+        self.dirty = True
+    
+    @staticmethod
+    def topic_stamp(topic: dict) -> str:
+        """Başlık/keyword değişince değişen damga (post'lardaki mtime/boyut yerine)"""
+        text = f"{topic.get('title', '')}\0{topic_similarity_text(topic)}"
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+    
+    def add_topic(self, topic: dict):
+        self.add(f"topic:{topic['slug']}", topic.get("title", ""), topic_similarity_text(topic),
+                 self.topic_stamp(topic))
+    
+    def sync(self, store: ContentStore, content_dir: Optional[Path] = None):
+        """content/posts ve topics'i indekse taşı (sadece değişenler imzalanır)"""
+        content_dir = content_dir or CONTENT_DIR
+        seen = set()
+        
+        if content_dir.exists():
+            for path in content_dir.glob("*.mdx"):
+                doc_id = f"post:{path.stem}"
+                seen.add(doc_id)
+                st = path.stat()
+                stamp = [st.st_mtime_ns, st.st_size]
+                if self.docs.get(doc_id, {}).get("stamp") == stamp:
+                    continue
+                text = path.read_text(encoding='utf-8')
+                self.add(doc_id, read_frontmatter(text).get("title", path.stem),
+                         post_similarity_text(text), stamp)
+        
+        for topic in store.export_topics().get("topics", []):
+            doc_id = f"topic:{topic['slug']}"
+            seen.add(doc_id)
+            if self.docs.get(doc_id, {}).get("stamp") != self.topic_stamp(topic):
+                self.add_topic(topic)
+        
+        for doc_id in [d for d in self.docs if d not in seen]:
+            self._remove(doc_id)
+            self.dirty = True
+    
+    def candidates(self, sig: List[int]) -> set:
+        found = set()
+        for key in self._band_keys(sig):
+            found.update(self.buckets.get(key, ()))
+        return found
+    
+    def find_duplicates(self, topic: dict, threshold: Optional[float] = None) -> List[tuple]:
+        """LSH adayları içinde eşiği geçenler: [(benzerlik, doc_id, başlık)]"""
+        threshold = DUPLICATE_THRESHOLD if threshold is None else threshold
+        sig = minhash_signature(similarity_shingles(topic_similarity_text(topic)))
+        own = f"topic:{topic.get('slug')}"
+        matches = []
+        for doc_id in self.candidates(sig):
+            if doc_id == own:
+                continue
+            score = signature_similarity(sig, self.docs[doc_id]["sig"])
+            if score >= threshold:
+                matches.append((score, doc_id, self.docs[doc_id]["title"]))
+        return sorted(matches, reverse=True)
+    
+    def most_similar(self, text: str, k: int = 10) -> List[tuple]:
+        """Tüm indekste en benzer k doküman (prompt'a verilecek kısa liste)"""
+        sig = minhash_signature(similarity_shingles(text))
+        scored = [(signature_similarity(sig, doc["sig"]), doc_id, doc["title"])
+                  for doc_id, doc in self.docs.items()]
+        return [m for m in heapq.nlargest(k, scored) if m[0] > 0]
+
+
+def load_similarity_index(store: ContentStore) -> SimilarityIndex:
+    index = SimilarityIndex.load()
+    index.sync(store)
+    index.save()
+    return index
+
+
+# ============================================
+# RESPONSE CACHE
+# ============================================
+
+RESPONSE_CACHE_DIR = CACHE_DIR / "responses"
+RESPONSE_CACHE_MAX_MB = float(os.environ.get("RESPONSE_CACHE_MAX_MB", "200"))
+RESPONSE_CACHE_MAX_AGE_DAYS = float(os.environ.get("RESPONSE_CACHE_MAX_AGE_DAYS", "30"))
+
+
+def response_cache_key(provider: str, model_name: str, generation_config: dict,
+                       system_instruction: str, prompt: str) -> str:
+    """Provider + model + config + system instruction + prompt içeriğinin hash'i
+    
+    Provider anahtarda: stub/fake yanıtları gerçek Gemini çağrısına hiç dönmez.
+    """
+    payload = json.dumps(
+        [provider, model_name, generation_config, system_instruction, prompt],
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Gemini yanıtları için content-addressed disk cache
+    
+    - Her yanıt <hash[:2]>/<hash>.json dosyası; yazma temp + os.replace ile
+      atomik, aynı dizini paylaşan paralel worker/process'ler güvenli
+    - İsabette mtime güncellenir, eviction en eski mtime'dan başlar (LRU)
+    - max_age'den eski girdiler ve max_bytes üstü kısım silinir
+    """
+    
+    def __init__(self, directory: Path, max_bytes: int, max_age: float, enabled: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding='utf-8'))
+            if time.time() - entry.get("createdAt", 0) > self.max_age:
+                raise FileNotFoundError
+            os.utime(path)
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["text"]
+    
+    def put(self, key: str, text: str):
+        if not self.enabled:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{random.getrandbits(32):08x}.tmp")
+        tmp.write_text(json.dumps({"createdAt": time.time(), "text": text}, ensure_ascii=False),
+                       encoding='utf-8')
+        os.replace(tmp, path)
+    
+    def _entries(self) -> list:
+        entries = []
+        if not self.directory.exists():
+            return entries
+        for path in self.directory.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue  # başka bir worker silmiş
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+    
+    def evict(self) -> int:
+        """Yaşı geçmiş girdileri, sonra boyut sınırına kadar en eskileri sil"""
+        entries = sorted(self._entries())
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        
+        return removed
+    
+    def purge(self) -> int:
+        """Tüm cache'i sil"""
+        removed = 0
+        for _, _, path in self._entries():
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+RESPONSE_CACHE = ResponseCache(
+    RESPONSE_CACHE_DIR,
+    max_bytes=int(RESPONSE_CACHE_MAX_MB * 1024 * 1024),
+    max_age=RESPONSE_CACHE_MAX_AGE_DAYS * 86400,
+)
+
+
+# ============================================
+# PIPELINE CHECKPOINTS
+# ============================================
+
+# draft → humanize → clean → save → record (history/topics) → commit
+CHECKPOINT_DIR = CACHE_DIR / "checkpoints"
+
+
+def new_checkpoint(topic: dict) -> dict:
+    return {"topic": topic, "startedAt": datetime.now().isoformat()}
+
+
+def load_checkpoint(slug: str) -> Optional[dict]:
+    path = CHECKPOINT_DIR / f"{slug}.json"
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_checkpoint(checkpoint: dict):
+    """Stage sonucunu atomik olarak yaz"""
+    CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+    path = CHECKPOINT_DIR / f"{checkpoint['topic']['slug']}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(checkpoint, indent=2, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def clear_checkpoint(slug: str):
+    try:
+        (CHECKPOINT_DIR / f"{slug}.json").unlink()
+    except FileNotFoundError:
+        pass
+
+
+def quarantine_checkpoint(checkpoint: dict) -> Path:
+    """Tekrar tekrar başarısız olan checkpoint'i CHECKPOINT_DIR/failed'e taşı
+    
+    list_checkpoints() alt dizine bakmaz: --resume ve daemon onu bir daha
+    almaz. Stream ile yazılmış temp dosya silinir.
+    """
+    slug = checkpoint["topic"]["slug"]
+    staged = checkpoint.pop("staged", None)
+    if staged:
+        Path(staged).unlink(missing_ok=True)
+    save_checkpoint(checkpoint)
+    target = CHECKPOINT_DIR / "failed" / f"{slug}.json"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(CHECKPOINT_DIR / f"{slug}.json", target)
+    return target
+
+
+def list_checkpoints() -> List[dict]:
+    """Yarım kalmış tüm pipeline'lar (eskiden yeniye)"""
+    if not CHECKPOINT_DIR.exists():
+        return []
+    checkpoints = []
+    for path in CHECKPOINT_DIR.glob("*.json"):
+        checkpoint = load_checkpoint(path.stem)
+        if checkpoint and checkpoint.get("topic", {}).get("slug"):
+            checkpoints.append(checkpoint)
+    return sorted(checkpoints, key=lambda c: c.get("startedAt", ""))
+
+
+def checkpoint_stage(checkpoint: dict) -> str:
+    """İlk tamamlanmamış stage"""
+    if "draft" not in checkpoint:
+        return "draft"
+    if "humanized" not in checkpoint:
+        return "humanize"
+    if "cleaned" not in checkpoint:
+        return "clean"
+    if not checkpoint.get("validated") and "filepath" not in checkpoint:
+        return "validate"
+    if "filepath" not in checkpoint:
+        return "save"
+    if not checkpoint.get("recorded"):
+        return "record"
+    return "commit"
+
+
+# ============================================
+# VALIDATION GATE
+# ============================================
+
+VALIDATION_MIN_WORDS = int(os.environ.get("VALIDATION_MIN_WORDS", "1800"))
+VALIDATION_MAX_WORDS = int(os.environ.get("VALIDATION_MAX_WORDS", "2200"))
+VALIDATION_RETRIES = 2
+FRONTMATTER_SCHEMA = {
+    "title": str,
+    "description": str,
+    "date": str,
+    "category": str,
+    "tags": list,
+    "author": str,
+    "image": str,
+}
+# (rapordaki ad, başlık regex'i) - humanize başlıkları yeniden yazdığı için geniş,
+# başlık seviyesi serbest (##, ###, ...)
+REQUIRED_SECTIONS = [
+    ("Executive Summary", r"summary|takeaways|bottom line|snapshot|at a glance|quick (guide|look|answer)|tl;?dr"),
+    ("Cost Analysis", r"\bcosts?\b|pric|budget|invest|afford|financ|\bpay"),
+    ("Frequently Asked Questions", r"frequently asked|\bfaqs?\b"),
+]
+MIN_FAQ_QUESTIONS = 3
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.+?)\s*$', re.MULTILINE)
+INTERNAL_LINK_RE = re.compile(r'\[([^\]]*)\]\((/[^)\s]*)\)')
+CODE_RE = re.compile(r'```.*?```|`[^`\n]*`', re.DOTALL)
+
+
+class ValidationError(ValueError):
+    """Doğrulama kapısını geçemeyen makale"""
+    
+    def __init__(self, slug: str, issues: List[str]):
+        super().__init__(f"doğrulama başarısız: {'; '.join(issues)}")
+        self.slug = slug
+        self.issues = issues
+
+
+def site_routes() -> set:
+    """Tek segmentli sabit sayfalar (src/app altındaki page.tsx'ler, route group'lar dahil)"""
+    routes = {"/"}
+    app_dir = BASE_DIR / "src" / "app"
+    for page in app_dir.rglob("page.tsx"):
+        parts = [p for p in page.parent.relative_to(app_dir).parts if not p.startswith("(")]
+        if parts and not any(p.startswith("[") for p in parts):
+            routes.add("/" + "/".join(parts))
+    return routes
+
+
+def known_post_links() -> dict:
+    """slug -> kategori (manifest'ten), iç link kontrolü için"""
+    posts = load_json_file(MANIFEST_FILE, {}).get("posts", {})
+    return {slug: entry["category"] for slug, entry in posts.items()}
+
+
+def check_internal_link(url: str, known: dict, routes: set) -> Optional[str]:
+    """Geçerliyse None, değilse doğru URL (varsa) ya da "" """
+    path = url.split("#")[0].split("?")[0].rstrip("/") or "/"
+    parts = path.strip("/").split("/")
+    if path in routes:
+        return None
+    if len(parts) == 1 and (parts[0] in CONTENT_CATEGORIES or parts[0] in known.values()):
+        return None
+    if len(parts) == 2 and parts[1] in known:
+        expected = f"/{known[parts[1]]}/{parts[1]}"
+        return None if path == expected else expected
+    return ""
+
+
+def validate_article(text: str, slug: str, known: dict, routes: Optional[set] = None) -> dict:
+    """Tek makale: frontmatter şeması, zorunlu bölümler, kelime sayısı, iç linkler, MDX
+    
+    {"slug", "words", "errors": [(tür, mesaj)], "warnings": [...]} döner.
+    Tür: frontmatter / sections / length / links / mdx - yeniden üretim kararı buna göre.
+    """
+    routes = routes if routes is not None else site_routes()
+    errors, warnings = [], []
+    
+    match = FRONTMATTER_RE.match(text)
+    meta = read_frontmatter(text) if match else {}
+    if not match:
+        errors.append(("frontmatter", "frontmatter yok"))
+    else:
+        for key, kind in FRONTMATTER_SCHEMA.items():
+            if not meta.get(key):
+                errors.append(("frontmatter", f"frontmatter eksik: {key}"))
+            elif not isinstance(meta[key], kind):
+                errors.append(("frontmatter", f"frontmatter tipi hatalı: {key}"))
+        if isinstance(meta.get("date"), str) and not re.fullmatch(r'\d{4}-\d{2}-\d{2}', meta["date"]):
+            errors.append(("frontmatter", f"tarih formatı hatalı: {meta['date']}"))
+        if meta.get("category") and meta["category"] not in CONTENT_CATEGORIES:
+            warnings.append(("frontmatter", f"bilinmeyen kategori: {meta['category']}"))
+        if isinstance(meta.get("image"), str) and meta["image"] and not meta["image"].startswith("https://"):
+            errors.append(("frontmatter", "image https URL değil"))
+    
+    body = text[match.end():] if match else text
+    prose = CODE_RE.sub(" ", body)
+    
+    headings = []
+    for m in HEADING_RE.finditer(body):
+        title = m.group(2)
+        if re.search(r'<[^>]+>', title):
+            warnings.append(("mdx", f"başlıkta HTML etiketi: {title[:60]}"))
+            title = re.sub(r'<[^>]+>', '', title)
+        headings.append((len(m.group(1)), title.strip("*# ").strip()))
+    for name, pattern in REQUIRED_SECTIONS:
+        if not any(re.search(pattern, title, re.IGNORECASE) for _, title in headings):
+            errors.append(("sections", f"bölüm eksik: {name}"))
+    faq = next((i for i, (_, title) in enumerate(headings)
+                if re.search(REQUIRED_SECTIONS[-1][1], title, re.IGNORECASE)), None)
+    if faq is not None:
+        level = headings[faq][0]
+        questions = 0
+        for sub_level, title in headings[faq + 1:]:
+            if sub_level <= level:
+                break
+            questions += title.endswith("?")
+        if questions < MIN_FAQ_QUESTIONS:
+            errors.append(("sections", f"FAQ'da {questions} soru (en az {MIN_FAQ_QUESTIONS})"))
+    
+    words = len(body.split())
+    if words < VALIDATION_MIN_WORDS:
+        errors.append(("length", f"{words} kelime (en az {VALIDATION_MIN_WORDS})"))
+    elif words > VALIDATION_MAX_WORDS:
+        warnings.append(("length", f"{words} kelime (hedef en fazla {VALIDATION_MAX_WORDS})"))
+    
+    for _, url in INTERNAL_LINK_RE.findall(prose):
+        fixed = check_internal_link(url, known, routes)
+        if fixed is not None:
+            errors.append(("links", f"kırık iç link: {url}" + (f" → {fixed}" if fixed else "")))
+    
+    # MDX'te "<" JSX, "{" ifade başlatır - düz metinde build'i kırar
+    for line in prose.split("\n"):
+        if re.search(r'<(?![A-Za-z/!])', line) or "{" in line or "}" in line:
+            errors.append(("mdx", f"MDX'i kıran karakter: {line.strip()[:60]}"))
+            break
+    
+    return {"slug": slug, "words": words, "errors": errors, "warnings": warnings}
+
+
+def repair_internal_links(text: str, known: dict, routes: Optional[set] = None,
+                          resolve: Optional[Callable[[str], Optional[str]]] = None) -> str:
+    """Kırık iç linkleri onar: yanlış kategori düzeltilir, var olmayan post'a
+    giden link resolve(etiket) bir post bulursa ona çevrilir, bulamazsa metne;
+    sadece linkten ibaret "Related" satırı silinir"""
+    routes = routes if routes is not None else site_routes()
+    resolved = {}
+    
+    def target(label: str, url: str) -> Optional[str]:
+        fixed = check_internal_link(url, known, routes)
+        if fixed == "" and resolve is not None:
+            if label not in resolved:
+                resolved[label] = resolve(label) or ""
+            fixed = resolved[label]
+        return fixed
+    
+    def fix(match):
+        label, url = match.group(1), match.group(2)
+        fixed = target(label, url)
+        if fixed is None:
+            return match.group(0)
+        if fixed:
+            return f"[{label}]({fixed})"
+        return re.sub(r'^Related:\s*', '', label)
+    
+    lines = []
+    for line in text.split("\n"):
+        links = INTERNAL_LINK_RE.findall(line)
+        broken = [url for label, url in links if target(label, url) == ""]
+        rest = INTERNAL_LINK_RE.sub("", line)
+        if links and len(broken) == len(links) and not re.sub(r'[\s\-*>_:|]', '', rest):
+            continue
+        lines.append(INTERNAL_LINK_RE.sub(fix, line))
+    return "\n".join(lines)
+
+
+def _validate_file(job: tuple) -> dict:
+    path, known, routes = job
+    return validate_article(path.read_text(encoding='utf-8'), path.stem, known, routes)
+
+
+def validate_posts(paths: List[Path], known: dict, workers: Optional[int] = None) -> List[dict]:
+    """Post'ları process pool'da paralel doğrula (tek dosyada pool açılmaz)"""
+    routes = site_routes()
+    jobs = [(path, known, routes) for path in paths]
+    if len(jobs) <= 1:
+        return [_validate_file(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_validate_file, jobs, chunksize=4))
+
+
+def print_validation_report(results: List[dict]) -> int:
+    """Sonuçları yazdır, hatalı makale sayısını döndür"""
+    for result in results:
+        status = "❌" if result["errors"] else "⚠️" if result["warnings"] else "✅"
+        print(f"{status} {result['slug']} ({result['words']} kelime)")
+        for _, message in result["errors"]:
+            print(f"    ❌ {message}")
+        for _, message in result["warnings"]:
+            print(f"    ⚠️ {message}")
+    failed = sum(1 for result in results if result["errors"])
+    print(f"📋 Doğrulama: {len(results) - failed}/{len(results)} geçti")
+    return failed
+
+
+# ============================================
+# TELEMETRY
+# ============================================
+
+TELEMETRY_DIR = CACHE_DIR / "telemetry"
+TELEMETRY_KEEP_RUNS = 30
+_telemetry_stage = contextvars.ContextVar("telemetry_stage", default=("-", None))
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Telemetry:
+    """Çağrı ve stage başına yapılandırılmış kayıt (JSONL) + run sonu özet
+    
+    - Olaylar: call (her model denemesi), cache_hit, stage (süre), run (özet)
+    - Key'in kendisi asla yazılmaz, sadece numarası (GEMINI_API_KEY_<n>)
+    - Dosya: TELEMETRY_DIR/<run_id>.jsonl, son TELEMETRY_KEEP_RUNS run saklanır
+    - GITHUB_STEP_SUMMARY varsa özet tablo Actions job sayfasına eklenir
+    - start() çağrılmadıysa hiçbir şey yazılmaz
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.run_id = None
+        self.path = None
+        self.events = []
+        self.started = 0.0
+    
+    def start(self, path: Optional[Path] = None):
+        self.run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.path = path or TELEMETRY_DIR / f"{self.run_id}.jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.events = []
+        self.started = time.monotonic()
+        self.enabled = True
+        if path is None:
+            for old in sorted(TELEMETRY_DIR.glob("*.jsonl"))[:-TELEMETRY_KEEP_RUNS]:
+                old.unlink()
+    
+    def emit(self, event: str, **fields):
+        if not self.enabled:
+            return
+        stage, slug = _telemetry_stage.get()
+        record = {"ts": round(time.time(), 3), "run": self.run_id, "event": event,
+                  "stage": stage, "slug": slug, **fields}
+        self.events.append(record)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    
+    @contextmanager
+    def stage(self, name: str, slug: Optional[str] = None):
+        """Bu blok içindeki çağrılar stage/slug ile etiketlenir, süre kaydedilir"""
+        token = _telemetry_stage.set((name, slug))
+        started = time.monotonic()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.emit("stage", duration_s=round(time.monotonic() - started, 3), ok=ok)
+            _telemetry_stage.reset(token)
+    
+    def summary(self) -> dict:
+        stages = {}
+        for e in self.events:
+            if e["event"] not in ("call", "cache_hit", "stage"):
+                continue
+            row = stages.setdefault(e["stage"], {
+                "calls": 0, "failed": 0, "cache_hits": 0, "latency": [], "prompt_tokens": 0,
+                "output_tokens": 0, "backoff_s": 0.0, "wait_s": 0.0, "runs": 0, "duration_s": 0.0})
+            if e["event"] == "cache_hit":
+                row["cache_hits"] += 1
+            elif e["event"] == "stage":
+                row["runs"] += 1
+                row["duration_s"] += e["duration_s"]
+            else:
+                row["calls"] += 1
+                row["failed"] += e["outcome"] != "ok"
+                row["latency"].append(e["latency_s"])
+                row["prompt_tokens"] += e.get("prompt_tokens") or 0
+                row["output_tokens"] += e.get("output_tokens") or 0
+                row["backoff_s"] += e.get("backoff_s", 0.0)
+                row["wait_s"] += e["wait_s"]
+        keys = {}
+        for e in self.events:
+            if e["event"] == "call":
+                key = keys.setdefault(e["key"], {"calls": 0, "failed": 0, "errors": {}})
+                key["calls"] += 1
+                if e["outcome"] != "ok":
+                    key["failed"] += 1
+                    key["errors"][e["outcome"]] = key["errors"].get(e["outcome"], 0) + 1
+        return {"stages": stages, "keys": keys, "elapsed_s": round(time.monotonic() - self.started, 3)}
+    
+    def _table(self, summary: dict) -> List[List[str]]:
+        rows = [["stage", "çalışma", "süre s", "çağrı", "hata", "cache", "p50 s", "p95 s",
+                 "giriş tok", "çıkış tok", "backoff s", "key bekleme s"]]
+        for name, row in summary["stages"].items():
+            rows.append([name, str(row["runs"]), f"{row['duration_s']:.1f}", str(row["calls"]),
+                         str(row["failed"]), str(row["cache_hits"]),
+                         f"{_percentile(row['latency'], 50):.1f}", f"{_percentile(row['latency'], 95):.1f}",
+                         str(row["prompt_tokens"]), str(row["output_tokens"]),
+                         f"{row['backoff_s']:.1f}", f"{row['wait_s']:.1f}"])
+        return rows
+    
+    def finish(self):
+        """run olayını yaz, özet tabloyu bas (ve Actions özetine ekle)"""
+        if not self.enabled:
+            return
+        summary = self.summary()
+        self.emit("run", elapsed_s=summary["elapsed_s"],
+                  keys={str(k): {"calls": v["calls"], "failed": v["failed"]} for k, v in summary["keys"].items()})
+        self.enabled = False
+        if not summary["stages"]:
+            return
+        
+        table = self._table(summary)
+        widths = [max(len(row[i]) for row in table) for i in range(len(table[0]))]
+        print(f"\n📈 Telemetri ({summary['elapsed_s']:.0f}s): {self.path}")
+        for row in table:
+            print("  ".join(cell.ljust(w) for cell, w in zip(row, widths)))
+        for index, key in sorted(summary["keys"].items()):
+            errors = ", ".join(f"{k}={v}" for k, v in key["errors"].items())
+            print(f"🔑 key {index}: {key['calls']} çağrı, {key['failed']} hata" + (f" ({errors})" if errors else ""))
+        
+        step_summary = os.environ.get("GITHUB_STEP_SUMMARY")
+        if step_summary:
+            lines = [f"### Content generation telemetry ({summary['elapsed_s']:.0f}s)", "",
+                     "| " + " | ".join(table[0]) + " |", "|" + "---|" * len(table[0])]
+            lines += ["| " + " | ".join(row) + " |" for row in table[1:]]
+            lines += ["", "| key | calls | failed |", "|---|---|---|"]
+            lines += [f"| {k} | {v['calls']} | {v['failed']} |" for k, v in sorted(summary["keys"].items())]
+            with open(step_summary, 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+
+
+TELEMETRY = Telemetry()
+
+
+# ============================================
+# GEMINI CONTENT GENERATION
+# ============================================
+
+SYSTEM_PROMPT = """You are the Chief Engineer at RetrofitAge.com, a world-class expert in Aging-in-Place technology with 25+ years of experience helping families make homes safer for seniors.
+
+WRITING STYLE:
+- Write like a real human expert, NOT AI
+- Use contractions naturally (it's, don't, we've, I've)
+- Include personal observations ("In my experience...", "I've seen...")
+- Vary sentence length - mix short punchy with longer explanatory
+- Add subtle humor and personality where appropriate
+- Use first person plural (we) when giving advice
+- Include specific numbers, measurements, prices (USD)
+- Reference real brands and products
+
+NEVER USE:
+- "In this article", "Welcome to", "Let's dive in"
+- "Without further ado", "In conclusion", "To summarize"
+- "Unleash", "Delve into", "Journey" metaphorically
+- Excessive exclamation marks
+- Robotic or overly formal tone"""
+
+
+HUMANIZATION_PROMPT = """Rewrite this article to sound more naturally human-written:
+
+1. Add personal touches - "I've found...", "In my experience...", "What we recommend..."
+2. Vary rhythm - mix short punchy sentences with longer ones
+3. Add conversational asides in parentheses where natural
+4. Include specific anecdotes ("I once worked with a family...")
+5. Use contractions throughout
+6. Add occasional hedging ("typically", "often", "in most cases")
+7. Remove any remaining AI-ish phrases
+
+Keep ALL technical content, markdown formatting, and structure intact.
+Return the full rewritten article:"""
+
+
+# Tek bir SDK çağrısı için üst süre (saniye), --timeout ile değişir
+REQUEST_TIMEOUT = 180.0
+
+
+MODEL_NAME = "gemini-2.0-flash"  # Fixed: 2.0-flash for text, 2.5 is for image gen
+GENERATION_CONFIG = {
+    "temperature": 0.8,
+    "top_p": 0.95,
+    "max_output_tokens": 8192,
+}
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Seçilen model backend'i kullanılamıyor (ör. SDK yüklü değil)"""
+
+
+class ModelProvider(ABC):
+    """Model backend arayüzü - create_model ve generate_with_retry sadece bunu görür
+    
+    get() generate_content_async(prompt, stream=False) metodu olan bir model
+    döndürür. Cevap .text ve (varsa) .usage_metadata taşır; stream=True'da
+    .text'li chunk'lar veren async iterator döner. Backend'in SDK'sı modül
+    yüklenirken değil, ilk get() çağrısında import edilir.
+    """
+    
+    name = ""
+    needs_key = True  # False: GEMINI_API_KEY_* olmadan çalışır
+    
+    @abstractmethod
+    def get(self, api_key: str, model_name: Optional[str] = None,
+            generation_config: Optional[dict] = None,
+            system_instruction: Optional[str] = None):
+        """Key'e bağlı model (eksik alt sınıf örneklenirken TypeError verir)"""
+    
+    def __len__(self) -> int:
+        return 0
+
+
+class ModelClientPool(ModelProvider):
+    """Gemini backend: key + generation config başına uzun ömürlü GenerativeModel havuzu
+    
+    - google.generativeai ilk modelde import edilir; yoksa ProviderUnavailableError
+      (çalışırken paket kurulmaz - scripts/requirements.txt)
+    - genai.configure (process-global) kullanılmaz; her key'in kendi
+      _ClientManager'ı ve ondan üretilen sync/async client'ları vardır.
+      Bunlar SDK'nın private API'si: sürüm requirements.txt'te sabit
+      (GEMINI_SDK_VERSION), eksikse ilk modelde ProviderUnavailableError
+    - Modeller ilk kullanımda oluşturulur, draft/humanize/topic çağrıları
+      arasında tekrar kullanılır
+    - gRPC async client'ları event loop'a bağlı olduğundan loop değişince
+      (ör. ardışık asyncio.run çağrıları) havuz sıfırlanır
+    """
+    
+    name = "gemini"
+    # _ClientManager / model._client / model._async_client bu sürümde doğrulandı
+    SDK_VERSION = "0.8.5"
+    
+    def __init__(self):
+        self._managers = {}
+        self._models = {}
+        self._loop = None
+    
+    @staticmethod
+    def _sdk():
+        try:
+            import google.generativeai as genai
+            from google.generativeai import client as genai_client
+        except ImportError as e:
+            raise ProviderUnavailableError(
+                "❌ google-generativeai yüklü değil: pip install -r scripts/requirements.txt") from e
+        if not hasattr(genai_client, "_ClientManager"):
+            ModelClientPool._unsupported(genai, "client._ClientManager")
+        return genai, genai_client
+    
+    @classmethod
+    def _unsupported(cls, genai, missing: str):
+        raise ProviderUnavailableError(
+            f"❌ google-generativeai {getattr(genai, '__version__', '?')} desteklenmiyor ({missing} yok): "
+            f"pip install google-generativeai=={cls.SDK_VERSION}")
+    
+    def _check_loop(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if loop is not self._loop:
+            self._managers.clear()
+            self._models.clear()
+            self._loop = loop
+    
+    def _manager(self, api_key: str):
+        manager = self._managers.get(api_key)
+        if manager is None:
+            _, genai_client = self._sdk()
+            manager = genai_client._ClientManager()
+            manager.configure(api_key=api_key)
+            self._managers[api_key] = manager
+        return manager
+    
+    def get(self, api_key: str, model_name: Optional[str] = None,
+            generation_config: Optional[dict] = None,
+            system_instruction: Optional[str] = None):
+        self._check_loop()
+        model_name = model_name or MODEL_NAME
+        generation_config = generation_config or GENERATION_CONFIG
+        system_instruction = system_instruction or SYSTEM_PROMPT
+        
+        pool_key = (api_key, model_name, json.dumps(generation_config, sort_keys=True),
+                    system_instruction)
+        model = self._models.get(pool_key)
+        if model is None:
+            genai, _ = self._sdk()
+            manager = self._manager(api_key)
+            model = genai.GenerativeModel(
+                model_name=model_name,
+                generation_config=generation_config,
+                system_instruction=system_instruction
+            )
+            # Çağrı key'e bağlanır, global default client'a hiç dokunulmaz.
+            # Atama eksik attribute'ta da sessizce geçer - model global client'ı kullanırdı
+            for attr in ("_client", "_async_client"):
+                if not hasattr(model, attr):
+                    self._unsupported(genai, f"GenerativeModel.{attr}")
+            model._client = manager.get_default_client("generative")
+            model._async_client = manager.get_default_client("generative_async")
+            self._models[pool_key] = model
+        return model
+    
+    def __len__(self) -> int:
+        return len(self._models)
+
+
+STUB_WORDS = """
+grab bars anchor into wall studs and should be checked twice a year by someone who knows the house
+most families start with the bathroom because wet floors cause the majority of falls at home
+a licensed contractor usually quotes a few thousand dollars for this kind of retrofit work
+aging eyes need much more light so brighter fixtures and night lights pay off quickly
+measure door widths first since wheelchairs need at least thirty two inches of clearance
+""".split()
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.usage_metadata = None
+
+
+class StubModel:
+    """Ağsız, deterministik cevaplar - prompt'un hash'inden üretilir"""
+    
+    def __init__(self, generation_config: dict):
+        self.generation_config = generation_config
+    
+    @staticmethod
+    def _words(seed: str, count: int) -> List[str]:
+        rng = random.Random(seed)
+        return [rng.choice(STUB_WORDS) for _ in range(count)]
+    
+    def _topics(self, prompt: str) -> str:
+        topics = []
+        for category, count in re.findall(r'^- ([a-z-]+): (\d+)$', prompt, re.MULTILINE):
+            for i in range(int(count)):
+                words = list(dict.fromkeys(self._words(f"{prompt}{category}{i}", 6)))[:4]
+                title = f"{' '.join(w.capitalize() for w in words)}: {category.replace('-', ' ').title()} Guide"
+                topics.append({"title": title, "slug": topic_slug(title), "keywords": words,
+                               "category": category,
+                               "outline": ["The Problem", "Solutions", "Cost Analysis", "FAQ", "Conclusion"]})
+        return json.dumps({"topics": topics})
+    
+    def _article(self, prompt: str) -> str:
+        match = re.search(r'FORMAT \(include frontmatter\):\n(---\n.*?\n---)', prompt, re.DOTALL)
+        if not match:
+            return "Stub response."
+        frontmatter = match.group(1).replace("[150-160 char meta description]",
+                                             "An offline stub article used for dry runs.")
+        per_section = VALIDATION_MIN_WORDS // 5 + 10
+        
+        def paragraph(seed: str) -> str:
+            return " ".join(self._words(prompt + seed, per_section)).capitalize() + "."
+        
+        lines = [frontmatter, "", paragraph("intro")]
+        for heading in ("Executive Summary", "The Problem", "Technical Solutions", "Cost Analysis"):
+            lines += ["", f"## {heading}", "", paragraph(heading)]
+        lines += ["", "## Frequently Asked Questions"]
+        for i in range(4):
+            lines += ["", f"### Stub question {i + 1}?", "", " ".join(self._words(f"{prompt}q{i}", 20)) + "."]
+        lines += ["", "## Conclusion", "", " ".join(self._words(prompt + "end", 40)) + "."]
+        return "\n".join(lines) + "\n"
+    
+    def respond(self, prompt: str) -> str:
+        if self.generation_config.get("response_mime_type") == "application/json":
+            return self._topics(prompt)
+        if prompt.startswith((HUMANIZATION_PROMPT, SECTION_HUMANIZATION_PROMPT,
+                              PARAGRAPH_HUMANIZATION_PROMPT)):
+            return prompt.split("\n\n---\n\n", 1)[1]
+        if prompt.startswith(REFRESH_PROMPT.split("{year}")[0]):
+            # Yıl devri: bir önceki yıl bu yıla
+            year = datetime.now().year
+            return prompt.split("\n\n---\n\n", 1)[1].replace(str(year - 1), str(year))
+        return self._article(prompt)
+    
+    async def generate_content_async(self, prompt: str, stream: bool = False, **kwargs):
+        text = self.respond(prompt)
+        if not stream:
+            return StubResponse(text)
+        return StubStream(text)
+
+
+class StubStream(StubResponse):
+    async def __aiter__(self):
+        for i in range(0, len(self.text), 256):
+            yield StubResponse(self.text[i:i + 256])
+
+
+class StubProvider(ModelProvider):
+    """Offline backend (--provider stub): SDK'sız, ağsız, key'siz kuru çalıştırma
+    
+    Taslak doğrulama kapısını geçen iskelet bir makale, humanize girdinin
+    aynısı, konu batch'i şemaya uyan JSON döner. main() stub'la tüm çıktıyı
+    --output dizinine (varsayılan: temp dizin) yönlendirir, git'e dokunmaz -
+    repo'daki içerik değişmez.
+    """
+    
+    name = "stub"
+    needs_key = False
+    
+    def get(self, api_key: str, model_name: Optional[str] = None,
+            generation_config: Optional[dict] = None,
+            system_instruction: Optional[str] = None):
+        return StubModel(generation_config or GENERATION_CONFIG)
+
+
+# Yeni backend: ModelProvider alt sınıfı + buraya kayıt
+MODEL_PROVIDERS = {
+    "gemini": ModelClientPool,
+    "stub": StubProvider,
+}
+
+MODEL_POOL = ModelClientPool()
+
+
+def select_provider(name: str) -> ModelProvider:
+    """MODEL_POOL'u adı verilen backend'le değiştir"""
+    global MODEL_POOL
+    if name not in MODEL_PROVIDERS:
+        raise ValueError(f"❌ Bilinmeyen provider: {name} ({', '.join(MODEL_PROVIDERS)})")
+    if MODEL_POOL.name != name:
+        MODEL_POOL = MODEL_PROVIDERS[name]()
+    return MODEL_POOL
+
+
+def create_model(api_key: str, generation_config: Optional[dict] = None):
+    """Key'e bağlı, havuzdan tekrar kullanılan model"""
+    return MODEL_POOL.get(api_key, generation_config=generation_config)
+
+
+def get_unsplash_image(keywords: List[str], category: str, seed: Optional[str] = None) -> str:
+    """Unsplash'tan konuya uygun görsel URL'i oluştur
+    
+    seed (slug) verilirse seçim deterministik olur - aynı konu için prompt
+    değişmez ve response cache'i tekrar çalıştırmalarda isabet eder.
+    """
+    # Kategori bazlı önceden seçilmiş yüksek kaliteli Unsplash fotoğrafları
+    # Her kategoride 5 farklı görsel - rotasyonla kullanılacak
+    category_images = {
+        "bathroom-safety": [
+            "https://images.unsplash.com/photo-1552321554-5fefe8c9ef14?w=1200&h=630&fit=crop&q=80",  # Modern bathroom
+            "https://images.unsplash.com/photo-1584622650111-993a426fbf0a?w=1200&h=630&fit=crop&q=80",  # Clean bathroom
+            "https://images.unsplash.com/photo-1620626011761-996317b8d101?w=1200&h=630&fit=crop&q=80",  # Bathroom interior
+            "https://images.unsplash.com/photo-1507652313519-d4e9174996dd?w=1200&h=630&fit=crop&q=80",  # Spa bathroom
+            "https://images.unsplash.com/photo-1600566752355-35792bedcfea?w=1200&h=630&fit=crop&q=80",  # Luxury bath
+        ],
+        "smart-home": [
+            "https://images.unsplash.com/photo-1558002038-1055907df827?w=1200&h=630&fit=crop&q=80",  # Smart speaker
+            "https://images.unsplash.com/photo-1556909114-f6e7ad7d3136?w=1200&h=630&fit=crop&q=80",  # Home automation
+            "https://images.unsplash.com/photo-1585503418537-88331351ad99?w=1200&h=630&fit=crop&q=80",  # Smart devices
+            "https://images.unsplash.com/photo-1593359677879-a4bb92f829d1?w=1200&h=630&fit=crop&q=80",  # Living room tech
+            "https://images.unsplash.com/photo-1518455027359-f3f8164ba6bd?w=1200&h=630&fit=crop&q=80",  # Smart home setup
+        ],
+        "smart-monitoring": [
+            "https://images.unsplash.com/photo-1576091160550-2173dba999ef?w=1200&h=630&fit=crop&q=80",  # Health tech
+            "https://images.unsplash.com/photo-1551288049-bebda4e38f71?w=1200&h=630&fit=crop&q=80",  # Dashboard
+            "https://images.unsplash.com/photo-1559757175-5700dde675bc?w=1200&h=630&fit=crop&q=80",  # Medical device
+            "https://images.unsplash.com/photo-1576671081837-49000212a370?w=1200&h=630&fit=crop&q=80",  # Health monitor
+            "https://images.unsplash.com/photo-1434494878577-86c23bcb06b9?w=1200&h=630&fit=crop&q=80",  # Smartwatch
+        ],
+        "finance-insurance": [
+            "https://images.unsplash.com/photo-1554224155-6726b3ff858f?w=1200&h=630&fit=crop&q=80",  # Financial planning
+            "https://images.unsplash.com/photo-1450101499163-c8848c66ca85?w=1200&h=630&fit=crop&q=80",  # Documents
+            "https://images.unsplash.com/photo-1554224154-26032ffc0d07?w=1200&h=630&fit=crop&q=80",  # Calculator
+            "https://images.unsplash.com/photo-1563013544-824ae1b704d3?w=1200&h=630&fit=crop&q=80",  # Insurance
+            "https://images.unsplash.com/photo-1579621970563-ebec7560ff3e?w=1200&h=630&fit=crop&q=80",  # Money planning
+        ],
+        "finance": [
+            "https://images.unsplash.com/photo-1579621970563-ebec7560ff3e?w=1200&h=630&fit=crop&q=80",  # Savings
+            "https://images.unsplash.com/photo-1554224155-6726b3ff858f?w=1200&h=630&fit=crop&q=80",  # Planning
+            "https://images.unsplash.com/photo-1553729459-efe14ef6055d?w=1200&h=630&fit=crop&q=80",  # Money
+            "https://images.unsplash.com/photo-1518458028785-8fbcd101ebb9?w=1200&h=630&fit=crop&q=80",  # Home investment
+            "https://images.unsplash.com/photo-1560472355-536de3962603?w=1200&h=630&fit=crop&q=80",  # Budget
+        ],
+        "structural-retrofit": [
+            "https://images.unsplash.com/photo-1581578731548-c64695cc6952?w=1200&h=630&fit=crop&q=80",  # Construction
+            "https://images.unsplash.com/photo-1504307651254-35680f356dfd?w=1200&h=630&fit=crop&q=80",  # Renovation
+            "https://images.unsplash.com/photo-1585128792020-803d29415281?w=1200&h=630&fit=crop&q=80",  # Home improvement
+            "https://images.unsplash.com/photo-1523413363574-c30aa1c2a516?w=1200&h=630&fit=crop&q=80",  # Tools
+            "https://images.unsplash.com/photo-1558618666-fcd25c85cd64?w=1200&h=630&fit=crop&q=80",  # Building
+        ],
+        "housing-options": [
+            "https://images.unsplash.com/photo-1564013799919-ab600027ffc6?w=1200&h=630&fit=crop&q=80",  # Modern house
+            "https://images.unsplash.com/photo-1518780664697-55e3ad937233?w=1200&h=630&fit=crop&q=80",  # Family home
+            "https://images.unsplash.com/photo-1449844908441-8829872d2607?w=1200&h=630&fit=crop&q=80",  # Cottage
+            "https://images.unsplash.com/photo-1512917774080-9991f1c4c750?w=1200&h=630&fit=crop&q=80",  # Luxury home
+            "https://images.unsplash.com/photo-1480074568708-e7b720bb3f09?w=1200&h=630&fit=crop&q=80",  # Cozy house
+        ],
+        "kitchen-safety": [
+            "https://images.unsplash.com/photo-1556909114-f6e7ad7d3136?w=1200&h=630&fit=crop&q=80",  # Modern kitchen
+            "https://images.unsplash.com/photo-1556909172-54557c7e4fb7?w=1200&h=630&fit=crop&q=80",  # Clean kitchen
+            "https://images.unsplash.com/photo-1565538810643-b5bdb714032a?w=1200&h=630&fit=crop&q=80",  # Kitchen interior
+            "https://images.unsplash.com/photo-1507089947368-19c1da9775ae?w=1200&h=630&fit=crop&q=80",  # Cooking
             "https://images.unsplash.com/photo-1600585154340-be6161a56a0c?w=1200&h=630&fit=crop&q=80",  # Home kitchen
         ],
         "electrical-lighting": [
@@ -334,266 +2639,1985 @@ def get_unsplash_image(keywords: List[str], category: str) -> str:
         ],
     }
     
-    # Varsayılan görseller
-    default_images = [
-        "https://images.unsplash.com/photo-1600585154340-be6161a56a0c?w=1200&h=630&fit=crop&q=80",
-        "https://images.unsplash.com/photo-1502672260266-1c1ef2d93688?w=1200&h=630&fit=crop&q=80",
-        "https://images.unsplash.com/photo-1484154218962-a197022b5858?w=1200&h=630&fit=crop&q=80",
-    ]
+    # Varsayılan görseller
+    default_images = [
+        "https://images.unsplash.com/photo-1600585154340-be6161a56a0c?w=1200&h=630&fit=crop&q=80",
+        "https://images.unsplash.com/photo-1502672260266-1c1ef2d93688?w=1200&h=630&fit=crop&q=80",
+        "https://images.unsplash.com/photo-1484154218962-a197022b5858?w=1200&h=630&fit=crop&q=80",
+    ]
+    
+    # Kategoriye göre görsel seç
+    images = category_images.get(category, default_images)
+    
+    if seed:
+        idx = int(hashlib.sha256(seed.encode()).hexdigest(), 16) % len(images)
+        return images[idx]
+    
+    # Rastgele birini seç
+    return random.choice(images)
+
+
+def internal_links_instruction(topic: dict) -> str:
+    """Var olan en ilgili post'lar - model link uydurmasın"""
+    related = related_index().related(topic)
+    if not related:
+        return "- No internal links to other articles (none are related yet)"
+    links = "\n".join(f"  - [Related: {post['title']}]({post['url']})" for post in related)
+    return f"- Internal links: 2-3 of these existing articles where relevant, URLs exactly as given:\n{links}"
+
+
+def generate_article_prompt(topic: dict) -> str:
+    # Görsel URL'i oluştur
+    image_url = get_unsplash_image(topic.get('keywords', []), topic.get('category', 'general'),
+                                   seed=topic.get('slug'))
+    
+    return f"""Write a comprehensive, SEO-optimized blog post about: "{topic['title']}"
+
+TARGET KEYWORDS: {', '.join(topic.get('keywords', []))}
+CATEGORY: {topic.get('category', 'general')}
+
+FORMAT (include frontmatter):
+---
+title: "{topic['title']}"
+description: "[150-160 char meta description]"
+date: "{datetime.now().strftime('%Y-%m-%d')}"
+category: "{topic.get('category', 'general')}"
+tags: {json.dumps(topic.get('keywords', [])[:5])}
+author: "RetrofitAge Engineering Team"
+image: "{image_url}"
+featured: false
+---
+
+[Article in Markdown]
+
+REQUIRED STRUCTURE:
+1. **Hook paragraph** - Engaging opener, NOT generic intro
+2. **Executive Summary** - 4-5 bullet points with ✓
+3. **The Problem** - Why this matters for senior safety
+4. **Technical Solutions** - Compare products/methods, pros & cons
+5. **Cost Analysis** - USD prices, breakdown table
+6. **Installation Guide** - Step-by-step OR when to hire pro
+7. **FAQ Section** - 4 questions as H3 under H2 "Frequently Asked Questions"
+8. **Conclusion** - Strong CTA, not generic
+
+MUST INCLUDE:
+- Comparison table (markdown)
+- Safety callouts: > **Safety Note:** ...
+{internal_links_instruction(topic)}
+- Word count: 1800-2200 words
+- American English
+
+Write now as a seasoned professional sharing hard-earned knowledge:"""
+
+
+async def generate_with_retry(key_manager: APIKeyManager, prompt: str, max_retries: Optional[int] = None,
+                              timeout: Optional[float] = None, use_cache: bool = True,
+                              sink_factory: Optional[Callable[[], "MDXStreamWriter"]] = None,
+                              key_pool: Optional[List[int]] = None,
+                              policy: Optional[RetryPolicy] = None,
+                              generation_config: Optional[dict] = None) -> str:
+    """Retry ve key rotation ile Gemini çağır (RETRY_POLICY)
+    
+    Özellikler:
+    - SDK'nın async API'si (generate_content_async), event loop bloklanmaz
+    - Her deneme için timeout (varsayılan REQUEST_TIMEOUT, deadline'a kırpılır)
+    - 5xx: sunucu süresi ya da full jitter backoff, key'in circuit breaker'ı sayar
+    - 429: key sunucunun verdiği süre kadar cooldown'a, günlük kota bittiyse gün boyu;
+      scheduler sıradaki uygun key'i verir
+    - İstek/run deadline'ı aşılacaksa beklemeden RetryDeadlineError
+    - Aynı provider/model/config/prompt için disk cache (RESPONSE_CACHE), kota harcanmaz
+    - sink_factory verilirse streaming: her deneme yeni bir MDXStreamWriter alır,
+      bozuk çıktı tamamlanmayı beklemeden kesilir ve yeniden denenir
+    - key_pool verilirse sadece o key'ler kullanılır (stage başına havuz)
+    - generation_config verilirse (ör. JSON şemalı çıktı) model o config'le alınır
+    
+    Çağıran taraf asyncio.wait_for veya task.cancel() ile iptal edebilir.
+    """
+    policy = policy or RETRY_POLICY
+    max_retries = policy.max_attempts if max_retries is None else max_retries
+    timeout = timeout or REQUEST_TIMEOUT
+    last_error = None
+    
+    generation_config = generation_config or GENERATION_CONFIG
+    cache_key = response_cache_key(MODEL_POOL.name, MODEL_NAME, generation_config, SYSTEM_PROMPT, prompt)
+    if use_cache:
+        cached = RESPONSE_CACHE.get(cache_key)
+        if cached is not None and sink_factory is not None:
+            sink = sink_factory()
+            try:
+                sink.feed(cached)
+                cached = sink.finish()
+            except MalformedOutputError:
+                sink.abort()
+                cached = None
+        if cached is not None:
+            print("💾 Cache'den alındı")
+            TELEMETRY.emit("cache_hit")
+            return cached
+    
+    est_tokens = estimate_tokens(prompt) + 4096
+    deadline = policy.deadline()
+    policy.check(deadline)
+    
+    for attempt in range(max_retries):
+        wait_started = time.monotonic()
+        api_key = await key_manager.acquire(est_tokens, key_pool, deadline)
+        started = time.monotonic()
+        tokens_used = None
+        call = {"attempt": attempt + 1, "key": key_manager._state(api_key).index + 1,
+                "stream": sink_factory is not None, "wait_s": round(started - wait_started, 3),
+                "prompt_tokens": estimate_tokens(prompt), "output_tokens": None,
+                "outcome": "cancelled", "error": None}
+        attempt_timeout = timeout if deadline is None else max(0.0, min(timeout, deadline - started))
+        
+        try:
+            model = create_model(api_key, generation_config)
+            if sink_factory is None:
+                response = await asyncio.wait_for(model.generate_content_async(prompt), attempt_timeout)
+                text = response.text
+            else:
+                response, text = await asyncio.wait_for(
+                    stream_into(model, prompt, sink_factory()), attempt_timeout)
+            usage = getattr(response, "usage_metadata", None)
+            tokens_used = getattr(usage, "total_token_count", None) or est_tokens
+            call["prompt_tokens"] = getattr(usage, "prompt_token_count", None) or call["prompt_tokens"]
+            call["output_tokens"] = getattr(usage, "candidates_token_count", None) or estimate_tokens(text)
+            call["outcome"] = "ok"
+            key_manager.record_success(api_key)
+            RESPONSE_CACHE.put(cache_key, text)
+            return text
+        
+        except MalformedOutputError as e:
+            last_error = e
+            call.update(outcome="malformed", error=type(e).__name__)
+            print(f"⚠️ Bozuk çıktı, stream kesildi: {e} (deneme {attempt + 1}/{max_retries})")
+            continue
+            
+        except Exception as e:
+            last_error = e
+            kind = policy.classify(e)
+            call.update(outcome=kind, error=type(e).__name__)
+            
+            if kind == TIMEOUT:
+                key_manager.record_failure(api_key)
+                print(f"⚠️ İstek {attempt_timeout:.0f}s içinde yanıtlanmadı, tekrar deneniyor... (deneme {attempt + 1}/{max_retries})")
+                continue
+            
+            # 5xx - sunucu süresi ya da full jitter, deadline'ı aşacaksa hiç bekleme
+            if kind == OVERLOADED:
+                key_manager.record_failure(api_key)
+                retry_after = policy.retry_after(e)
+                wait_time = retry_after if retry_after is not None else policy.backoff(attempt)
+                policy.check(deadline, wait_time)
+                call.update(retry_after_s=retry_after, backoff_s=round(wait_time, 3))
+                print(f"⚠️ API geçici olarak aşırı yüklü ({policy.status_code(e) or type(e).__name__}), {wait_time:.1f}s bekleniyor... (deneme {attempt + 1}/{max_retries})")
+                await asyncio.sleep(wait_time)
+                continue
+            
+            # 429 - key cooldown, scheduler sıradaki uygun key'i verir
+            if kind == RATE_LIMITED:
+                if policy.daily_quota(e):
+                    key_manager.mark_day_exhausted(api_key)
+                else:
+                    retry_after = policy.retry_after(e)
+                    call["retry_after_s"] = retry_after
+                    key_manager.mark_exhausted(api_key, retry_after)
+                print(f"⚠️ Rate limit, key değiştiriliyor... (deneme {attempt + 1}/{max_retries})")
+                continue
+            
+            # Diğer hatalar - Direkt fırlat
+            print(f"❌ Beklenmeyen hata: {e}")
+            raise e
+        
+        finally:
+            key_manager.release(api_key, tokens_used, est_tokens)
+            call["latency_s"] = round(time.monotonic() - started - call.get("backoff_s", 0), 3)
+            TELEMETRY.emit("call", **call)
+    
+    raise last_error or RetryDeadlineError(f"❌ Hiç deneme yapılmadı (max_retries={max_retries})")
+
+
+# Yanıtın başında atılacak preamble ifadeleri
+PREAMBLE_PHRASES = [
+    'here is the rewritten',
+    'here\'s the rewritten',
+    'here is the article',
+    'here\'s the article',
+    'chief',
+    'adopting the persona',
+]
+
+
+def clean_gemini_preamble(text: str) -> str:
+    """Gemini'nin yanıtın başına eklediği preamble metinlerini temizle"""
+    lines = text.split('\n')
+    
+    # Başta gereksiz metinleri at
+    skip_phrases = PREAMBLE_PHRASES
+    
+    start_idx = 0
+    for i, line in enumerate(lines):
+        lower_line = line.lower().strip()
+        # Skip empty lines and preamble phrases
+        if not lower_line:
+            continue
+        if any(phrase in lower_line for phrase in skip_phrases):
+            start_idx = i + 1
+            continue
+        # Frontmatter başladıysa orada kes
+        if lower_line == '---':
+            start_idx = i
+            break
+        # Normal içerik başladıysa orada kes
+        if lower_line and not any(phrase in lower_line for phrase in skip_phrases):
+            start_idx = i
+            break
+    
+    cleaned_lines = lines[start_idx:]
+    return '\n'.join(cleaned_lines).strip()
+
+
+# ============================================
+# SECTION HUMANIZATION (--section-humanize)
+# ============================================
+
+# Taslak H2'lerden bölünür, bölümler paralel humanize edilir
+SECTION_HUMANIZE = os.environ.get("HUMANIZE_SECTIONS", "") == "1"
+SECTION_RETRIES = 2  # placeholder/başlık kaybeden bölüm için ek deneme
+
+SECTION_HUMANIZATION_PROMPT = """Rewrite this SECTION of a longer article to sound more naturally human-written:
+
+1. Add personal touches - "I've found...", "In my experience...", "What we recommend..."
+2. Vary rhythm - mix short punchy sentences with longer ones
+3. Use contractions throughout, add occasional hedging ("typically", "often")
+4. Remove any remaining AI-ish phrases
+
+RULES:
+- Keep the first line (the heading) exactly as it is, if there is one
+- Keep every [[KEEP-n]] line exactly as it is, on its own line, in the same order
+- Keep all facts, numbers, links and markdown formatting
+- Return ONLY the rewritten section, nothing before or after it"""
+
+KEEP_RE = re.compile(r'^\[\[KEEP-(\d+)\]\]$', re.MULTILINE)
+
+
+def _protected_line(line: str) -> bool:
+    """Birebir korunacak satırlar: tablo, callout, JSX/HTML bloğu"""
+    stripped = line.lstrip()
+    return stripped.startswith(('|', '>', '<'))
+
+
+def _heading_lines(lines: List[str]):
+    """Code fence dışındaki (satır no, başlık seviyesi) çiftleri"""
+    in_fence = False
+    for i, line in enumerate(lines):
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+            continue
+        match = re.match(r'^(#{2,6}) ', line)
+        if match and not in_fence:
+            yield i, len(match.group(1))
+
+
+def split_sections(text: str) -> tuple:
+    """(frontmatter, [bölüm]) - bölümler H2 satırlarından başlar, ilki giriş paragrafı
+    
+    Taslakta H2 yoksa en üst seviye başlık (ör. ###) kullanılır. Code fence
+    içindeki satırlar bölmez. frontmatter + ''.join(bölümler) == text.
+    """
+    match = FRONTMATTER_RE.match(text)
+    frontmatter = text[:match.end()] if match else ""
+    lines = text[len(frontmatter):].splitlines(keepends=True)
+    headings = list(_heading_lines(lines))
+    level = min((lvl for _, lvl in headings), default=2)
+    starts = {i for i, lvl in headings if lvl == level}
+    
+    sections = [""]
+    for i, line in enumerate(lines):
+        if i in starts and sections[-1].strip():
+            sections.append("")
+        sections[-1] += line
+    return frontmatter, [section for section in sections if section]
+
+
+def _strip_section_preamble(text: str) -> str:
+    """Başlıksız bölümde "Here's the rewritten section:" gibi giriş satırlarını at"""
+    lines = text.split('\n')
+    while len(lines) > 1 and (not lines[0].strip() or lines[0].strip().endswith(':')):
+        lines.pop(0)
+    return '\n'.join(lines)
+
+
+def protect_blocks(section: str) -> tuple:
+    """Tablo/callout/kod/JSX bloklarını [[KEEP-n]] satırlarıyla değiştir → (metin, bloklar)"""
+    out, blocks, block = [], [], []
+    in_fence = False
+    
+    def flush():
+        if block:
+            out.append(f"[[KEEP-{len(blocks)}]]\n")
+            blocks.append("".join(block))
+            block.clear()
+    
+    for line in section.splitlines(keepends=True):
+        fence = line.lstrip().startswith('```')
+        if in_fence or fence or _protected_line(line):
+            block.append(line)
+            if fence:
+                in_fence = not in_fence
+            continue
+        flush()
+        out.append(line)
+    flush()
+    return "".join(out), blocks
+
+
+def restore_blocks(section: str, original: str, blocks: List[str]) -> str:
+    """Humanize çıktısını doğrula ve korunan blokları geri koy
+    
+    Başlık satırı değişmiş ya da placeholder eksik/sırası bozuksa MalformedOutputError.
+    """
+    heading = original.split('\n', 1)[0] if re.match(r'#{2,6} ', original) else None
+    section = section.strip()
+    if heading is not None:
+        start = section.find(heading)
+        if start < 0:
+            raise MalformedOutputError(f"bölüm başlığı kayboldu: {heading}")
+        section = section[start:]
+    else:
+        section = _strip_section_preamble(section)
+    
+    found = [int(n) for n in KEEP_RE.findall(section)]
+    if found != list(range(len(blocks))):
+        raise MalformedOutputError(f"korunan bloklar bozuldu: {found} != {len(blocks)}")
+    section = KEEP_RE.sub(lambda m: blocks[int(m.group(1))].rstrip('\n'), section)
+    
+    # Bölümler arası boşluk orijinaldeki gibi kalsın
+    return section + original[len(original.rstrip()):]
+
+
+async def humanize_section(key_manager: APIKeyManager, section: str,
+                           key_pool: Optional[List[int]] = None, use_cache: bool = True) -> str:
+    """Tek bölümü humanize et; bozuk çıktıda sadece bu bölüm tekrar denenir"""
+    protected, blocks = protect_blocks(section)
+    prompt = f"{SECTION_HUMANIZATION_PROMPT}\n\n---\n\n{protected.strip()}"
+    for attempt in range(SECTION_RETRIES + 1):
+        text = await generate_with_retry(key_manager, prompt, key_pool=key_pool,
+                                         use_cache=use_cache and attempt == 0)
+        try:
+            return restore_blocks(text, section, blocks)
+        except MalformedOutputError as e:
+            print(f"⚠️ Bölüm tekrar humanize ediliyor: {e} (deneme {attempt + 1}/{SECTION_RETRIES + 1})")
+    print(f"⚠️ Bölüm taslaktaki haliyle bırakıldı: {section.split(chr(10), 1)[0][:60]}")
+    return section
+
+
+async def humanize_sections(key_manager: APIKeyManager, checkpoint: dict,
+                            key_pool: Optional[List[int]] = None, use_cache: bool = True) -> str:
+    """Taslağı H2 bölümlerine ayırıp paralel humanize et, sırayla birleştir
+    
+    - Frontmatter modele hiç gitmez; tablo/callout/kod blokları birebir korunur
+    - Süre tüm makale yerine en uzun bölüm kadar
+    - Biten bölümler checkpoint["sections"]'a yazılır: hata/--resume'da
+      sadece eksik bölümler tekrar üretilir
+    - İlk hatada bekleyen bölümler iptal edilir
+    """
+    frontmatter, sections = split_sections(clean_gemini_preamble(checkpoint["draft"]))
+    done = checkpoint.setdefault("sections", {})
+    
+    async def run(i: int, section: str):
+        if str(i) in done:
+            return
+        done[str(i)] = await humanize_section(key_manager, section, key_pool, use_cache)
+        save_checkpoint(checkpoint)
+    
+    print(f"🧩 {len(sections)} bölüm paralel humanize ediliyor")
+    tasks = [asyncio.create_task(run(i, section)) for i, section in enumerate(sections)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # Bir bölüm başarısızsa makale zaten yarım: diğerleri kota harcamasın
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    text = frontmatter + "".join(done[str(i)] for i in range(len(sections)))
+    del checkpoint["sections"]
+    return text
+
+
+# ============================================
+# AI PHRASE DETECTOR (HUMANIZE_MODE=auto)
+# ============================================
+
+# "auto": taslak lokal puanlanır - temizse humanize atlanır, birkaç paragraf
+# sorunluysa sadece onlar humanize edilir; "full": her zaman tüm makale
+HUMANIZE_MODES = ("auto", "full")
+HUMANIZE_MODE = os.environ.get("HUMANIZE_MODE", "auto")
+
+# Ek ifade listesi (satır başına bir ifade, # yorum); SYSTEM_PROMPT'taki NEVER USE listesi her zaman dahil
+AI_PHRASES_FILE = Path(os.environ.get("AI_PHRASES_FILE", SCRIPTS_DIR / "ai-phrases.txt"))
+
+# Stil eşikleri: cümle uzunluğu varyasyon katsayısı (std/ortalama), 100 kelimede
+# kısaltma (it's, don't), 1000 kelimede ünlem
+HUMANIZE_MIN_SENTENCE_CV = float(os.environ.get("HUMANIZE_MIN_SENTENCE_CV", "0.4"))
+HUMANIZE_MIN_CONTRACTIONS = float(os.environ.get("HUMANIZE_MIN_CONTRACTIONS", "0.8"))
+HUMANIZE_MAX_EXCLAMATIONS = float(os.environ.get("HUMANIZE_MAX_EXCLAMATIONS", "3"))
+# Bundan fazla paragraf sorunluysa tam humanize (tek çağrı zaten, çıktı da tutarlı kalır)
+HUMANIZE_MAX_PARAGRAPHS = int(os.environ.get("HUMANIZE_MAX_PARAGRAPHS", "6"))
+STYLE_MIN_SENTENCES = 8  # daha kısa metinde varyans/oran güvenilmez
+STYLE_PENALTY = 5        # eşiği aşan her stil metriği puana bu kadar ekler
+
+PARAGRAPH_HUMANIZATION_PROMPT = """Rewrite these paragraphs from a longer article to sound more naturally human-written:
+
+1. Replace AI-ish phrases with plain, specific wording
+2. Vary rhythm - mix short punchy sentences with longer ones
+3. Use contractions where natural
+
+RULES:
+- Keep every [[PARA-n]] line exactly as it is, followed by its rewritten paragraph, in the same order
+- Keep all facts, numbers, links and markdown formatting
+- Return ONLY the marker lines and paragraphs, nothing before or after them"""
+
+PARA_RE = re.compile(r'^\[\[PARA-(\d+)\]\]$', re.MULTILINE)
+LIST_ITEM_RE = re.compile(r'^\s*(?:[-*+]|\d+[.)]|✓)\s')
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+(?=["“(]?[A-Z0-9$])')
+CONTRACTION_RE = re.compile(
+    r"\b(?:[a-z]+n't|(?:i|you|we|they|he|she|it|that|there|here|what|who|let)'(?:s|re|ve|ll|d|m))\b")
+MARKDOWN_LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+
+
+class PhraseMatcher:
+    """Aho-Corasick: tüm ifadeler metinde tek geçişte aranır
+    
+    Küçük harfe çevrilmiş metinde çalışır; sadece tam kelime eşleşmeleri sayılır
+    ("unleash" "unleashed" içinde bulunmaz).
+    """
+    
+    def __init__(self, phrases: List[str]):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for phrase in phrases:
+            node = 0
+            for ch in phrase:
+                if ch not in self.goto[node]:
+                    self.goto[node][ch] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = self.goto[node][ch]
+            self.out[node].append(phrase)
+        
+        # BFS: fail linki bir üst seviyedeki düğümlerden hesaplanır
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                fail = self.fail[node]
+                while fail and ch not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[child] = self.goto[fail].get(ch, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+    
+    def findall(self, text: str) -> List[str]:
+        """Metindeki (küçük harf, tek boşluklu) tam kelime eşleşmeleri, sırayla"""
+        found = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for phrase in self.out[node]:
+                start, end = i - len(phrase) + 1, i + 1
+                if ((start == 0 or not (text[start - 1].isalnum() and phrase[0].isalnum()))
+                        and (end == len(text) or not (text[end].isalnum() and phrase[-1].isalnum()))):
+                    found.append(phrase)
+        return found
+
+
+def normalize_phrase(text: str) -> str:
+    return " ".join(text.replace("’", "'").lower().split())
+
+
+def load_ai_phrases() -> List[str]:
+    """SYSTEM_PROMPT'taki NEVER USE ifadeleri + AI_PHRASES_FILE"""
+    phrases = re.findall(r'"([^"]+)"', SYSTEM_PROMPT.split("NEVER USE:", 1)[1])
+    if AI_PHRASES_FILE.exists():
+        for line in AI_PHRASES_FILE.read_text(encoding='utf-8').splitlines():
+            if line.strip() and not line.lstrip().startswith('#'):
+                phrases.append(line)
+    return list(dict.fromkeys(filter(None, map(normalize_phrase, phrases))))
+
+
+_phrase_matcher = None
+
+
+def phrase_matcher() -> PhraseMatcher:
+    """Otomat süreç başına bir kez kurulur"""
+    global _phrase_matcher
+    if _phrase_matcher is None:
+        _phrase_matcher = PhraseMatcher(load_ai_phrases())
+    return _phrase_matcher
+
+
+def split_blocks(text: str) -> tuple:
+    """(frontmatter, [blok]) - gövde boş satırlardan bölünür, boş satırlar önceki bloğa eklenir
+    
+    Code fence içindeki boş satırlar bölmez. frontmatter + ''.join(bloklar) == text.
+    """
+    match = FRONTMATTER_RE.match(text)
+    frontmatter = text[:match.end()] if match else ""
+    blocks, closed, in_fence = [], True, False
+    for line in text[len(frontmatter):].splitlines(keepends=True):
+        if not line.strip() and not in_fence:
+            if blocks:
+                blocks[-1] += line
+            else:
+                blocks.append(line)
+            closed = True
+            continue
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+        if closed:
+            blocks.append("")
+            closed = False
+        blocks[-1] += line
+    return frontmatter, blocks
+
+
+def block_kind(block: str) -> Optional[str]:
+    """"prose" / "list" - başlık, tablo, callout, JSX ve kod içeren bloklar None"""
+    lines = block.strip().splitlines()
+    if not lines or any(line.lstrip().startswith(('```', '#')) or _protected_line(line) for line in lines):
+        return None
+    return "list" if LIST_ITEM_RE.match(lines[0]) else "prose"
+
+
+def plain_text(block: str) -> str:
+    """Markdown işaretleri atılmış, küçük harf, tek boşluklu metin"""
+    text = MARKDOWN_LINK_RE.sub(r'\1', block)
+    return normalize_phrase(re.sub(r'[*_`]', '', text))
+
+
+def ai_style_report(text: str) -> dict:
+    """Taslağın lokal AI-üslup raporu (LLM çağrısı yok)
+    
+    - phrases: yasak ifade → adet (Aho-Corasick, tek geçiş; düzyazı ve listelerde)
+    - sentence_cv: düzyazıda cümle uzunluğu std/ortalama (düşükse ritim tekdüze)
+    - contractions / exclamations: 100 / 1000 kelimede
+    - flags: eşiği aşan stil metrikleri - paragraf düzeltmesiyle geçmez
+    - offending: yasak ifade (ünlem fazlaysa ünlem de) içeren blokların sırası
+    - score: ifade + fazla ünlem sayısı, her flag için STYLE_PENALTY
+    """
+    matcher = phrase_matcher()
+    _, blocks = split_blocks(text)
+    phrases, offending, hits = {}, [], []
+    lengths, words, contractions, exclamations = [], 0, 0, 0
+    
+    for i, block in enumerate(blocks):
+        kind = block_kind(block)
+        if kind is None:
+            continue
+        plain = plain_text(block)
+        found = matcher.findall(plain)
+        for phrase in found:
+            phrases[phrase] = phrases.get(phrase, 0) + 1
+        hits.append((i, len(found), plain.count('!')))
+        exclamations += plain.count('!')
+        if kind == "prose":
+            sentences = [s for s in SENTENCE_END_RE.split(MARKDOWN_LINK_RE.sub(r'\1', block.strip())) if s.strip()]
+            lengths += [len(s.split()) for s in sentences]
+            words += len(plain.split())
+            contractions += len(CONTRACTION_RE.findall(plain))
+    
+    report = {
+        "phrases": phrases,
+        "words": words,
+        "sentences": len(lengths),
+        "sentence_cv": 0.0,
+        "contractions": round(100 * contractions / words, 2) if words else 0.0,
+        "exclamations": round(1000 * exclamations / words, 2) if words else 0.0,
+        "flags": [],
+    }
+    if len(lengths) >= STYLE_MIN_SENTENCES:
+        mean = sum(lengths) / len(lengths)
+        variance = sum((n - mean) ** 2 for n in lengths) / len(lengths)
+        report["sentence_cv"] = round(math.sqrt(variance) / mean, 3)
+        if report["sentence_cv"] < HUMANIZE_MIN_SENTENCE_CV:
+            report["flags"].append("sentence_cv")
+        if report["contractions"] < HUMANIZE_MIN_CONTRACTIONS:
+            report["flags"].append("contractions")
+    
+    too_loud = report["exclamations"] > HUMANIZE_MAX_EXCLAMATIONS
+    offending = [i for i, found, loud in hits if found or (too_loud and loud)]
+    report["offending"] = offending
+    report["score"] = (sum(phrases.values()) + (exclamations if too_loud else 0)
+                       + STYLE_PENALTY * len(report["flags"]))
+    return report
+
+
+def humanize_plan(report: dict) -> str:
+    """"skip" / "paragraphs" / "full" - rapora göre humanize'ın kapsamı"""
+    if report["flags"]:
+        return "full"
+    if report["score"] == 0:
+        return "skip"
+    return "paragraphs" if len(report["offending"]) <= HUMANIZE_MAX_PARAGRAPHS else "full"
+
+
+def split_paragraph_markers(text: str, count: int) -> List[str]:
+    """[[PARA-n]] işaretli çıktıyı paragraflara ayır; eksik/sırası bozuksa MalformedOutputError"""
+    parts = PARA_RE.split(text.strip())
+    found = [int(n) for n in parts[1::2]]
+    paragraphs = [p.strip() for p in parts[2::2]]
+    if found != list(range(count)) or not all(paragraphs):
+        raise MalformedOutputError(f"paragraf işaretleri bozuldu: {found} != {count}")
+    return paragraphs
+
+
+async def humanize_paragraphs(key_manager: APIKeyManager, text: str, report: dict,
+                              key_pool: Optional[List[int]] = None, use_cache: bool = True) -> str:
+    """Sadece sorunlu blokları tek çağrıda humanize et, geri kalan taslaktaki gibi kalır"""
+    frontmatter, blocks = split_blocks(text)
+    chosen = [blocks[i].rstrip() for i in report["offending"]]
+    marked = "\n\n".join(f"[[PARA-{n}]]\n{block}" for n, block in enumerate(chosen))
+    avoid = ", ".join(f'"{phrase}"' for phrase in report["phrases"])
+    rules = f"\n- Do not use: {avoid}" if avoid else ""
+    prompt = f"{PARAGRAPH_HUMANIZATION_PROMPT}{rules}\n\n---\n\n{marked}"
     
-    # Kategoriye göre görsel seç
-    images = category_images.get(category, default_images)
+    rewritten = chosen
+    for attempt in range(SECTION_RETRIES + 1):
+        output = await generate_with_retry(key_manager, prompt, key_pool=key_pool,
+                                           use_cache=use_cache and attempt == 0)
+        try:
+            rewritten = split_paragraph_markers(output, len(chosen))
+            break
+        except MalformedOutputError as e:
+            print(f"⚠️ Paragraflar tekrar humanize ediliyor: {e} (deneme {attempt + 1}/{SECTION_RETRIES + 1})")
+    else:
+        print("⚠️ Paragraflar taslaktaki haliyle bırakıldı")
     
-    # Rastgele birini seç
-    return random.choice(images)
+    for i, paragraph in zip(report["offending"], rewritten):
+        blocks[i] = paragraph + blocks[i][len(blocks[i].rstrip()):]
+    return frontmatter + "".join(blocks)
+
+
+# ============================================
+# STREAMING OUTPUT (--stream)
+# ============================================
+
+# Frontmatter'da zorunlu alanlar ve kapanmadan önce izin verilen satır sayısı
+REQUIRED_FRONTMATTER = ("title", "description", "date", "category")
+MAX_FRONTMATTER_LINES = 40
+
+STREAM_OUTPUT = False
+
+
+class MalformedOutputError(ValueError):
+    """Model çıktısı MDX formatına uymuyor - stream erken kesilir"""
+
+
+class StreamingPreambleCleaner:
+    """clean_gemini_preamble'ın chunk chunk çalışan hali
+    
+    İlk içerik satırına kadar tamponlar, sonrasını olduğu gibi geçirir.
+    Sondaki boşluklar bir sonraki chunk'a kadar bekletilir (strip eşdeğeri).
+    """
+    
+    def __init__(self):
+        self._pending = ""
+        self._started = False
+        self._tail = ""
+    
+    def _emit(self, text: str) -> str:
+        combined = self._tail + text
+        stripped = combined.rstrip()
+        self._tail = combined[len(stripped):]
+        return stripped
+    
+    @staticmethod
+    def _is_preamble(line: str) -> bool:
+        lower_line = line.lower().strip()
+        return not lower_line or any(phrase in lower_line for phrase in PREAMBLE_PHRASES)
+    
+    def feed(self, chunk: str) -> str:
+        if self._started:
+            return self._emit(chunk)
+        
+        self._pending += chunk
+        while '\n' in self._pending:
+            line, rest = self._pending.split('\n', 1)
+            if self._is_preamble(line):
+                self._pending = rest
+                continue
+            self._started = True
+            text, self._pending = self._pending, ""
+            return self._emit(text.lstrip())
+        return ""
+    
+    def finish(self) -> str:
+        if self._started or self._is_preamble(self._pending):
+            return ""
+        self._started = True
+        return self._pending.strip()
+
+
+class FrontmatterGuard:
+    """Frontmatter tamamlanır tamamlanmaz doğrula, bozuksa MalformedOutputError"""
+    
+    def __init__(self):
+        self._buffer = ""
+        self.fields = {}
+        self.done = False
+    
+    def feed(self, text: str):
+        if self.done:
+            return
+        self._buffer += text
+        
+        head = self._buffer.lstrip()
+        if len(head) >= 3 and not head.startswith('---'):
+            raise MalformedOutputError(f"frontmatter ile başlamıyor: {head[:40]!r}")
+        
+        lines = self._buffer.split('\n')
+        complete = lines[:-1]  # son satır henüz bitmemiş olabilir
+        for i, line in enumerate(complete[1:], start=1):
+            if line.strip() == '---':
+                self._validate(complete[1:i])
+                return
+        if len(complete) > MAX_FRONTMATTER_LINES:
+            raise MalformedOutputError("frontmatter kapanmadı")
+    
+    def _validate(self, lines: List[str]):
+        for line in lines:
+            match = re.match(r'^(\w+):\s*(.*)$', line)
+            if match:
+                self.fields[match.group(1)] = match.group(2).strip().strip('"')
+        missing = [k for k in REQUIRED_FRONTMATTER if not self.fields.get(k)]
+        if missing:
+            raise MalformedOutputError(f"frontmatter eksik alan: {', '.join(missing)}")
+        self.done = True
+    
+    def finish(self):
+        if not self.done:
+            # Son satır newline'sız gelmiş olabilir
+            self.feed('\n')
+        if not self.done:
+            raise MalformedOutputError("frontmatter tamamlanmadı")
+
+
+class MDXStreamWriter:
+    """Stream chunk'larını temizle, frontmatter'ı doğrula, opsiyonel temp dosyaya yaz"""
+    
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.cleaner = StreamingPreambleCleaner()
+        self.guard = FrontmatterGuard()
+        self._parts = []
+        self._file = None
+    
+    def _write(self, text: str):
+        if not text:
+            return
+        self.guard.feed(text)
+        self._parts.append(text)
+        if self.path is not None:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'w', encoding='utf-8')
+            self._file.write(text)
+    
+    def feed(self, chunk: str):
+        self._write(self.cleaner.feed(chunk))
+    
+    def finish(self) -> str:
+        self._write(self.cleaner.finish())
+        self.guard.finish()
+        if self._file is not None:
+            self._file.close()
+        return ''.join(self._parts)
+    
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path is not None:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def staged_article_path(topic: dict) -> Path:
+    """CONTENT_DIR içinde geçici dosya - bitince aynı dosya sisteminde rename"""
+    return CONTENT_DIR / f".{topic['slug']}.mdx.part"
+
+
+def _chunk_text(chunk) -> str:
+    try:
+        return chunk.text
+    except ValueError:
+        return ""  # sadece usage/finish bilgisi taşıyan chunk
+
+
+async def stream_into(model, prompt: str, sink: MDXStreamWriter):
+    """Stream'i sink'e aktar; hata/iptal olursa temp dosya silinir"""
+    try:
+        response = await model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            sink.feed(_chunk_text(chunk))
+        return response, sink.finish()
+    except BaseException:
+        sink.abort()
+        raise
+
+
+async def draft_stage(key_manager: APIKeyManager, checkpoint: dict,
+                      key_pool: Optional[List[int]] = None, use_cache: bool = True):
+    """1. stage: taslak (checkpoint'te varsa atlanır)"""
+    topic = checkpoint["topic"]
+    if "draft" in checkpoint:
+        return
+    
+    with TELEMETRY.stage("draft", topic["slug"]):
+        print(f"📝 Yazılıyor: {topic['title']}")
+        prompt = generate_article_prompt(topic)
+        checkpoint["draft"] = await generate_with_retry(
+            key_manager, prompt, sink_factory=MDXStreamWriter if STREAM_OUTPUT else None,
+            key_pool=key_pool, use_cache=use_cache)
+        save_checkpoint(checkpoint)
+        print(f"✅ Taslak oluşturuldu: {topic['slug']}")
+
+
+async def humanize_stage(key_manager: APIKeyManager, checkpoint: dict,
+                         key_pool: Optional[List[int]] = None, use_cache: bool = True) -> str:
+    """2. stage: humanize + preamble temizliği (checkpoint'te varsa atlanır)"""
+    topic = checkpoint["topic"]
+    
+    if "humanized" not in checkpoint:
+        with TELEMETRY.stage("humanize", topic["slug"]):
+            plan = "full"
+            if HUMANIZE_MODE == "auto":
+                draft = clean_gemini_preamble(checkpoint["draft"])
+                report = ai_style_report(draft)
+                plan = humanize_plan(report)
+                TELEMETRY.emit("humanize_plan", plan=plan, score=report["score"], flags=report["flags"],
+                               phrases=report["phrases"], paragraphs=len(report["offending"]),
+                               sentence_cv=report["sentence_cv"], contractions=report["contractions"])
+                print(f"🔎 AI-üslup puanı {report['score']} → humanize: {plan}")
+            
+            if plan == "skip":
+                print(f"⏭️ Taslak temiz, humanize atlandı: {topic['slug']}")
+                checkpoint["humanized"] = checkpoint["draft"]
+            elif plan == "paragraphs":
+                print(f"🔄 {len(report['offending'])} paragraf humanize ediliyor: {topic['slug']}")
+                checkpoint["humanized"] = await humanize_paragraphs(key_manager, draft, report,
+                                                                    key_pool, use_cache)
+            else:
+                print(f"🔄 Humanize ediliyor: {topic['slug']}")
+                humanize_prompt = f"{HUMANIZATION_PROMPT}\n\n---\n\n{checkpoint['draft']}"
+                if SECTION_HUMANIZE:
+                    checkpoint["humanized"] = await humanize_sections(key_manager, checkpoint,
+                                                                      key_pool, use_cache)
+                elif STREAM_OUTPUT:
+                    # Temizlenmiş çıktı doğrudan CONTENT_DIR yanındaki temp dosyaya akar
+                    staged = staged_article_path(topic)
+                    text = await generate_with_retry(key_manager, humanize_prompt,
+                                                     sink_factory=lambda: MDXStreamWriter(staged),
+                                                     key_pool=key_pool, use_cache=use_cache)
+                    checkpoint["humanized"] = checkpoint["cleaned"] = text
+                    checkpoint["staged"] = str(staged)
+                else:
+                    checkpoint["humanized"] = await generate_with_retry(key_manager, humanize_prompt,
+                                                                        key_pool=key_pool, use_cache=use_cache)
+            save_checkpoint(checkpoint)
+            print(f"✅ Humanize tamamlandı: {topic['slug']}")
+    
+    if "cleaned" not in checkpoint:
+        checkpoint["cleaned"] = clean_gemini_preamble(checkpoint["humanized"])
+        save_checkpoint(checkpoint)
+        print("✅ Preamble temizlendi")
+    
+    return checkpoint["cleaned"]
+
+
+def discard_generated(checkpoint: dict, redraft: bool):
+    """Yeniden üretilecek stage'lerin çıktısını checkpoint'ten sil"""
+    staged = checkpoint.pop("staged", None)
+    if staged:
+        Path(staged).unlink(missing_ok=True)
+    for key in ("humanized", "cleaned", "sections") + (("draft",) if redraft else ()):
+        checkpoint.pop(key, None)
+
+
+async def validate_stage(key_manager: APIKeyManager, checkpoint: dict,
+                         draft_keys: Optional[List[int]] = None,
+                         humanize_keys: Optional[List[int]] = None) -> str:
+    """3. stage: doğrulama kapısı - geçemeyen makale kaydedilmez
+    
+    - Kırık iç linkler lokal onarılır (LLM çağrısı yok)
+    - Kalan hatalar için hedefli yeniden üretim: taslak geçiyorsa sadece
+      humanize, geçmiyorsa draft + humanize (cache'siz)
+    - VALIDATION_RETRIES denemeden sonra ValidationError
+    """
+    topic = checkpoint["topic"]
+    if checkpoint.get("validated"):
+        return checkpoint["cleaned"]
+    
+    known = known_post_links()
+    known[topic["slug"]] = topic.get("category", "general")
+    
+    with TELEMETRY.stage("validate", topic["slug"]):
+        for attempt in range(VALIDATION_RETRIES + 1):
+            result = validate_article(checkpoint["cleaned"], topic["slug"], known)
+            if any(kind == "links" for kind, _ in result["errors"]):
+                repaired = repair_internal_links(checkpoint["cleaned"], known,
+                                                 resolve=related_index().resolve)
+                if checkpoint.get("staged"):
+                    # Stream'le yazılan temp dosya eskidi, save_article metni yazsın
+                    Path(checkpoint.pop("staged")).unlink(missing_ok=True)
+                checkpoint["humanized"] = checkpoint["cleaned"] = repaired
+                result = validate_article(repaired, topic["slug"], known)
+                print(f"🔗 İç linkler onarıldı: {topic['slug']}")
+        
+            for kind, message in result["warnings"]:
+                print(f"⚠️ {topic['slug']}: {message}")
+            if not result["errors"]:
+                checkpoint["validated"] = True
+                save_checkpoint(checkpoint)
+                return checkpoint["cleaned"]
+        
+            issues = [message for _, message in result["errors"]]
+            print(f"🚫 Doğrulama başarısız ({topic['slug']}): {'; '.join(issues)}")
+            if attempt == VALIDATION_RETRIES:
+                save_checkpoint(checkpoint)
+                raise ValidationError(topic["slug"], issues)
+        
+            draft = validate_article(clean_gemini_preamble(checkpoint["draft"]), topic["slug"], known)
+            redraft = any(kind != "links" for kind, _ in draft["errors"])
+            print(f"♻️ Yeniden üretiliyor ({'draft + humanize' if redraft else 'humanize'}): {topic['slug']}")
+            discard_generated(checkpoint, redraft)
+            if redraft:
+                await draft_stage(key_manager, checkpoint, draft_keys, use_cache=False)
+            await humanize_stage(key_manager, checkpoint, humanize_keys, use_cache=False)
+
+
+async def generate_article_async(key_manager: APIKeyManager, topic: dict,
+                                 checkpoint: Optional[dict] = None) -> str:
+    """Makale üret (draft + humanize + doğrulama) - tek makale için awaitable
+    
+    Her stage sonucu checkpoint'e yazılır. Var olan bir checkpoint verilirse
+    tamamlanmış stage'ler atlanır (--resume).
+    """
+    checkpoint = checkpoint if checkpoint is not None else new_checkpoint(topic)
+    
+    if "draft" not in checkpoint:
+        await draft_stage(key_manager, checkpoint)
+        await asyncio.sleep(2)
+    
+    await humanize_stage(key_manager, checkpoint)
+    return await validate_stage(key_manager, checkpoint)
+
+
+def generate_article(key_manager: APIKeyManager, topic: dict,
+                     checkpoint: Optional[dict] = None) -> str:
+    """Makale üret (draft + humanize)"""
+    return asyncio.run(generate_article_async(key_manager, topic, checkpoint))
+
+
+# ============================================
+# NEW TOPIC GENERATION (Gemini ile)
+# ============================================
+
+TOPIC_DEDUP_ATTEMPTS = 3
+TOPIC_BATCH_SIZE = 15  # tek çağrıda istenen en fazla konu (~150 token/konu, çıkış limitine rahat sığar)
+
+# JSON modu: model şemaya uyan tek bir obje döndürür, fence/preamble temizliği gerekmez
+TOPIC_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "topics": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "slug": {"type": "string"},
+                    "keywords": {"type": "array", "items": {"type": "string"}},
+                    "category": {"type": "string"},
+                    "outline": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["title", "slug", "keywords", "category", "outline"],
+            },
+        },
+    },
+    "required": ["topics"],
+}
+TOPIC_GENERATION_CONFIG = {
+    **GENERATION_CONFIG,
+    "response_mime_type": "application/json",
+    "response_schema": TOPIC_SCHEMA,
+}
+
+
+def topic_duplicate_reason(store: ContentStore, index: SimilarityIndex, topic: dict) -> Optional[str]:
+    """Aday konu yayınlanmış/kuyruktaki bir şeyin tekrarıysa sebebi, değilse None"""
+    slug = topic.get("slug", "")
+    if store.is_published(slug) or store.has_topic(slug):
+        return f"slug mevcut: {slug}"
+    if store.has_title(topic.get("title", "")):
+        return "aynı başlık yayınlanmış"
+    matches = index.find_duplicates(topic)
+    if matches:
+        score, _, title = matches[0]
+        return f"{title} ({score:.2f})"
+    return None
+
+
+def topic_avoid_titles(store: ContentStore, index: SimilarityIndex, category: str,
+                       limit: int = 20) -> List[str]:
+    """Prompt'a giden kısa liste: aynı kategorideki post/konular + en yeni başlıklar"""
+    titles = store.recent_titles(limit)
+    titles += [index.docs[f"post:{slug}"]["title"] for slug in store.slugs_in_category(category)
+               if f"post:{slug}" in index.docs]
+    titles += [t["title"] for t in store.pending_topics() if t.get("category") == category]
+    return list(dict.fromkeys(reversed(titles)))[:limit][::-1]
+
+
+def topic_slug(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')[:80].rstrip('-')
+
+
+def parse_topic_batch(text: str) -> List[dict]:
+    """Model çıktısındaki ham konu objeleri
+    
+    JSON modunda çıktı {"topics": [...]} olur. Yine de bozuk/yarım gelirse
+    tamamlanmış her {"title": ...} objesi ayrı ayrı kurtarılır, çağrı boşa gitmez.
+    """
+    text = text.strip()
+    if text.startswith('```'):
+        text = re.sub(r'```json?\n?', '', text).replace('```', '').strip()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        decoder = json.JSONDecoder()
+        items = []
+        for match in re.finditer(r'\{\s*"title"', text):
+            try:
+                items.append(decoder.raw_decode(text, match.start())[0])
+            except json.JSONDecodeError:
+                continue
+        return items
+    if isinstance(data, dict):
+        data = data.get("topics", [data])
+    return [t for t in data if isinstance(t, dict)] if isinstance(data, list) else []
+
+
+def normalize_topic(raw: dict, categories) -> Optional[dict]:
+    """Şema dışı/eksik adayı ele, slug ve keyword'leri normalize et"""
+    title = str(raw.get("title") or "").strip()
+    category = str(raw.get("category") or "").strip()
+    keywords = [str(k).strip().lower() for k in raw.get("keywords") or [] if str(k).strip()]
+    outline = [str(o).strip() for o in raw.get("outline") or [] if str(o).strip()]
+    slug = topic_slug(str(raw.get("slug") or "")) or topic_slug(title)
+    if not title or not slug or not keywords or category not in categories:
+        return None
+    return {
+        "title": title,
+        "slug": slug,
+        "keywords": list(dict.fromkeys(keywords))[:8],
+        "category": category,
+        "outline": outline,
+        "status": "pending",
+        "generatedAt": datetime.now().isoformat(),
+    }
+
+
+def topic_batch_plan(store: ContentStore, count: int,
+                     categories: Optional[List[str]] = None) -> dict:
+    """count konuyu kategorilere dağıt: {kategori: adet}
+    
+    Yayınlanmış + kuyruktaki konular sayılır, her konu o an en az kapsanan kategoriye.
+    """
+    categories = categories or SCHEDULE_CATEGORIES
+    sim = load_coverage_index(store)
+    for topic in get_pending_topics(store):
+        sim.add(topic.get("category"), [])
+    plan = {}
+    for _ in range(count):
+        category = sim.next_category(categories)
+        plan[category] = plan.get(category, 0) + 1
+        sim.add_topic({"category": category})
+    return plan
+
+
+def topic_batch_prompt(wanted: dict, avoid: List[str], rejected: List[tuple]) -> str:
+    categories = "\n".join(f"- {category}: {n}" for category, n in wanted.items())
+    recent_titles = "\n- ".join(avoid)
+    feedback = ""
+    if rejected:
+        lines = "\n".join(f"- {title} (too close to: {reason})" for title, reason in rejected[-20:])
+        feedback = f"\nREJECTED as near-duplicates (pick clearly different angles):\n{lines}\n"
+    
+    return f"""You are an SEO expert for RetrofitAge.com - an aging-in-place home modification website.
+
+Generate {sum(wanted.values())} new blog post topics. CATEGORIES (number of topics each):
+{categories}
+
+ALREADY WRITTEN (DO NOT suggest similar):
+- {recent_titles if recent_titles else '(No posts yet)'}
+{feedback}
+Requirements:
+1. UNIQUE, not similar to published topics or to each other
+2. High-volume SEO keywords for home safety/aging-in-place
+3. Actionable, provides real value
+4. Appeals to adult children of seniors OR seniors themselves
+5. "category" must be exactly one of the category names above
+
+Respond in EXACT JSON: {{"topics": [{{"title", "slug" (url-friendly), "keywords" (5), "category", "outline" (5 sections)}}]}}"""
+
+
+async def generate_topic_batch_async(key_manager: APIKeyManager, store: ContentStore, count: int,
+                                     categories: Optional[List[str]] = None, use_cache: bool = True,
+                                     index: Optional[SimilarityIndex] = None) -> List[dict]:
+    """Tek çağrıda TOPIC_BATCH_SIZE'a kadar konu üret (JSON şemalı çıktı)
+    
+    - count konu kategorilere dağıtılır (topic_batch_plan)
+    - Her aday lokal doğrulanır (normalize_topic) ve yayınlanmış/kuyruktaki
+      konulara ve aynı batch'teki öncekilere karşı tekrar kontrolünden geçer
+    - Eksik kalan adet REJECTED geri bildirimiyle yeni çağrıda istenir;
+      toplam çağrı ceil(count / TOPIC_BATCH_SIZE) + TOPIC_DEDUP_ATTEMPTS - 1
+    - Kabul edilenler henüz kuyruğa eklenmez (add_new_topic)
+    """
+    if index is None:
+        index = load_similarity_index(store)
+    
+    wanted = topic_batch_plan(store, count, categories)
+    accepted = []
+    rejected = []
+    calls = math.ceil(count / TOPIC_BATCH_SIZE) + TOPIC_DEDUP_ATTEMPTS - 1
+    
+    with TELEMETRY.stage("topic", ",".join(wanted)):
+        for attempt in range(calls):
+            batch = {}
+            for category, n in wanted.items():
+                take = min(n, TOPIC_BATCH_SIZE - sum(batch.values()))
+                if take > 0:
+                    batch[category] = take
+            if not batch:
+                break
+            
+            print(f"🧠 {sum(batch.values())} konu üretiliyor ({', '.join(batch)})...")
+            avoid = []
+            for category in batch:
+                avoid += topic_avoid_titles(store, index, category, limit=min(20, max(5, 40 // len(batch))))
+            prompt = topic_batch_prompt(batch, list(dict.fromkeys(avoid)), rejected)
+            
+            # Reddedilen cevap cache'ten tekrar gelmesin - sadece ilk deneme cache'li
+            response = await generate_with_retry(key_manager, prompt, use_cache=use_cache and attempt == 0,
+                                                 generation_config=TOPIC_GENERATION_CONFIG)
+            
+            candidates = parse_topic_batch(response)
+            invalid = 0
+            for raw in candidates:
+                if len(batch) == 1:
+                    raw = {**raw, "category": next(iter(batch))}  # tek kategori istendi
+                topic = normalize_topic(raw, batch)
+                if topic is None or wanted[topic["category"]] <= 0:
+                    invalid += 1
+                    continue
+                reason = topic_duplicate_reason(store, index, topic)
+                if reason is None and any(t["slug"] == topic["slug"] for t in accepted):
+                    reason = f"slug mevcut: {topic['slug']}"
+                if reason is not None:
+                    print(f"♻️ Yakın tekrar reddedildi: {topic['title']} ≈ {reason}")
+                    rejected.append((topic["title"], reason))
+                    continue
+                # Aynı batch'in sonraki adayları bununla da karşılaştırılsın
+                index.add_topic(topic)
+                accepted.append(topic)
+                wanted[topic["category"]] -= 1
+            if invalid:
+                print(f"⚠️ {invalid}/{len(candidates)} aday şemaya uymadı, atlandı")
+    
+    return accepted
+
+
+def generate_topic_batch(key_manager: APIKeyManager, store: ContentStore, count: int,
+                         categories: Optional[List[str]] = None, use_cache: bool = True,
+                         index: Optional[SimilarityIndex] = None) -> List[dict]:
+    """Toplu konu üretimi (senkron wrapper)"""
+    return asyncio.run(generate_topic_batch_async(key_manager, store, count, categories, use_cache, index))
 
 
-def generate_article_prompt(topic: dict) -> str:
-    # Görsel URL'i oluştur
-    image_url = get_unsplash_image(topic.get('keywords', []), topic.get('category', 'general'))
+async def generate_new_topic_async(key_manager: APIKeyManager, store: ContentStore, category: str,
+                                   use_cache: bool = True,
+                                   index: Optional[SimilarityIndex] = None) -> Optional[dict]:
+    """Gemini ile yeni konu öner - tek konuluk batch
     
-    return f"""Write a comprehensive, SEO-optimized blog post about: "{topic['title']}"
+    TOPIC_DEDUP_ATTEMPTS denemede benzersiz konu çıkmazsa None.
+    """
+    topics = await generate_topic_batch_async(key_manager, store, 1, [category], use_cache, index)
+    return topics[0] if topics else None
 
-TARGET KEYWORDS: {', '.join(topic.get('keywords', []))}
-CATEGORY: {topic.get('category', 'general')}
 
-FORMAT (include frontmatter):
----
-title: "{topic['title']}"
-description: "[150-160 char meta description]"
-date: "{datetime.now().strftime('%Y-%m-%d')}"
-category: "{topic.get('category', 'general')}"
-tags: {json.dumps(topic.get('keywords', [])[:5])}
-author: "RetrofitAge Engineering Team"
-image: "{image_url}"
-featured: false
----
+def generate_new_topic(key_manager: APIKeyManager, store: ContentStore, category: str,
+                       use_cache: bool = True,
+                       index: Optional[SimilarityIndex] = None) -> Optional[dict]:
+    """Gemini ile yeni konu öner (senkron wrapper)"""
+    return asyncio.run(generate_new_topic_async(key_manager, store, category, use_cache, index))
 
-[Article in Markdown]
 
-REQUIRED STRUCTURE:
-1. **Hook paragraph** - Engaging opener, NOT generic intro
-2. **Executive Summary** - 4-5 bullet points with ✓
-3. **The Problem** - Why this matters for senior safety
-4. **Technical Solutions** - Compare products/methods, pros & cons
-5. **Cost Analysis** - USD prices, breakdown table
-6. **Installation Guide** - Step-by-step OR when to hire pro
-7. **FAQ Section** - 4 questions as H3 under H2 "Frequently Asked Questions"
-8. **Conclusion** - Strong CTA, not generic
+def add_new_topic(store: ContentStore, index: SimilarityIndex, topic: dict) -> bool:
+    """Konuyu kuyruğa ekle ve indekse işle"""
+    if not store.add_topic(topic):
+        return False
+    index.add_topic(topic)
+    index.save()
+    return True
 
-MUST INCLUDE:
-- Comparison table (markdown)
-- Safety callouts: > **Safety Note:** ...
-- Internal links: [Related: Title](/category/slug)
-- Word count: 1800-2200 words
-- American English
 
-Write now as a seasoned professional sharing hard-earned knowledge:"""
+# ============================================
+# FILE OPERATIONS
+# ============================================
+
+def write_text_atomic(path: Path, text: str):
+    """Temp dosyaya yaz, fsync, os.replace - yarım yazılmış MDX kalmaz"""
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
 
 
-async def generate_with_retry(key_manager: APIKeyManager, prompt: str, max_retries: int = 15) -> str:
-    """Retry ve key rotation ile Gemini çağır - 10 key için 15 deneme
+def save_article(content: str, topic: dict, staged: Optional[Path] = None,
+                 update_index: bool = True) -> Path:
+    """MDX dosyası kaydet (stream ile yazılmış temp dosya varsa yerine rename)"""
+    CONTENT_DIR.mkdir(parents=True, exist_ok=True)
     
-    Özellikler:
-    - 503 UNAVAILABLE error handling
-    - Exponential backoff (1s, 2s, 4s, 8s, 16s)
-    - Quota/rate limit için key rotation
+    filepath = CONTENT_DIR / f"{topic['slug']}.mdx"
+    
+    if staged is not None and staged.exists():
+        os.replace(staged, filepath)
+    else:
+        write_text_atomic(filepath, content)
+    
+    print(f"💾 Kaydedildi: {filepath}")
+    if update_index:
+        update_search_index(update_post_manifest())
+    return filepath
+
+
+def git(*args: str) -> str:
+    return subprocess.run(["git", *args], check=True, cwd=BASE_DIR,
+                          capture_output=True, text=True).stdout.strip()
+
+
+def commit_message(added: List[str], updated: List[str]) -> List[str]:
+    """[konu satırı, gövde] - tek makalede gövde yok"""
+    if len(added) + len(updated) == 1:
+        return [f"📝 New article: {added[0]}" if added else f"♻️ Refreshed article: {updated[0]}"]
+    parts = ([f"{len(added)} new articles"] if added else []) + ([f"{len(updated)} refreshed"] if updated else [])
+    body = [f"- {title}" for title in added] + [f"- ♻️ {title}" for title in updated]
+    return [f"{'📝' if added else '♻️'} {', '.join(parts)}", "\n".join(body)]
+
+
+def git_commit_push(paths: List[Path], message: List[str], push: bool = True) -> bool:
+    """Tek add + tek commit + tek push; hata olursa commit geri alınır
+    
+    Remote'a makale sayısından bağımsız tek round trip.
     """
-    last_error = None
+    head = None
     
-    for attempt in range(max_retries):
-        api_key = key_manager.get_key()
-        
-        if not api_key:
-            print("❌ Tüm API key'ler tükendi!")
-            break
-        
-        try:
-            model = create_model(api_key)
-            response = model.generate_content(prompt)
-            return response.text
-            
-        except Exception as e:
-            last_error = e
-            error_msg = str(e).lower()
-            
-            # 503 Service Unavailable - Exponential backoff
-            if '503' in error_msg or 'unavailable' in error_msg or 'overloaded' in error_msg:
-                wait_time = min(2 ** attempt, 16)  # 1s, 2s, 4s, 8s, 16s max
-                print(f"⚠️ API geçici olarak aşırı yüklü (503), {wait_time}s bekleniyor... (deneme {attempt + 1}/{max_retries})")
-                time.sleep(wait_time)
-                continue
-            
-            # Quota/Rate limit - Key rotation
-            if any(x in error_msg for x in ['429', 'quota', 'rate', 'exhausted', 'resource']):
-                key_manager.mark_exhausted(api_key)
-                print(f"⚠️ Rate limit, key değiştiriliyor... (deneme {attempt + 1}/{max_retries})")
-                time.sleep(2)  # Kısa bekleme
-                continue
-            
-            # Diğer hatalar - Direkt fırlat
-            print(f"❌ Beklenmeyen hata: {e}")
-            raise e
+    def undo():
+        if head:
+            # Commit olduysa geri al, stage'lenen dosyaları index'ten çıkar
+            subprocess.run(["git", "reset", "-q", "--soft", head], cwd=BASE_DIR)
+            subprocess.run(["git", "reset", "-q", "--", *(str(p) for p in paths)], cwd=BASE_DIR)
     
-    raise last_error
+    try:
+        head = git("rev-parse", "HEAD")
+        git("add", "-A", "--", *(str(p) for p in paths))
+        git("commit", *(arg for paragraph in message for arg in ("-m", paragraph)))
+        if push:
+            git("push")
+            print("🚀 GitHub'a push edildi!")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"⚠️ Git hatası: {e} {(e.stderr or '').strip()}")
+        undo()
+        return False
+    except BaseException:
+        # git bulunamadı, Ctrl+C vb. - commit yine geri alınır, hata çağırana gider
+        undo()
+        raise
 
 
-def clean_gemini_preamble(text: str) -> str:
-    """Gemini'nin yanıtın başına eklediği preamble metinlerini temizle"""
-    lines = text.split('\n')
+def redirect_output(root: Path):
+    """Yazılan tüm yolları root altına taşı (--output, --provider stub)
     
-    # Başta gereksiz metinleri at
-    skip_phrases = [
-        'here is the rewritten',
-        'here\'s the rewritten',
-        'here is the article',
-        'here\'s the article',
-        'chief',
-        'adopting the persona',
-    ]
+    Repo'daki post'lar, konu listesi ve history ilk seferde kopyalanır; sonraki
+    çalıştırmalar aynı dizinden devam eder. content/, manifest, arama indeksi,
+    SQLite store, checkpoint ve ledger'a dokunulmaz. Response cache yerinde
+    kalır (anahtarında provider var).
+    """
+    global CONTENT_DIR, HISTORY_FILE, TOPICS_FILE, CACHE_DIR, KEY_LEDGER_FILE, CONTENT_DB_FILE
+    global MANIFEST_FILE, MANIFEST_STAMPS_FILE, SEARCH_INDEX_DIR, RELATED_INDEX_FILE
+    global SIMILARITY_INDEX_FILE, CHECKPOINT_DIR, TELEMETRY_DIR, DAEMON_STATUS_FILE
     
-    start_idx = 0
-    for i, line in enumerate(lines):
-        lower_line = line.lower().strip()
-        # Skip empty lines and preamble phrases
-        if not lower_line:
-            continue
-        if any(phrase in lower_line for phrase in skip_phrases):
-            start_idx = i + 1
-            continue
-        # Frontmatter başladıysa orada kes
-        if lower_line == '---':
-            start_idx = i
-            break
-        # Normal içerik başladıysa orada kes
-        if lower_line and not any(phrase in lower_line for phrase in skip_phrases):
-            start_idx = i
-            break
+    content_dir = root / "content" / "posts"
+    if not content_dir.exists():
+        shutil.copytree(CONTENT_DIR, content_dir)
+    for source, target in ((TOPICS_FILE, root / "topics.json"),
+                           (HISTORY_FILE, root / "content-history.json")):
+        if source.exists() and not target.exists():
+            shutil.copy2(source, target)
     
-    cleaned_lines = lines[start_idx:]
-    return '\n'.join(cleaned_lines).strip()
+    CONTENT_DIR = content_dir
+    TOPICS_FILE = root / "topics.json"
+    HISTORY_FILE = root / "content-history.json"
+    MANIFEST_FILE = root / "content" / "manifest.json"
+    SEARCH_INDEX_DIR = root / "content" / "search"
+    CACHE_DIR = root / ".cache"
+    KEY_LEDGER_FILE = CACHE_DIR / "key-usage.json"
+    CONTENT_DB_FILE = CACHE_DIR / "content.db"
+    MANIFEST_STAMPS_FILE = CACHE_DIR / "manifest-stamps.json"
+    RELATED_INDEX_FILE = CACHE_DIR / "related-index.json"
+    SIMILARITY_INDEX_FILE = CACHE_DIR / "similarity-index.json"
+    CHECKPOINT_DIR = CACHE_DIR / "checkpoints"
+    TELEMETRY_DIR = CACHE_DIR / "telemetry"
+    DAEMON_STATUS_FILE = CACHE_DIR / "daemon-status.json"
+    print(f"📁 Çıktı dizini: {root}")
 
 
-def generate_article(key_manager: APIKeyManager, topic: dict) -> str:
-    """Makale üret (draft + humanize)"""
-    print(f"📝 Yazılıyor: {topic['title']}")
+def mark_published(store: ContentStore, topic: dict):
+    """History ve topic durumunu tek transaction'da güncelle"""
+    store.record_published(topic)
+
+
+def save_stage(checkpoint: dict, update_index: bool = True) -> Path:
+    """save stage'i: sadece MDX dosyası (history/topic'e dokunmaz; bitmişse atlanır)"""
+    topic = checkpoint["topic"]
+    if "filepath" not in checkpoint:
+        with TELEMETRY.stage("save", topic["slug"]):
+            staged = Path(checkpoint["staged"]) if checkpoint.get("staged") else None
+            checkpoint["filepath"] = str(save_article(checkpoint["cleaned"], topic, staged, update_index))
+            save_checkpoint(checkpoint)
+    return Path(checkpoint["filepath"])
+
+
+def complete_article(checkpoint: dict, store: ContentStore, update_index: bool = True) -> Path:
+    """save + record stage'leri (checkpoint'te bitmişse atlanır)"""
+    topic = checkpoint["topic"]
+    save_stage(checkpoint, update_index)
     
-    # 1. Draft
-    prompt = generate_article_prompt(topic)
+    if not checkpoint.get("recorded"):
+        mark_published(store, topic)
+        checkpoint["recorded"] = True
+        save_checkpoint(checkpoint)
     
-    import asyncio
-    draft = asyncio.get_event_loop().run_until_complete(
-        generate_with_retry(key_manager, prompt)
-    )
-    print("✅ Taslak oluşturuldu")
+    return Path(checkpoint["filepath"])
+
+
+class PublishTransaction:
+    """Bir veya birden çok makaleyi hep-ya-hiç yayınla
     
-    time.sleep(2)
+    add(): MDX atomik yazılır (temp + rename), history/topic kaydedilir
+    update(): var olan post'un yeni içeriği atomik yazılır (--refresh)
+    commit(): manifest/arama indeksi bir kez güncellenir, JSON flush edilir,
+              tek git commit + tek push
+    rollback(): MDX, manifest ve arama indeksi dosyaları byte byte eski haline,
+                store başlangıç snapshot'ına döner. Checkpoint'ler 'validated'
+                stage'ine geri çekilir - --resume model çağrısı yapmadan tekrar yayınlar.
+                Transaction'dan önce yazılmış MDX'ler (run_batch) diskte kalır; history/topic
+                kaydı her zaman add() içinde, snapshot'tan sonra yapılır.
+    """
     
-    # 2. Humanize
-    print("🔄 Humanize ediliyor...")
-    humanize_prompt = f"{HUMANIZATION_PROMPT}\n\n---\n\n{draft}"
+    def __init__(self, store: ContentStore, push: bool = True):
+        self.store = store
+        self.push = push
+        self.snapshot = store.snapshot()
+        self.checkpoints = []
+        self.updated = []  # [(path, başlık)]
+        self.undo = []
+        # path -> eski içerik (yoksa None); indeks küçük, tamamı saklanır
+        self.previous = {}
+        for path in [MANIFEST_FILE, MANIFEST_STAMPS_FILE, *self._index_files()]:
+            self._remember(path)
     
-    humanized = asyncio.get_event_loop().run_until_complete(
-        generate_with_retry(key_manager, humanize_prompt)
-    )
-    print("✅ Humanize tamamlandı")
+    @staticmethod
+    def _index_files() -> List[Path]:
+        return sorted(SEARCH_INDEX_DIR.glob("*.json")) if SEARCH_INDEX_DIR.exists() else []
+    
+    def _remember(self, path: Path):
+        if path not in self.previous:
+            self.previous[path] = path.read_bytes() if path.exists() else None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self.snapshot is not None:
+            self.rollback()
+        return False
     
-    # 3. Clean preamble
-    cleaned = clean_gemini_preamble(humanized)
-    print("✅ Preamble temizlendi")
+    def add(self, checkpoint: dict) -> Path:
+        if "filepath" not in checkpoint:
+            self._remember(CONTENT_DIR / f"{checkpoint['topic']['slug']}.mdx")
+        # Sadece bu transaction'ın yaptığı adımlar geri alınır (staged dosya save'de tükenir)
+        keys = ["filepath", "staged"] if "filepath" not in checkpoint else []
+        if not checkpoint.get("recorded"):
+            keys.append("recorded")
+        self.undo.append((checkpoint, keys))
+        self.checkpoints.append(checkpoint)
+        return complete_article(checkpoint, self.store, update_index=False)
     
-    return cleaned
+    def update(self, path: Path, text: str, title: str):
+        self._remember(path)
+        write_text_atomic(path, text)
+        self.updated.append((path, title))
+    
+    def paths(self) -> List[Path]:
+        return ([Path(c["filepath"]) for c in self.checkpoints] + [path for path, _ in self.updated]
+                + [HISTORY_FILE, TOPICS_FILE, MANIFEST_FILE, SEARCH_INDEX_DIR])
+    
+    def commit(self) -> bool:
+        if not self.checkpoints and not self.updated:
+            self.snapshot = None
+            return True
+        slugs = [c["topic"]["slug"] for c in self.checkpoints] + [path.stem for path, _ in self.updated]
+        message = commit_message([c["topic"]["title"] for c in self.checkpoints],
+                                 [title for _, title in self.updated])
+        try:
+            update_search_index(update_post_manifest())
+            self.store.flush()  # history/topics JSON'ı commit'ten önce güncel olmalı
+            with TELEMETRY.stage("commit", slugs[0] if len(slugs) == 1 else None):
+                ok = git_commit_push(self.paths(), message) if self.push else True
+        except Exception:
+            self.rollback()
+            raise
+        if not ok:
+            self.rollback()
+            return False
+        
+        for checkpoint in self.checkpoints:
+            clear_checkpoint(checkpoint["topic"]["slug"])
+        self.snapshot = None
+        return True
+    
+    def rollback(self):
+        for path in self._index_files():
+            self.previous.setdefault(path, None)  # bu transaction'da oluşan shard'lar silinsin
+        for path, data in self.previous.items():
+            if data is None:
+                path.unlink(missing_ok=True)
+            else:
+                tmp = path.with_name(f".{path.name}.tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, path)
+        self.store.restore(self.snapshot)
+        
+        for checkpoint, keys in self.undo:
+            for key in keys:
+                checkpoint.pop(key, None)
+            save_checkpoint(checkpoint)
+        hint = ", --resume ile tekrar denenebilir" if self.checkpoints else ""
+        print(f"↩️ Yayın geri alındı: {len(self.checkpoints) + len(self.updated)} makale{hint}")
+        self.snapshot = None
+
+
+class PublishError(Exception):
+    """Yayın transaction'ı geri alındı"""
+
+
+def publish_articles(checkpoints: List[dict], store: ContentStore, push: bool = True) -> bool:
+    """Makaleleri tek transaction'da kaydet, commit'le ve push'la"""
+    with PublishTransaction(store, push) as transaction:
+        for checkpoint in checkpoints:
+            transaction.add(checkpoint)
+        return transaction.commit()
 
 
 # ============================================
-# NEW TOPIC GENERATION (Gemini ile)
+# BATCH PIPELINE (--all)
 # ============================================
 
-def generate_new_topic(key_manager: APIKeyManager, history: dict, category: str) -> dict:
-    """Gemini ile yeni konu öner"""
-    print(f"🧠 Yeni konu üretiliyor (Kategori: {category})...")
+async def run_batch(key_manager: APIKeyManager, store: ContentStore,
+                    concurrency: int, push: bool = True,
+                    topics: Optional[List[dict]] = None, resume: bool = False,
+                    humanize_concurrency: Optional[int] = None, queue_size: Optional[int] = None,
+                    draft_keys: Optional[List[int]] = None,
+                    humanize_keys: Optional[List[int]] = None) -> List[Path]:
+    """Bekleyen tüm konuları stage pipeline'ı ile paralel yaz
+    
+    draft worker'ları → [sınırlı kuyruk] → humanize worker'ları → doğrulama → save/record
+    
+    - Makale N humanize edilirken makale N+1'in taslağı yazılır; toplam süre
+      stage'lerin toplamı değil en yavaş stage tarafından belirlenir
+    - Her stage'in kendi worker sayısı ve key havuzu var
+    - Kuyruk doluysa draft worker'ları bekler (backpressure), humanize'a
+      yetişemeyecek kadar taslak üretip kota harcanmaz
+    - resume=True: checkpoint'i olan konular kaldığı stage'den devam eder
+    - Doğrulanan makalenin MDX'i hemen yazılır; çökme ya da başka bir
+      makalenin hatası biteni kaybettirmez
+    - History/topic kaydı, manifest/arama indeksi ve tek commit/push sonda
+      PublishTransaction ile; commit başarısızsa kayıtlar geri alınır, MDX'ler
+      diskte ve checkpoint'leri 'save' sonrasında kalır (--resume model
+      çağrısı yapmadan tekrar yayınlar)
+    """
+    pending = topics if topics is not None else get_pending_topics(store)
+    if not pending:
+        print("📋 Bekleyen konu yok.")
+        return []
+    
+    draft_workers = max(1, concurrency)
+    humanize_workers = max(1, humanize_concurrency or concurrency)
+    queue_size = max(1, queue_size or humanize_workers)
+    print(f"🚀 Batch: {len(pending)} konu, draft={draft_workers} humanize={humanize_workers} "
+          f"kuyruk={queue_size}, {len(key_manager.keys)} key")
+    started = time.monotonic()
+    
+    draft_queue = asyncio.Queue()
+    humanize_queue = asyncio.Queue(maxsize=queue_size)
+    results = {}
     
-    recent_titles = "\n- ".join(history.get("publishedTitles", [])[-20:])
-    recent_keywords = ", ".join(list(set(history.get("publishedKeywords", [])))[-50:])
+    for topic in pending:
+        draft_queue.put_nowait(topic)
     
-    prompt = f"""You are an SEO expert for RetrofitAge.com - an aging-in-place home modification website.
+    async def draft_worker():
+        while not draft_queue.empty():
+            topic = draft_queue.get_nowait()
+            checkpoint = (load_checkpoint(topic["slug"]) if resume else None) or new_checkpoint(topic)
+            try:
+                await draft_stage(key_manager, checkpoint, draft_keys)
+            except QuotaExhaustedError as e:
+                # Kalan konular da kota bekler: kuyruğu boşalt, yarım kalanlar --resume'da
+                results[topic["slug"]] = e
+                while not draft_queue.empty():
+                    draft_queue.get_nowait()
+                return
+            except Exception as e:
+                results[topic["slug"]] = e
+                continue
+            await humanize_queue.put(checkpoint)
+    
+    async def humanize_worker():
+        while True:
+            checkpoint = await humanize_queue.get()
+            if checkpoint is None:
+                return
+            slug = checkpoint["topic"]["slug"]
+            try:
+                await humanize_stage(key_manager, checkpoint, humanize_keys)
+                await validate_stage(key_manager, checkpoint, draft_keys, humanize_keys)
+                save_stage(checkpoint, update_index=False)
+                results[slug] = checkpoint
+            except Exception as e:
+                results[slug] = e
+    
+    humanizers = [asyncio.create_task(humanize_worker()) for _ in range(humanize_workers)]
+    try:
+        await asyncio.gather(*(draft_worker() for _ in range(draft_workers)))
+        for _ in humanizers:
+            await humanize_queue.put(None)
+        await asyncio.gather(*humanizers)
+    finally:
+        for task in humanizers:
+            task.cancel()
+    
+    written = []
+    for topic in pending:
+        result = results.get(topic["slug"])
+        if isinstance(result, BaseException):
+            print(f"❌ {topic['slug']}: {result}")
+        elif result is not None:
+            written.append(result)
+    
+    # MDX'ler diskte; history/topic kaydı + indeks + tek commit/push tek transaction
+    if written and not publish_articles(written, store, push):
+        print(f"⚠️ {len(written)} makale diske yazıldı ama yayınlanamadı (--resume ile tekrar denenir)")
+        written = []
+    
+    elapsed = time.monotonic() - started
+    print(f"📊 Batch: {len(written)}/{len(pending)} makale, {elapsed:.0f}s")
+    return [Path(checkpoint["filepath"]) for checkpoint in written]
 
-Generate ONE new blog post topic for category: "{category}"
 
-ALREADY WRITTEN (DO NOT suggest similar):
-- {recent_titles if recent_titles else '(No posts yet)'}
+# ============================================
+# REFRESH (--refresh)
+# ============================================
 
-Already used keywords (avoid): {recent_keywords if recent_keywords else '(none)'}
+REFRESH_PROMPT = """Update this published article so it is current as of {year}:
 
-Requirements:
-1. UNIQUE, not similar to published topics
-2. High-volume SEO keywords for home safety/aging-in-place
-3. Actionable, provides real value
-4. Appeals to adult children of seniors OR seniors themselves
+1. Where the title, headings or text refer to the present with an older year ("in 2025", "for 2025"), use {year}
+2. Update prices, program limits and product names only where you are confident they changed
+3. Keep the frontmatter keys, internal links, markdown formatting and section structure intact
+4. Do not add or remove sections; keep the voice and length
+5. If nothing is outdated, return the article unchanged
 
-Respond in EXACT JSON (no markdown):
-{{
-  "title": "SEO-Optimized Title Here",
-  "slug": "url-friendly-slug",
-  "keywords": ["keyword1", "keyword2", "keyword3", "keyword4", "keyword5"],
-  "category": "{category}",
-  "outline": [
-    "Section 1",
-    "Section 2", 
-    "Section 3",
-    "Section 4",
-    "Section 5"
-  ]
-}}"""
-    
-    import asyncio
-    response = asyncio.get_event_loop().run_until_complete(
-        generate_with_retry(key_manager, prompt)
-    )
+Return the full updated article:"""
+
+REFRESH_PASSES = ("update", "humanize")
+# Yenilemede dokunulmayan frontmatter alanları (URL, yayın tarihi, görsel)
+REFRESH_LOCKED_FIELDS = ("date", "category", "image", "author", "featured")
+FRONTMATTER_KEY_RE = re.compile(r'^([A-Za-z_][\w-]*):')
+
+
+def normalized_hash(text: str) -> str:
+    """Satır sonu, satır sonu boşluğu ve fazla boş satır farkı değişiklik sayılmaz"""
+    lines = [line.rstrip() for line in text.replace("\r\n", "\n").split("\n")]
+    normalized = re.sub(r'\n{3,}', '\n\n', "\n".join(lines)).strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def lock_frontmatter(old: str, new: str) -> str:
+    """new'in frontmatter'ında REFRESH_LOCKED_FIELDS satırları old'dakiyle aynı kalır"""
+    old_match, new_match = FRONTMATTER_RE.match(old), FRONTMATTER_RE.match(new)
+    if not old_match or not new_match:
+        return new
+    locked = {}
+    for line in old_match.group(1).split("\n"):
+        key = FRONTMATTER_KEY_RE.match(line)
+        if key and key.group(1) in REFRESH_LOCKED_FIELDS:
+            locked[key.group(1)] = line
+    lines = []
+    for line in new_match.group(1).split("\n"):
+        key = FRONTMATTER_KEY_RE.match(line)
+        lines.append(locked.pop(key.group(1), line) if key else line)
+    lines += locked.values()  # model'in düşürdüğü kilitli alanlar geri gelir
+    return "---\n" + "\n".join(lines) + "\n---\n\n" + new[new_match.end():].lstrip("\n")
+
+
+def select_refresh_posts(slugs: Optional[List[str]] = None, older_than: Optional[int] = None,
+                         categories: Optional[List[str]] = None, pattern: Optional[str] = None,
+                         limit: Optional[int] = None) -> List[Path]:
+    """Yenilenecek post'lar, en eskiden yeniye (manifest'teki frontmatter tarihi)"""
+    posts = update_post_manifest()
+    cutoff = (datetime.now() - timedelta(days=older_than)).strftime("%Y-%m-%d") if older_than else None
+    regex = re.compile(pattern, re.IGNORECASE) if pattern else None
+    selected = []
+    for slug, entry in sorted(posts.items(), key=lambda item: (item[1].get("date") or "", item[0])):
+        if slugs and slug not in slugs:
+            continue
+        if cutoff and (entry.get("date") or "") >= cutoff:
+            continue
+        if categories and entry.get("category") not in categories:
+            continue
+        path = CONTENT_DIR / f"{slug}.mdx"
+        if regex and not regex.search(path.read_text(encoding='utf-8')):
+            continue
+        selected.append(path)
+    return selected[:limit] if limit else selected
+
+
+async def refresh_post(key_manager: APIKeyManager, path: Path, refresh_pass: str,
+                       known: dict, year: int) -> Optional[str]:
+    """Tek post'a pass'i uygula; içerik (normalize hash'e göre) değişmediyse None
+    
+    Sonuç doğrulamada eskisinde olmayan bir hata üretirse değişiklik bırakılır.
+    """
+    slug = path.stem
+    old = path.read_text(encoding='utf-8')
+    with TELEMETRY.stage("refresh", slug):
+        instruction = REFRESH_PROMPT.format(year=year) if refresh_pass == "update" else HUMANIZATION_PROMPT
+        response = await generate_with_retry(key_manager, f"{instruction}\n\n---\n\n{old}")
+        new = lock_frontmatter(old, clean_gemini_preamble(response))
+        new = repair_internal_links(new, known, resolve=related_index().resolve)
+        if not new.endswith("\n"):
+            new += "\n"
+    
+    if normalized_hash(new) == normalized_hash(old):
+        return None
+    before = {message for _, message in validate_article(old, slug, known)["errors"]}
+    introduced = [message for _, message in validate_article(new, slug, known)["errors"]
+                  if message not in before]
+    if introduced:
+        print(f"🚫 {slug}: yenileme bırakıldı ({'; '.join(introduced)})")
+        return None
+    return new
+
+
+async def run_refresh(key_manager: APIKeyManager, store: ContentStore, paths: List[Path],
+                      refresh_pass: str = "update", concurrency: int = 4, push: bool = True) -> List[Path]:
+    """Seçilen post'ları paralel yenile, sadece gerçekten değişenleri yaz
+    
+    - Pass post başına tek çağrı (update: hedefli güncelleme prompt'u, humanize)
+    - Normalize içerik hash'i aynı kalan post'a dokunulmaz: mtime değişmez,
+      manifest/arama indeksi onu yeniden işlemez, commit'e girmez
+    - Değişenler tek PublishTransaction'da: tek commit, tek push
+    """
+    if not paths:
+        print("📋 Yenilenecek post yok.")
+        return []
+    print(f"♻️ Yenileme ({refresh_pass}): {len(paths)} post, {concurrency} paralel")
+    started = time.monotonic()
+    known = known_post_links()
+    year = datetime.now().year
+    semaphore = asyncio.Semaphore(max(1, concurrency))
     
-    # JSON parse
-    json_str = response.strip()
-    if json_str.startswith('```'):
-        json_str = re.sub(r'```json?\n?', '', json_str).replace('```', '').strip()
+    async def worker(path: Path):
+        async with semaphore:
+            return await refresh_post(key_manager, path, refresh_pass, known, year)
     
-    topic = json.loads(json_str)
-    topic["status"] = "pending"
-    topic["generatedAt"] = datetime.now().isoformat()
+    results = await asyncio.gather(*(worker(path) for path in paths), return_exceptions=True)
     
-    return topic
+    changed = []
+    for path, result in zip(paths, results):
+        if isinstance(result, BaseException):
+            print(f"❌ {path.stem}: {result}")
+        elif result is not None:
+            changed.append((path, result))
+    
+    with PublishTransaction(store, push) as transaction:
+        for path, text in changed:
+            transaction.update(path, text, read_frontmatter(text).get("title") or path.stem)
+        if not transaction.commit():
+            changed = []
+    
+    elapsed = time.monotonic() - started
+    print(f"📊 Yenileme: {len(changed)} değişti, {len(paths) - len(changed)} aynı/atlandı, {elapsed:.0f}s")
+    return [path for path, _ in changed]
 
 
 # ============================================
-# FILE OPERATIONS
+# DAEMON (--daemon)
 # ============================================
 
-def save_article(content: str, topic: dict) -> Path:
-    """MDX dosyası kaydet"""
-    CONTENT_DIR.mkdir(parents=True, exist_ok=True)
+DAEMON_POSTS_PER_DAY = int(os.environ.get("DAEMON_POSTS_PER_DAY", "1"))
+DAEMON_STATUS_FILE = CACHE_DIR / "daemon-status.json"
+# Uyku en fazla bu kadar sürer - status heartbeat'i ve gece yarısı devri kaçmasın
+DAEMON_POLL_SECONDS = 60.0
+# Kota sıfırlanır sıfırlanmaz değil, saat kayması payıyla başla
+DAEMON_RESET_MARGIN = 300.0
+# Bir makale için ayrılan istek payı (konu + draft + humanize + doğrulama tekrarı)
+ARTICLE_REQUEST_BUDGET = 6
+# Daemon'un aynı checkpoint'i devam ettirme hakkı; aşılınca checkpoint failed/'a, konu kuyruktan düşer
+DAEMON_CHECKPOINT_ATTEMPTS = int(os.environ.get("DAEMON_CHECKPOINT_ATTEMPTS", "3"))
+
+
+async def write_next_article(key_manager: APIKeyManager, store: ContentStore, push: bool = True,
+                             coverage: Optional[CoverageIndex] = None,
+                             index: Optional[SimilarityIndex] = None) -> Optional[Path]:
+    """Sıradaki konu (yoksa yeni konu) → makale → yayın; tek event loop'ta
     
-    filepath = CONTENT_DIR / f"{topic['slug']}.mdx"
+    Konu/doğrulama başarısızsa None; deadline dolarsa RetryDeadlineError,
+    kota bittiyse QuotaExhaustedError, yayın geri alındıysa PublishError.
+    """
+    # Sıradaki konuyu al - en az kapsanan kategori, en yüksek keyword kazancı
+    coverage = coverage or load_coverage_index(store)
+    topic = get_next_topic(store, coverage)
     
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(content)
+    if not topic:
+        # Otomatik yeni konu üret
+        print("📋 Hazır konu yok, yeni üretiliyor...")
+        category = get_next_category(store, coverage)
+        index = index or load_similarity_index(store)
+        topic = await generate_new_topic_async(key_manager, store, category, index=index)
+        if not topic or not add_new_topic(store, index, topic):
+            print(f"⚠️ {TOPIC_DEDUP_ATTEMPTS} denemede benzersiz konu bulunamadı")
+            return None
     
-    print(f"💾 Kaydedildi: {filepath}")
-    return filepath
+    # Makale üret
+    print(f"\n{'='*50}")
+    print(f"📌 Konu: {topic['title']}")
+    print(f"📂 Kategori: {topic.get('category', 'general')}")
+    print(f"{'='*50}\n")
+    
+    checkpoint = new_checkpoint(topic)
+    try:
+        await generate_article_async(key_manager, topic, checkpoint)
+    except ValidationError as e:
+        print(f"❌ {topic['slug']}: {e} (kaydedilmedi, --resume ile tekrar denenebilir)")
+        return None
+    except (RetryDeadlineError, QuotaExhaustedError) as e:
+        print(f"{e} - {topic['slug']} yarım kaldı, --resume ile devam edilebilir")
+        raise
+    
+    # Kaydet + history/topic status + git - tek transaction
+    if not publish_articles([checkpoint], store, push):
+        raise PublishError(f"❌ {topic['slug']} yayınlanamadı")
+    coverage.add_topic(topic)
+    return Path(checkpoint["filepath"])
 
 
-def git_commit_push(filepath: Path, topic: dict):
-    """Git commit ve push"""
-    try:
-        subprocess.run(["git", "add", str(filepath)], check=True, cwd=BASE_DIR)
-        subprocess.run(["git", "add", str(HISTORY_FILE)], check=True, cwd=BASE_DIR)
-        subprocess.run(["git", "add", str(TOPICS_FILE)], check=True, cwd=BASE_DIR)
+def daemon_slots(start: datetime, end: datetime, per_day: int) -> List[datetime]:
+    """Kota gününe eşit aralıklı yayın zamanları; ilki kota sıfırlandıktan hemen sonra"""
+    step = (end - start) / max(1, per_day)
+    return [start + timedelta(seconds=DAEMON_RESET_MARGIN) + step * i for i in range(max(1, per_day))]
+
+
+class DaemonStatus:
+    """Daemon durumu: DAEMON_STATUS_FILE'a yazılır, istenirse HTTP'den sunulur
+    
+    GET /status (veya /) → JSON, GET /healthz → son heartbeat taze ise 200, değilse 503
+    """
+    
+    def __init__(self, path: Optional[Path] = None, port: Optional[int] = None):
+        self.path = path or DAEMON_STATUS_FILE
+        self.data = {"pid": os.getpid(), "startedAt": datetime.now().isoformat(), "state": "starting"}
+        self.server = None
+        if port:
+            self._serve(port)
+    
+    def _serve(self, port: int):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        status = self
         
-        msg = f"📝 New article: {topic['title']}"
-        subprocess.run(["git", "commit", "-m", msg], check=True, cwd=BASE_DIR)
-        subprocess.run(["git", "push"], check=True, cwd=BASE_DIR)
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                data = dict(status.data)
+                if self.path.rstrip("/") == "/healthz":
+                    age = time.time() - data.get("heartbeat", 0)
+                    code = 200 if age < DAEMON_POLL_SECONDS * 3 else 503
+                elif self.path.rstrip("/") in ("", "/status"):
+                    code = 200
+                else:
+                    code, data = 404, {"error": "not found"}
+                body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
         
-        print("🚀 GitHub'a push edildi!")
-    except subprocess.CalledProcessError as e:
-        print(f"⚠️ Git hatası: {e}")
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"🩺 Status: http://127.0.0.1:{port}/status")
+    
+    def update(self, **fields):
+        self.data = {**self.data, **fields, "heartbeat": round(time.time(), 3)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_json_atomic(self.path, self.data)
+    
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+
+
+def resumable_checkpoints(store: ContentStore) -> List[dict]:
+    """Daemon'un bu turda devam ettireceği checkpoint'ler (deneme sayacı artırılır)
+    
+    Hakkını dolduran checkpoint failed/'a taşınır, konusu status=failed olur -
+    aynı konu her uyanışta kotayı yakmaz.
+    """
+    resumable = []
+    for checkpoint in list_checkpoints():
+        slug = checkpoint["topic"]["slug"]
+        attempts = checkpoint.get("resumeAttempts", 0)
+        if attempts >= DAEMON_CHECKPOINT_ATTEMPTS:
+            target = quarantine_checkpoint(checkpoint)
+            store.mark_topic_failed(slug)
+            print(f"🚫 {slug}: {attempts} denemede tamamlanamadı, karantinada: {target}")
+            continue
+        checkpoint["resumeAttempts"] = attempts + 1
+        save_checkpoint(checkpoint)
+        resumable.append(checkpoint)
+    return resumable
+
+
+async def run_daemon(key_manager: APIKeyManager, store: ContentStore, posts_per_day: int,
+                     push: bool = True, status_port: Optional[int] = None,
+                     run_deadline: Optional[float] = None):
+    """Uzun ömürlü yayın döngüsü (tek event loop)
+    
+    - Model client'ları, store, kapsama ve benzerlik indeksleri süreç boyunca sıcak
+    - Kota günü (Pasifik gece yarısı) posts_per_day eşit slota bölünür; ilk slot
+      sıfırlamanın hemen ardından, kalanlar gün boyunca
+    - Geride kalınan slotlar kota yettikçe sırayla kapatılır; kalan günlük istek
+      ARTICLE_REQUEST_BUDGET'ın altındaysa bir sonraki sıfırlamaya kadar beklenir
+    - Yarım kalan checkpoint'ler her turda önce tamamlanır; DAEMON_CHECKPOINT_ATTEMPTS
+      turda bitmeyen checkpoint karantinaya alınır, döngü yeni konulara geçer
+    - SIGTERM/SIGINT: o anki uyku biter, döngü temiz kapanır
+    """
+    import signal
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    
+    status = DaemonStatus(port=status_port)
+    coverage = load_coverage_index(store)
+    index = load_similarity_index(store)
+    published = 0
+    failures = 0
+    retry_at = datetime.min
+    print(f"🛰️ Daemon: günde {posts_per_day} post, {len(key_manager.keys)} key")
+    
+    try:
+        while not stop.is_set():
+            start, end = quota_window()
+            slots = daemon_slots(start, end, posts_per_day)
+            now = datetime.now()
+            done = store.published_between(start, end)
+            due = sum(1 for slot in slots if slot <= now)
+            remaining = key_manager.remaining_today()
+            
+            if done >= due:
+                state = "idle"
+                wake = next((slot for slot in slots if slot > now), None) or daemon_slots(
+                    end, end + (end - start), posts_per_day)[0]
+            elif remaining < ARTICLE_REQUEST_BUDGET:
+                state, wake = "quota-wait", end + timedelta(seconds=DAEMON_RESET_MARGIN)
+            elif now < retry_at:
+                state, wake = "backoff", retry_at
+            else:
+                state, wake = "generating", now
+            status.update(state=state, quotaDay=key_manager.day, postsToday=done, target=posts_per_day,
+                          due=due, remainingRequests=remaining, nextRunAt=wake.isoformat(),
+                          published=published, totalPosts=store.total_posts)
+            
+            if state == "generating":
+                RETRY_POLICY.start_run(run_deadline)
+                written, error = [], None
+                try:
+                    checkpoints = resumable_checkpoints(store)
+                    if checkpoints:
+                        written = await run_batch(key_manager, store, concurrency=len(key_manager.keys),
+                                                  push=push, resume=True,
+                                                  topics=[c["topic"] for c in checkpoints])
+                        for path in written:
+                            coverage.add_topic(store.get_topic(path.stem) or {})
+                    else:
+                        path = await write_next_article(key_manager, store, push, coverage, index)
+                        written = [path] if path else []
+                except QuotaExhaustedError:
+                    # Hata değil: döngü bir sonraki turda quota-wait'e geçer, backoff yok
+                    continue
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    print(f"❌ Daemon turu başarısız: {error}")
+                
+                if written:
+                    published += len(written)
+                    failures = 0
+                    status.update(lastArticle=str(written[-1]), lastError=None)
+                    continue
+                # Aynı hata kotayı yakmasın: 1, 2, 4 ... dakika, en fazla 1 saat
+                failures += 1
+                retry_at = datetime.now() + timedelta(seconds=min(DAEMON_POLL_SECONDS * 2 ** (failures - 1), 3600))
+                status.update(state="backoff", nextRunAt=retry_at.isoformat(),
+                              lastError=error or "makale yazılamadı", lastErrorAt=datetime.now().isoformat())
+                wake = retry_at
+            
+            sleep = min(max(1.0, (wake - datetime.now()).total_seconds()), DAEMON_POLL_SECONDS)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=sleep)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        status.update(state="stopped", published=published)
+        status.close()
+        print(f"🛑 Daemon durdu: {published} makale yayınlandı")
 
 
 # ============================================
@@ -601,88 +4625,234 @@ def git_commit_push(filepath: Path, topic: dict):
 # ============================================
 
 def main():
+    global REQUEST_TIMEOUT, STREAM_OUTPUT, SECTION_HUMANIZE, HUMANIZE_MODE
+    
     parser = argparse.ArgumentParser(description="RetrofitAge Content Manager")
     parser.add_argument("--all", action="store_true", help="Generate all pending topics")
     parser.add_argument("--new-topic", action="store_true", help="Suggest new topic (Gemini)")
+    parser.add_argument("--new-topics", type=int, default=None, metavar="N",
+                        help=f"Suggest N topics across categories, up to {TOPIC_BATCH_SIZE} per call")
     parser.add_argument("--no-push", action="store_true", help="Skip git push")
     parser.add_argument("--force", action="store_true", help="Skip daily limit check")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Draft workers with --all (default: number of API keys)")
+    parser.add_argument("--humanize-concurrency", type=int, default=None,
+                        help="Humanize workers with --all (default: same as --concurrency)")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="Max drafts waiting for humanize (default: humanize workers)")
+    parser.add_argument("--draft-keys", default=None,
+                        help="Key numbers for the draft stage, e.g. '1-5' (default: all)")
+    parser.add_argument("--humanize-keys", default=None,
+                        help="Key numbers for the humanize stage, e.g. '6-10' (default: all)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help=f"Per-request timeout in seconds (default: {REQUEST_TIMEOUT:.0f})")
+    parser.add_argument("--deadline", type=float, default=float(os.environ.get("GEMINI_RUN_DEADLINE", "0")),
+                        help="Give up on model calls after this many seconds of the run (default: no limit)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the Gemini response cache")
+    parser.add_argument("--purge-cache", action="store_true", help="Delete all cached responses and exit")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue unfinished articles from their last checkpoint")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream completions, validate frontmatter early and write MDX incrementally")
+    parser.add_argument("--section-humanize", action="store_true",
+                        help="Humanize drafts section by section (split at H2) in parallel")
+    parser.add_argument("--humanize", choices=HUMANIZE_MODES, default=HUMANIZE_MODE,
+                        help=f"auto: score drafts locally, skip or narrow the humanize pass; "
+                             f"full: always humanize the whole draft (default: {HUMANIZE_MODE})")
+    parser.add_argument("--validate", nargs="*", metavar="SLUG", default=None,
+                        help="Validate the given posts (default: all of content/posts) in parallel and exit")
+    parser.add_argument("--refresh", nargs="*", metavar="SLUG", default=None,
+                        help="Refresh existing posts (default: all matching the filters below) and commit only changed ones")
+    parser.add_argument("--refresh-pass", choices=REFRESH_PASSES, default="update",
+                        help="Pass to re-run with --refresh: targeted update prompt or humanize (default: update)")
+    parser.add_argument("--older-than", type=int, default=None, metavar="DAYS",
+                        help="--refresh only posts dated more than DAYS ago")
+    parser.add_argument("--category", action="append", default=None,
+                        help="--refresh only this category (repeatable)")
+    parser.add_argument("--match", default=None, metavar="REGEX",
+                        help="--refresh only posts whose text matches REGEX (case-insensitive), e.g. '2025'")
+    parser.add_argument("--limit", type=int, default=None, help="--refresh at most N posts (oldest first)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running and publish --posts-per-day articles spread over each quota day")
+    parser.add_argument("--posts-per-day", type=int, default=DAEMON_POSTS_PER_DAY, metavar="N",
+                        help=f"Daily publishing target in --daemon mode (default: {DAEMON_POSTS_PER_DAY})")
+    parser.add_argument("--status-port", type=int, default=int(os.environ.get("DAEMON_STATUS_PORT", "0")) or None,
+                        metavar="PORT", help="Serve daemon status on 127.0.0.1:PORT (/status, /healthz)")
+    parser.add_argument("--plan", type=int, default=None, metavar="N",
+                        help="Print the next N days' category/topic schedule and exit (no model calls)")
+    parser.add_argument("--manifest", action="store_true",
+                        help="Update content/manifest.json and the search index from content/posts and exit")
+    parser.add_argument("--provider", choices=list(MODEL_PROVIDERS),
+                        default=os.environ.get("CONTENT_PROVIDER", "gemini"),
+                        help="Model backend (default: gemini; 'stub' runs offline without keys or SDK, into --output)")
+    parser.add_argument("--output", type=Path, default=None, metavar="DIR",
+                        help="Write posts, manifest, search index, topics/history and local state under DIR "
+                             "instead of the repo, without git (default with --provider stub: a temp dir)")
+    parser.add_argument("--telemetry", type=Path, default=None, metavar="PATH",
+                        help="Write the JSONL telemetry log here (default: scripts/.cache/telemetry/<run>.jsonl)")
     args = parser.parse_args()
     
+    if args.purge_cache:
+        print(f"🗑️ Cache temizlendi: {RESPONSE_CACHE.purge()} yanıt silindi")
+        return
+    
+    if args.validate is not None:
+        posts = update_post_manifest()
+        paths = ([CONTENT_DIR / f"{slug}.mdx" for slug in args.validate] if args.validate
+                 else sorted(CONTENT_DIR.glob("*.mdx")))
+        known = {slug: entry["category"] for slug, entry in posts.items()}
+        if print_validation_report(validate_posts(paths, known)):
+            raise SystemExit(1)
+        return
+    
+    if args.manifest:
+        posts = update_post_manifest()
+        update_search_index(posts)
+        print(f"🗂️ Manifest + arama indeksi: {len(posts)} post")
+        return
+    
+    if args.plan:
+        store = ContentStore()
+        try:
+            print_plan(store, args.plan)
+        finally:
+            store.close()
+        return
+    
+    # Stub çıktısı repo'ya yazılmaz: ayrı dizin, git yok
+    if args.output is None and args.provider == "stub":
+        args.output = Path(tempfile.mkdtemp(prefix="retrofitage-stub-"))
+    if args.output is not None:
+        redirect_output(args.output.resolve())
+        args.no_push = True
+    
+    RESPONSE_CACHE.enabled = not args.no_cache
+    RESPONSE_CACHE.evict()
+    
+    if args.timeout:
+        REQUEST_TIMEOUT = args.timeout
+    RETRY_POLICY.start_run(args.deadline)
+    STREAM_OUTPUT = args.stream
+    SECTION_HUMANIZE = SECTION_HUMANIZE or args.section_humanize
+    HUMANIZE_MODE = args.humanize
+    
     print("RetrofitAge Smart Content Manager")
     print("=" * 50)
     
+    TELEMETRY.start(args.telemetry)
+    provider = select_provider(args.provider)
+    
     # Load
-    key_manager = APIKeyManager()
-    history = load_history()
-    topics_data = load_topics()
+    if provider.needs_key:
+        key_manager = APIKeyManager()
+    else:
+        # 10 sahte key (CI'daki gibi) - gerçek key'lerin günlük ledger'ına dokunulmaz
+        key_manager = APIKeyManager(CACHE_DIR / f"key-usage-{provider.name}.json",
+                                    keys=[f"{provider.name}-{i}" for i in range(1, 11)])
+    store = ContentStore()
+    try:
+        run(args, key_manager, store)
+    finally:
+        key_manager.save_ledger()
+        store.close()
+        TELEMETRY.finish()
+
+
+def run(args, key_manager: APIKeyManager, store: ContentStore):
+    """main() gövdesi - store her durumda kapatılıp JSON'a aktarılsın diye ayrı"""
+    print(f"Total published: {store.total_posts} posts")
+    
+    pipeline_options = {
+        "concurrency": args.concurrency or len(key_manager.keys),
+        "humanize_concurrency": args.humanize_concurrency,
+        "queue_size": args.queue_size,
+        "draft_keys": key_manager.parse_pool(args.draft_keys),
+        "humanize_keys": key_manager.parse_pool(args.humanize_keys),
+    }
+    
+    # Var olan post'ları yenile (günlük limit uygulanmaz)
+    if args.refresh is not None:
+        paths = select_refresh_posts(args.refresh, args.older_than, args.category, args.match, args.limit)
+        asyncio.run(run_refresh(key_manager, store, paths, args.refresh_pass,
+                                concurrency=pipeline_options["concurrency"], push=not args.no_push))
+        return
+    
+    # Daemon: checkpoint'ler, günlük limit ve konu seçimi döngünün içinde
+    if args.daemon:
+        asyncio.run(run_daemon(key_manager, store, args.posts_per_day, push=not args.no_push,
+                               status_port=args.status_port, run_deadline=args.deadline))
+        return
     
-    print(f"Total published: {history.get('totalPosts', 0)} posts")
+    # Yarım kalanları tamamla (--all ile birlikte: önce checkpoint'ler, sonra bekleyenler)
+    if args.resume:
+        checkpoints = list_checkpoints()
+        if checkpoints:
+            for checkpoint in checkpoints:
+                print(f"⏯️ Devam: {checkpoint['topic']['slug']} ({checkpoint_stage(checkpoint)})")
+            written = asyncio.run(run_batch(key_manager, store, push=not args.no_push,
+                                            resume=True, topics=[c["topic"] for c in checkpoints],
+                                            **pipeline_options))
+            print(f"✅ {len(written)} yarım makale tamamlandı")
+        else:
+            print("⏯️ Yarım kalmış makale yok.")
+        if not args.all:
+            return
     
-    # Daily check
-    if not args.force and not args.new_topic and already_posted_today(history):
+    # Daily check (--all bilinçli bir backfill, limit uygulanmaz)
+    if (not args.force and not args.new_topic and not args.new_topics and not args.all
+            and already_posted_today(store)):
         print("Already posted today. Try again tomorrow.")
         print("(Use --force to skip this check)")
         return
     
     # Yeni konu üret
     if args.new_topic:
-        category = get_next_category(history)
-        new_topic = generate_new_topic(key_manager, history, category)
+        category = get_next_category(store)
+        index = load_similarity_index(store)
+        new_topic = generate_new_topic(key_manager, store, category, index=index)
         
-        topics_data.setdefault("topics", []).append(new_topic)
-        save_topics(topics_data)
+        if not new_topic or not add_new_topic(store, index, new_topic):
+            print(f"⚠️ {TOPIC_DEDUP_ATTEMPTS} denemede benzersiz konu bulunamadı, eklenmedi")
+            return
         
         print(f"\n✅ Yeni konu eklendi: {new_topic['title']}")
         print(f"📂 Kategori: {category}")
         return
     
-    # Sıradaki konuyu al
-    topic = get_next_topic(topics_data, history)
-    
-    if not topic:
-        # Otomatik yeni konu üret
-        print("📋 Hazır konu yok, yeni üretiliyor...")
-        category = get_next_category(history)
-        topic = generate_new_topic(key_manager, history, category)
-        topics_data.setdefault("topics", []).append(topic)
-    
-    # Makale üret
-    print(f"\n{'='*50}")
-    print(f"📌 Konu: {topic['title']}")
-    print(f"📂 Kategori: {topic.get('category', 'general')}")
-    print(f"{'='*50}\n")
-    
-    article = generate_article(key_manager, topic)
-    
-    # Kaydet
-    filepath = save_article(article, topic)
-    
-    # History güncelle
-    history["publishedSlugs"].append(topic["slug"])
-    history["publishedTitles"].append(topic["title"])
-    history["publishedKeywords"].extend(topic.get("keywords", []))
-    history["lastCategory"] = topic.get("category")
-    history["totalPosts"] = history.get("totalPosts", 0) + 1
-    history["lastPublishDate"] = datetime.now().isoformat()
-    history["categoryRotation"] = history.get("categoryRotation", 0) + 1
-    save_history(history)
+    # Toplu konu üret - tek çağrıda TOPIC_BATCH_SIZE'a kadar
+    if args.new_topics:
+        index = load_similarity_index(store)
+        topics = generate_topic_batch(key_manager, store, args.new_topics, index=index)
+        added = [topic for topic in topics if add_new_topic(store, index, topic)]
+        
+        print(f"\n✅ {len(added)}/{args.new_topics} yeni konu eklendi")
+        for topic in added:
+            print(f"   📂 {topic['category']}: {topic['title']}")
+        return
     
-    # Topic status güncelle
-    for t in topics_data.get("topics", []):
-        if t.get("slug") == topic["slug"]:
-            t["status"] = "published"
-            t["publishedAt"] = datetime.now().isoformat()
-    save_topics(topics_data)
+    # Tüm bekleyenler - paralel batch
+    if args.all:
+        written = asyncio.run(run_batch(key_manager, store, push=not args.no_push,
+                                        **pipeline_options))
+        
+        print(f"\n{'='*50}")
+        print("🎉 Tamamlandı!")
+        print(f"📄 Yazılan: {len(written)} makale")
+        print(f"📊 Toplam post: {store.total_posts}")
+        return
     
-    # Git
-    if not args.no_push:
-        git_commit_push(filepath, topic)
+    try:
+        filepath = asyncio.run(write_next_article(key_manager, store, push=not args.no_push))
+    except (RetryDeadlineError, QuotaExhaustedError, PublishError):
+        raise SystemExit(1)
+    if filepath is None:
+        return
     
     print(f"\n{'='*50}")
     print("🎉 Tamamlandı!")
     print(f"📄 Dosya: {filepath}")
-    print(f"📊 Toplam post: {history['totalPosts']}")
-    print(f"📂 Sonraki kategori: {CONTENT_CATEGORIES[history['categoryRotation'] % len(CONTENT_CATEGORIES)]}")
+    print(f"📊 Toplam post: {store.total_posts}")
+    print(f"📂 Sonraki kategori: {get_next_category(store)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+// src/lib/search.ts against scripts/tests/fixtures/search-tokenize.json
+// Usage: node scripts/tests/check_search.cjs (needs `npm install` for typescript)
+const fs = require('fs')
+const path = require('path')
+const ts = require('typescript')
+
+const root = path.join(__dirname, '..', '..')
+const source = fs.readFileSync(path.join(root, 'src/lib/search.ts'), 'utf8')
+const { outputText } = ts.transpileModule(source, {
+  compilerOptions: { module: ts.ModuleKind.CommonJS, target: ts.ScriptTarget.ES2019 },
+})
+const search = { exports: {} }
+new Function('module', 'exports', outputText)(search, search.exports)
+const { tokenize, prefixTerms } = search.exports
+
+const fixture = JSON.parse(fs.readFileSync(path.join(__dirname, 'fixtures/search-tokenize.json'), 'utf8'))
+const failures = []
+for (const { query, tokens } of fixture.tokenize) {
+  const got = tokenize(query)
+  if (JSON.stringify(got) !== JSON.stringify(tokens)) {
+    failures.push(`tokenize(${JSON.stringify(query)}) = ${JSON.stringify(got)}, expected ${JSON.stringify(tokens)}`)
+  }
+}
+for (const { term, shard, terms } of fixture.prefix) {
+  const got = prefixTerms(term, shard)
+  if (JSON.stringify(got) !== JSON.stringify(terms)) {
+    failures.push(`prefixTerms(${JSON.stringify(term)}) = ${JSON.stringify(got)}, expected ${JSON.stringify(terms)}`)
+  }
+}
+
+if (failures.length) {
+  console.error(failures.join('\n'))
+  process.exit(1)
+}
+console.log(`search.ts: ${fixture.tokenize.length} tokenize + ${fixture.prefix.length} prefix cases ok`)
@@ -0,0 +1,31 @@
+"""scripts/ testleri: python -m pytest scripts/tests"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import generate_content as gc  # noqa: E402
+
+
+@pytest.fixture
+def gc_paths(tmp_path, monkeypatch):
+    """generate_content'in tüm dosya yollarını (git cwd'si dahil) tmp_path'e yönlendir"""
+    monkeypatch.setattr(gc, "BASE_DIR", tmp_path)
+    monkeypatch.setattr(gc, "CONTENT_DIR", tmp_path / "content" / "posts")
+    monkeypatch.setattr(gc, "HISTORY_FILE", tmp_path / "content-history.json")
+    monkeypatch.setattr(gc, "TOPICS_FILE", tmp_path / "topics.json")
+    monkeypatch.setattr(gc, "CACHE_DIR", tmp_path / ".cache")
+    monkeypatch.setattr(gc, "KEY_LEDGER_FILE", tmp_path / ".cache" / "key-usage.json")
+    monkeypatch.setattr(gc, "CONTENT_DB_FILE", tmp_path / ".cache" / "content.db")
+    monkeypatch.setattr(gc, "MANIFEST_FILE", tmp_path / "content" / "manifest.json")
+    monkeypatch.setattr(gc, "MANIFEST_STAMPS_FILE", tmp_path / ".cache" / "manifest-stamps.json")
+    monkeypatch.setattr(gc, "SEARCH_INDEX_DIR", tmp_path / "content" / "search")
+    monkeypatch.setattr(gc, "SIMILARITY_INDEX_FILE", tmp_path / ".cache" / "similarity-index.json")
+    monkeypatch.setattr(gc, "RELATED_INDEX_FILE", tmp_path / ".cache" / "related-index.json")
+    monkeypatch.setattr(gc, "CHECKPOINT_DIR", tmp_path / ".cache" / "checkpoints")
+    monkeypatch.setattr(gc, "TELEMETRY_DIR", tmp_path / ".cache" / "telemetry")
+    gc.CONTENT_DIR.mkdir(parents=True)
+    gc.CACHE_DIR.mkdir(parents=True)
+    return tmp_path
@@ -0,0 +1,76 @@
+"""AI ifade dedektörü: PhraseMatcher (Aho-Corasick) ve ifade listesi"""
+
+import pytest
+
+import generate_content as gc
+
+
+@pytest.mark.parametrize("phrases, text, expected", [
+    # Örtüşen ifadeler: hepsi, bitiş sırasıyla
+    (["he", "she", "his", "hers"], "she said his and hers", ["she", "his", "hers"]),
+    (["deep dive", "dive into", "deep dive into the"], "a deep dive into the details",
+     ["deep dive", "dive into", "deep dive into the"]),
+    (["in the realm", "the realm of"], "in the realm of smart homes", ["in the realm", "the realm of"]),
+    # Biri diğerinin son eki: fail linki çıktıyı devralır
+    (["tapestry", "rich tapestry"], "a rich tapestry", ["rich tapestry", "tapestry"]),
+    (["embark on"], "embark on embark on", ["embark on", "embark on"]),
+])
+def test_overlapping_phrases(phrases, text, expected):
+    assert gc.PhraseMatcher(phrases).findall(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("unleashing potential", ["unleashing"]),
+    ("unleashed potential", []),            # kelime içinde değil
+    ("preunleashing", []),
+    ("ushers in", []),                      # "he" / "she" / "hers" kelime ortasında
+    ("unleashing, then unleashing.", ["unleashing", "unleashing"]),
+    ("(unleashing)", ["unleashing"]),
+    ("unleashing2", []),
+    ("a game-changer-style fix", ["game-changer"]),  # tire kelime sınırı
+    ("", []),
+])
+def test_word_boundaries(text, expected):
+    assert gc.PhraseMatcher(["unleashing", "he", "she", "hers", "game-changer"]).findall(text) == expected
+
+
+def test_punctuation_edges_of_phrase_do_not_need_boundaries():
+    matcher = gc.PhraseMatcher(["let's explore", "it's worth noting"])
+    assert matcher.findall("so,let's explore it's worth noting:") == ["let's explore", "it's worth noting"]
+
+
+def test_empty_matcher_finds_nothing():
+    assert gc.PhraseMatcher([]).findall("anything at all") == []
+
+
+def test_case_and_whitespace_folding(tmp_path, monkeypatch):
+    phrases_file = tmp_path / "ai-phrases.txt"
+    phrases_file.write_text("# yorum\n  Delve   Into \nGAME-CHANGER\ndelve into\n\nIt’s Worth Noting\n",
+                            encoding='utf-8')
+    monkeypatch.setattr(gc, "AI_PHRASES_FILE", phrases_file)
+    monkeypatch.setattr(gc, "_phrase_matcher", None)
+
+    phrases = gc.load_ai_phrases()
+    assert phrases.count("delve into") == 1
+    assert {"game-changer", "it's worth noting"} <= set(phrases)
+    assert not any(p.startswith("#") or p != p.lower() for p in phrases)
+
+    text = "We **Delve\nINTO** the [Game-Changer](https://example.com) idea. IT’S WORTH NOTING that bars help."
+    assert gc.phrase_matcher().findall(gc.plain_text(text)) == ["delve into", "game-changer", "it's worth noting"]
+
+
+def test_style_report_counts_phrases_only_in_prose(monkeypatch):
+    monkeypatch.setattr(gc, "_phrase_matcher", gc.PhraseMatcher(["delve into"]))
+    text = "\n".join([
+        "Let us Delve Into grab bars.",
+        "",
+        "## We Delve Into Headings Too",
+        "",
+        "| Delve into | tables |",
+        "",
+        "- delve into lists as well",
+        "",
+    ])
+    report = gc.ai_style_report(text)
+    assert report["phrases"] == {"delve into": 2}
+    assert report["offending"] == [0, 3]
@@ -0,0 +1,129 @@
+"""PublishTransaction: commit/push başarısızsa her şey byte byte geri döner"""
+
+import subprocess
+
+import pytest
+
+import generate_content as gc
+
+
+EXISTING = """---
+title: "Grab Bars for Bathroom Safety"
+description: "Where to mount grab bars."
+date: "2026-01-05"
+category: "bathroom-safety"
+tags: ["grab bars", "bathroom"]
+---
+
+Grab bars belong next to the toilet and inside the shower.
+"""
+
+NEW_TOPIC = {"title": "Stairlift Costs Explained", "slug": "stairlift-costs-explained",
+             "keywords": ["stairlift cost", "stair lift"], "category": "mobility", "status": "pending"}
+
+NEW_ARTICLE = """---
+title: "Stairlift Costs Explained"
+description: "What a stairlift really costs."
+date: "2026-02-01"
+category: "mobility"
+tags: ["stairlift cost", "stair lift"]
+---
+
+A straight stairlift usually costs between two and five thousand dollars installed.
+"""
+
+
+def run_git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def tree_bytes(root):
+    """content/ altındaki tüm dosyalar + JSON kaynakları → içerik"""
+    files = [p for p in (root / "content").rglob("*") if p.is_file()]
+    files += [root / "topics.json", root / "content-history.json"]
+    return {str(p.relative_to(root)): p.read_bytes() for p in files}
+
+
+@pytest.fixture
+def repo(gc_paths):
+    """Bir post'u yayınlanmış, bir konusu bekleyen, temiz çalışma ağacı olan git repo"""
+    (gc_paths / ".gitignore").write_text(".cache/\nremote.git/\n")
+    (gc.CONTENT_DIR / "grab-bars-for-bathroom-safety.mdx").write_text(EXISTING, encoding='utf-8')
+    gc.write_json_atomic(gc.TOPICS_FILE, {"topics": [dict(NEW_TOPIC)], "future_topics": []})
+    gc.write_json_atomic(gc.HISTORY_FILE, {"publishedSlugs": ["grab-bars-for-bathroom-safety"],
+                                           "publishedTitles": ["Grab Bars for Bathroom Safety"],
+                                           "totalPosts": 1})
+    store = gc.ContentStore()
+    gc.update_search_index(gc.update_post_manifest())
+    store.flush()
+
+    run_git(gc_paths, "init", "-q")
+    run_git(gc_paths, "config", "user.email", "test@example.com")
+    run_git(gc_paths, "config", "user.name", "test")
+    run_git(gc_paths, "add", "-A")
+    run_git(gc_paths, "commit", "-q", "-m", "initial")
+    run_git(gc_paths, "init", "-q", "--bare", "remote.git")
+    run_git(gc_paths, "remote", "add", "origin", str(gc_paths / "remote.git"))
+    run_git(gc_paths, "push", "-q", "-u", "origin", "HEAD")
+    yield store
+    store.close()
+
+
+def failing_push(monkeypatch):
+    """Sunucu bağlantısı kopmuş gibi: add + commit olur, push'ta OSError"""
+    real_git = gc.git
+
+    def git(*args):
+        if args[0] == "push":
+            raise OSError("connection reset")
+        return real_git(*args)
+
+    monkeypatch.setattr(gc, "git", git)
+
+
+@pytest.mark.parametrize("failure", ["raise", "push-rejected"])
+def test_failed_commit_restores_everything(repo, gc_paths, monkeypatch, failure):
+    store = repo
+    if failure == "raise":
+        failing_push(monkeypatch)
+    else:
+        # remote kayboldu → git push CalledProcessError → git_commit_push False
+        run_git(gc_paths, "remote", "set-url", "origin", str(gc_paths / "missing.git"))
+    head = run_git(gc_paths, "rev-parse", "HEAD")
+    files_before = tree_bytes(gc_paths)
+    store_before = store.snapshot()
+
+    checkpoint = gc.new_checkpoint(dict(NEW_TOPIC))
+    checkpoint["cleaned"] = NEW_ARTICLE
+    gc.save_checkpoint(checkpoint)
+
+    if failure == "raise":
+        with pytest.raises(OSError):
+            gc.publish_articles([checkpoint], store, push=True)
+    else:
+        assert gc.publish_articles([checkpoint], store, push=True) is False
+
+    assert tree_bytes(gc_paths) == files_before
+    assert store.export_history()["publishedSlugs"] == ["grab-bars-for-bathroom-safety"]
+    assert not (gc.CONTENT_DIR / "stairlift-costs-explained.mdx").exists()
+    assert store.snapshot() == store_before
+    assert [t["slug"] for t in store.pending_topics()] == ["stairlift-costs-explained"]
+    assert run_git(gc_paths, "rev-parse", "HEAD") == head
+    assert run_git(gc_paths, "status", "--porcelain") == ""
+
+    saved = gc.load_checkpoint("stairlift-costs-explained")
+    assert "filepath" not in saved and "recorded" not in saved
+    assert saved["cleaned"] == NEW_ARTICLE
+
+
+def test_successful_commit_publishes(repo, gc_paths):
+    store = repo
+    checkpoint = gc.new_checkpoint(dict(NEW_TOPIC))
+    checkpoint["cleaned"] = NEW_ARTICLE
+
+    assert gc.publish_articles([checkpoint], store, push=True) is True
+    assert run_git(gc_paths, "log", "-1", "--format=%s") == "📝 New article: Stairlift Costs Explained"
+    assert run_git(gc_paths, "rev-parse", "HEAD") == run_git(gc_paths / "remote.git", "rev-parse", "HEAD")
+    assert run_git(gc_paths, "status", "--porcelain") == ""
+    assert store.is_published("stairlift-costs-explained")
+    assert gc.load_checkpoint("stairlift-costs-explained") is None
@@ -0,0 +1,177 @@
+"""RetryPolicy: hata sınıflandırma, sunucu bekleme süresi, deadline"""
+
+import asyncio
+import time
+import types
+
+import pytest
+
+import generate_content as gc
+
+
+class ResourceExhausted(Exception):
+    code = 429
+
+
+class ServiceUnavailable(Exception):
+    code = 503
+
+
+class InvalidArgument(Exception):
+    code = 400
+
+
+class GatewayTimeout(Exception):
+    code = 504
+
+
+def retry_info(seconds: int, nanos: int = 0):
+    return types.SimpleNamespace(retry_delay=types.SimpleNamespace(seconds=seconds, nanos=nanos))
+
+
+def with_attrs(exc: Exception, **attrs) -> Exception:
+    for name, value in attrs.items():
+        setattr(exc, name, value)
+    return exc
+
+
+def http_error(status: int, headers: dict) -> Exception:
+    """requests/httpx tarzı: status_code + response.headers"""
+    return with_attrs(Exception(f"HTTP {status}"), status_code=status,
+                      response=types.SimpleNamespace(headers=headers))
+
+
+CASES = [
+    # (ad, exception, sınıf, retry_after)
+    ("429 RetryInfo", with_attrs(ResourceExhausted("429 quota"), details=[retry_info(34, 500_000_000)]),
+     gc.RATE_LIMITED, 34.5),
+    ("429 retryDelay dict", with_attrs(ResourceExhausted("429"), details=[{"retryDelay": "12s"}]),
+     gc.RATE_LIMITED, 12.0),
+    ("429 message", ResourceExhausted("429 Please retry in 7.25s."), gc.RATE_LIMITED, 7.25),
+    ("429 no hint", ResourceExhausted("429 Resource has been exhausted"), gc.RATE_LIMITED, None),
+    ("429 http", http_error(429, {"Retry-After": "20"}), gc.RATE_LIMITED, 20.0),
+    ("503", ServiceUnavailable("503 The model is overloaded."), gc.OVERLOADED, None),
+    ("503 Retry-After", http_error(503, {"Retry-After": "5"}), gc.OVERLOADED, 5.0),
+    ("500 by name only", type("InternalServerError", (Exception,), {})("boom"), gc.OVERLOADED, None),
+    ("504", GatewayTimeout("504 Deadline"), gc.TIMEOUT, None),
+    ("asyncio timeout", asyncio.TimeoutError(), gc.TIMEOUT, None),
+    ("connection reset", ConnectionResetError("reset by peer"), gc.OVERLOADED, None),
+    ("400", InvalidArgument("400 API key not valid"), gc.FATAL, None),
+    ("400 http", http_error(400, {}), gc.FATAL, None),
+    # Bozuk cevap: kod string, details liste değil, başlık sayı değil
+    ("malformed status", with_attrs(Exception("weird"), code="503", details="oops",
+                                    response=types.SimpleNamespace(headers={"Retry-After": "soon"})),
+     gc.FATAL, None),
+    ("malformed details", with_attrs(ResourceExhausted("429"), details=[{"retryDelay": "later"}, object()]),
+     gc.RATE_LIMITED, None),
+    ("malformed output", gc.MalformedOutputError("no frontmatter"), gc.FATAL, None),
+]
+
+
+@pytest.mark.parametrize("exc, kind, retry_after", [case[1:] for case in CASES], ids=[case[0] for case in CASES])
+def test_classify_and_retry_after(exc, kind, retry_after):
+    policy = gc.RetryPolicy()
+    assert policy.classify(exc) == kind
+    assert policy.retry_after(exc) == retry_after
+
+
+def test_daily_quota_detected_from_quota_failure():
+    assert gc.RetryPolicy.daily_quota(ResourceExhausted("quota_id: GenerateRequestsPerDayPerProjectPerModel"))
+    assert not gc.RetryPolicy.daily_quota(ResourceExhausted("GenerateRequestsPerMinutePerProjectPerModel"))
+
+
+def test_backoff_is_capped_full_jitter():
+    policy = gc.RetryPolicy(base_delay=1.0, max_delay=8.0)
+    assert all(0 <= policy.backoff(attempt) <= 8.0 for attempt in range(20) for _ in range(20))
+
+
+def test_check_raises_when_wait_exceeds_deadline():
+    policy = gc.RetryPolicy()
+    policy.check(time.monotonic() + 60, wait=1)
+    with pytest.raises(gc.RetryDeadlineError):
+        policy.check(time.monotonic() + 1, wait=60)
+    with pytest.raises(gc.RetryDeadlineError):
+        policy.check(time.monotonic() - 1)
+
+
+def test_deadline_is_the_earlier_of_run_and_request():
+    policy = gc.RetryPolicy(request_deadline=100)
+    assert policy.deadline() == pytest.approx(time.monotonic() + 100, abs=1)
+    policy.start_run(10)
+    assert policy.deadline() == pytest.approx(time.monotonic() + 10, abs=1)
+
+
+# --- generate_with_retry ---
+
+class FakeModel:
+    def __init__(self, outcomes: list):
+        self.outcomes = outcomes
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if isinstance(outcome, Exception):
+            raise outcome
+        return types.SimpleNamespace(text=outcome, usage_metadata=None)
+
+
+@pytest.fixture
+def retry_env(tmp_path, monkeypatch):
+    model = FakeModel([])
+    monkeypatch.setattr(gc, "create_model", lambda api_key, config=None: model)
+    monkeypatch.setattr(gc, "RESPONSE_CACHE", gc.ResponseCache(tmp_path / "responses", 0, 0, enabled=False))
+    key_manager = gc.APIKeyManager(ledger_file=tmp_path / "key-usage.json", keys=["key-1", "key-2"])
+    return key_manager, model
+
+
+def run(key_manager, policy, **kwargs):
+    return asyncio.run(gc.generate_with_retry(key_manager, "prompt", use_cache=False, policy=policy, **kwargs))
+
+
+def test_retries_503_then_succeeds(retry_env):
+    key_manager, model = retry_env
+    model.outcomes = [with_attrs(ServiceUnavailable("503"), details=[retry_info(0)]), "done"]
+    assert run(key_manager, gc.RetryPolicy(max_attempts=3)) == "done"
+    assert model.calls == 2
+
+
+def test_fatal_error_is_not_retried(retry_env):
+    key_manager, model = retry_env
+    model.outcomes = [InvalidArgument("400 bad request")]
+    with pytest.raises(InvalidArgument):
+        run(key_manager, gc.RetryPolicy(max_attempts=5))
+    assert model.calls == 1
+
+
+def test_last_error_raised_when_attempts_run_out(retry_env):
+    key_manager, model = retry_env
+    model.outcomes = [asyncio.TimeoutError(), GatewayTimeout("504")]
+    with pytest.raises(GatewayTimeout):
+        run(key_manager, gc.RetryPolicy(max_attempts=2))
+
+
+def test_zero_attempts_raises_deadline_error(retry_env):
+    key_manager, model = retry_env
+    with pytest.raises(gc.RetryDeadlineError):
+        run(key_manager, gc.RetryPolicy(max_attempts=5), max_retries=0)
+    assert model.calls == 0
+
+
+def test_expired_run_deadline_raises_before_calling(retry_env, monkeypatch):
+    key_manager, model = retry_env
+    policy = gc.RetryPolicy()
+    policy.run_deadline = time.monotonic() - 1
+    with pytest.raises(gc.RetryDeadlineError):
+        run(key_manager, policy)
+    assert model.calls == 0
+
+
+def test_wait_past_deadline_gives_up_without_sleeping(retry_env):
+    key_manager, model = retry_env
+    model.outcomes = [with_attrs(ServiceUnavailable("503"), details=[retry_info(600)])]
+    policy = gc.RetryPolicy(request_deadline=30)
+    started = time.monotonic()
+    with pytest.raises(gc.RetryDeadlineError):
+        run(key_manager, policy)
+    assert time.monotonic() - started < 5
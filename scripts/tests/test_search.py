@@ -0,0 +1,27 @@
+"""Arama tokenizer'ı: search_terms ve src/lib/search.ts aynı fixture'a uymalı"""
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import generate_content as gc
+
+
+TESTS_DIR = Path(__file__).resolve().parent
+FIXTURE = json.loads((TESTS_DIR / "fixtures" / "search-tokenize.json").read_text(encoding='utf-8'))
+
+
+@pytest.mark.parametrize("case", FIXTURE["tokenize"], ids=lambda case: case["query"])
+def test_search_terms_matches_fixture(case):
+    assert gc.search_terms(case["query"]) == case["tokens"]
+
+
+def test_typescript_tokenizer_matches_fixture():
+    if not shutil.which("node") or not (gc.BASE_DIR / "node_modules" / "typescript").exists():
+        pytest.skip("node + typescript (npm install) gerekli")
+    result = subprocess.run(["node", str(TESTS_DIR / "check_search.cjs")], cwd=gc.BASE_DIR,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,117 @@
+"""Bölüm humanize: split_sections / protect_blocks / restore_blocks"""
+
+import asyncio
+
+import pytest
+
+import generate_content as gc
+
+
+DOC = '''---
+title: "Grab Bar Guide"
+description: "Where and how to mount grab bars."
+date: "2026-01-05"
+category: "bathroom-safety"
+tags: ["grab bars", "bathroom"]
+---
+
+Most falls happen in the bathroom, so that's where we start.
+
+## Why Grab Bars Matter
+
+Wet tile and low toilets are a bad combination.
+
+<Callout type="warning">
+Never mount a bar into drywall alone.
+</Callout>
+
+| Bar | Cost |
+| --- | --- |
+| 24" stainless | $45 |
+
+> Tip: check studs with a finder first.
+
+## Installation
+
+```bash
+## not a heading inside a fence
+
+drill --size 3/16
+```
+
+Mark the studs, then drill pilot holes.
+
+<ProductCard
+  name="Moen 24in"
+  price="$45"
+/>
+
+### Aftercare
+
+Tug each bar once a month.
+'''
+
+
+def humanize_identity(section: str) -> str:
+    """Modelin korunan metni aynen döndürdüğü durum"""
+    protected, blocks = gc.protect_blocks(section)
+    return gc.restore_blocks(protected.strip(), section, blocks)
+
+
+def test_split_sections_keeps_frontmatter_and_every_byte():
+    frontmatter, sections = gc.split_sections(DOC)
+    assert frontmatter.startswith("---\n") and frontmatter.rstrip().endswith("---")
+    assert [s.split("\n", 1)[0] for s in sections[1:]] == ["## Why Grab Bars Matter", "## Installation"]
+    assert frontmatter + "".join(sections) == DOC
+
+
+def test_fenced_heading_does_not_split():
+    _, sections = gc.split_sections(DOC)
+    assert "## not a heading inside a fence" in sections[-1]
+
+
+def test_protect_hides_components_tables_and_code():
+    _, sections = gc.split_sections(DOC)
+    protected, blocks = gc.protect_blocks(sections[2])
+    assert "```" not in protected and "<ProductCard" not in protected
+    assert gc.KEEP_RE.findall(protected) == [str(n) for n in range(len(blocks))]
+    assert any(block.startswith("```bash") for block in blocks)
+
+
+def test_round_trip_is_byte_for_byte():
+    frontmatter, sections = gc.split_sections(DOC)
+    assert frontmatter + "".join(humanize_identity(s) for s in sections) == DOC
+
+
+def test_round_trip_with_rewritten_prose():
+    frontmatter, sections = gc.split_sections(DOC)
+    protected, blocks = gc.protect_blocks(sections[1])
+    output = "Here is the rewritten section:\n\n" + protected.replace("bad combination", "recipe for trouble")
+    restored = gc.restore_blocks(output, sections[1], blocks)
+    assert restored == sections[1].replace("bad combination", "recipe for trouble")
+
+
+@pytest.mark.parametrize("damage", [
+    lambda text: text.replace("[[KEEP-1]]\n", ""),
+    lambda text: text.replace("[[KEEP-0]]", "[[KEEP-9]]"),
+    lambda text: text.replace("[[KEEP-0]]", "@@").replace("[[KEEP-1]]", "[[KEEP-0]]").replace("@@", "[[KEEP-1]]"),
+    lambda text: text.replace("## Why Grab Bars Matter", "## Why Grab Bars Are Important"),
+])
+def test_damaged_output_is_malformed(damage):
+    _, sections = gc.split_sections(DOC)
+    protected, blocks = gc.protect_blocks(sections[1])
+    with pytest.raises(gc.MalformedOutputError):
+        gc.restore_blocks(damage(protected), sections[1], blocks)
+
+
+def test_section_falls_back_to_draft_after_retries(monkeypatch):
+    calls = []
+
+    async def dropped_placeholder(key_manager, prompt, **kwargs):
+        calls.append(prompt)
+        return prompt.split("\n\n---\n\n", 1)[1].replace("[[KEEP-0]]\n", "")
+
+    monkeypatch.setattr(gc, "generate_with_retry", dropped_placeholder)
+    _, sections = gc.split_sections(DOC)
+    assert asyncio.run(gc.humanize_section(None, sections[1])) == sections[1]
+    assert len(calls) == gc.SECTION_RETRIES + 1
@@ -0,0 +1,104 @@
+"""Konu tekrarı: shingle, MinHash imzası ve LSH eşiği"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import generate_content as gc
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b)
+
+
+def topic(slug: str, title: str, keywords=()) -> dict:
+    return {"slug": slug, "title": title, "keywords": list(keywords)}
+
+
+def test_shingles_drop_stopwords_and_plurals():
+    assert gc.similarity_shingles("The Best Grab Bars for Seniors in 2025") == {"grab", "bar", "grab bar"}
+
+
+def test_shingles_keep_double_s_and_short_words():
+    assert gc.similarity_tokens("Glass Walk-In Shower vs Tub") == ["glass", "walk", "shower", "tub"]
+
+
+def test_shingles_include_bigrams_in_order():
+    shingles = gc.similarity_shingles("stair lift rental")
+    assert {"stair lift", "lift rental"} <= shingles
+    assert "stair rental" not in shingles
+
+
+def test_signature_is_deterministic_in_process():
+    shingles = gc.similarity_shingles("walk in tub installation cost")
+    assert gc.minhash_signature(shingles) == gc.minhash_signature(set(sorted(shingles)))
+    assert len(gc.minhash_signature(shingles)) == gc.MINHASH_PERMS
+
+
+def test_signature_and_bands_are_stable_across_hash_seeds():
+    """İmzalar diske yazılıyor: PYTHONHASHSEED'e bağlı olmamalı"""
+    script = (
+        "import json, generate_content as gc;"
+        "sig = gc.minhash_signature(gc.similarity_shingles('smart smoke detector for hearing loss'));"
+        "print(json.dumps([sig, gc.SimilarityIndex('x')._band_keys(sig)]))"
+    )
+    outputs = []
+    for seed in ("1", "2"):
+        env = {**os.environ, "PYTHONHASHSEED": seed}
+        result = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(gc.__file__),
+                                env=env, capture_output=True, text=True, check=True)
+        outputs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    assert outputs[0] == outputs[1]
+    assert outputs[0][0] == gc.minhash_signature(gc.similarity_shingles("smart smoke detector for hearing loss"))
+
+
+def test_signature_similarity_estimates_jaccard():
+    a = gc.similarity_shingles("bathroom grab bar height placement stud mounting")
+    b = gc.similarity_shingles("bathroom grab bar height placement drywall anchor")
+    estimate = gc.signature_similarity(gc.minhash_signature(a), gc.minhash_signature(b))
+    assert abs(estimate - jaccard(a, b)) < 0.2
+
+
+@pytest.mark.parametrize("title, keywords", [
+    ("Best Grab Bars for Bathroom Safety", ["grab bars", "bathroom safety"]),
+    ("Bathroom Grab Bars: The Complete Safety Guide", ["grab bar", "bathroom safety"]),
+    ("Grab Bars for Bathroom Safety in 2026", ["bathroom grab bars"]),
+])
+def test_near_duplicate_titles_pass_threshold(tmp_path, title, keywords):
+    index = gc.SimilarityIndex(tmp_path / "index.json")
+    index.add_topic(topic("grab-bars", "Grab Bars for Bathroom Safety", ["grab bars", "bathroom safety"]))
+    matches = index.find_duplicates(topic("candidate", title, keywords))
+    assert [doc_id for _, doc_id, _ in matches] == ["topic:grab-bars"]
+    assert matches[0][0] >= gc.DUPLICATE_THRESHOLD
+
+
+@pytest.mark.parametrize("title, keywords", [
+    ("Stairlift Costs and Financing Options", ["stairlift cost", "medicare"]),
+    ("Smart Smoke Detectors for Hearing Loss", ["smoke detector", "strobe alarm"]),
+    ("Lever Door Handles for Arthritis", ["lever handles", "arthritis"]),
+])
+def test_distinct_titles_stay_below_threshold(tmp_path, title, keywords):
+    index = gc.SimilarityIndex(tmp_path / "index.json")
+    index.add_topic(topic("grab-bars", "Grab Bars for Bathroom Safety", ["grab bars", "bathroom safety"]))
+    assert index.find_duplicates(topic("candidate", title, keywords)) == []
+
+
+def test_topic_is_not_its_own_duplicate(tmp_path):
+    index = gc.SimilarityIndex(tmp_path / "index.json")
+    grab = topic("grab-bars", "Grab Bars for Bathroom Safety", ["grab bars"])
+    index.add_topic(grab)
+    assert index.find_duplicates(grab) == []
+
+
+def test_saved_index_finds_the_same_candidates(tmp_path):
+    index = gc.SimilarityIndex(tmp_path / "index.json")
+    index.add_topic(topic("grab-bars", "Grab Bars for Bathroom Safety", ["grab bars", "bathroom safety"]))
+    index.add_topic(topic("stairlifts", "Stairlift Costs and Financing", ["stairlift"]))
+    index.save()
+    loaded = gc.SimilarityIndex.load(tmp_path / "index.json")
+    candidate = topic("candidate", "Bathroom Grab Bars Safety", ["grab bars"])
+    assert loaded.find_duplicates(candidate) == index.find_duplicates(candidate)
+    assert loaded.buckets == index.buckets
@@ -0,0 +1,102 @@
+"""ContentStore: JSON import/export ve content/posts senkronu"""
+
+import json
+
+import generate_content as gc
+
+
+def post(title: str, category: str, tags: list, date: str = "2026-01-05") -> str:
+    return (f'---\ntitle: "{title}"\ndescription: "x"\ndate: "{date}"\ncategory: "{category}"\n'
+            f'tags: {json.dumps(tags)}\n---\n\nBody.\n')
+
+
+HISTORY = {
+    "publishedSlugs": ["grab-bars", "stairlift-costs"],
+    "publishedTitles": ["Grab Bars for Bathroom Safety", "Stairlift Costs Explained", "An Old Title Without A Post"],
+    "publishedKeywords": ["grab bars", "bathroom safety", "stairlift cost", "Grab Bars", "orphan keyword"],
+    "lastCategory": "mobility",
+    "totalPosts": 2,
+    "lastPublishDate": "2026-02-01T09:00:00",
+    "categoryRotation": 7,
+}
+
+TOPICS = {
+    "topics": [
+        {"title": "Stairlift Costs Explained", "slug": "stairlift-costs", "category": "mobility",
+         "keywords": ["stairlift cost"], "status": "published", "publishedAt": "2026-02-01T09:00:00"},
+        {"title": "Lever Door Handles", "slug": "lever-handles", "category": "home-modifications",
+         "keywords": ["lever handles"], "status": "pending"},
+    ],
+    "future_topics": [{"title": "Later"}],
+}
+
+
+def write_sources(root):
+    (gc.CONTENT_DIR / "grab-bars.mdx").write_text(
+        post("Grab Bars for Bathroom Safety", "bathroom-safety", ["grab bars", "bathroom safety"]), encoding='utf-8')
+    (gc.CONTENT_DIR / "stairlift-costs.mdx").write_text(
+        post("Stairlift Costs Explained", "mobility", ["stairlift cost"]), encoding='utf-8')
+    gc.write_json_atomic(gc.HISTORY_FILE, HISTORY)
+    gc.write_json_atomic(gc.TOPICS_FILE, TOPICS)
+
+
+def test_import_export_round_trip(gc_paths):
+    write_sources(gc_paths)
+    store = gc.ContentStore()
+    try:
+        history = store.export_history()
+        # Tek fark: büyük/küçük harf tekrarı olan keyword bir kez tutulur
+        assert history == {**HISTORY, "publishedKeywords": ["grab bars", "bathroom safety",
+                                                            "stairlift cost", "orphan keyword"]}
+        assert store.export_topics() == TOPICS
+        assert store.slugs_for_keyword("grab bars") == ["grab-bars"]
+        assert store.has_title("an old title without a post")
+        assert [t["slug"] for t in store.pending_topics()] == ["lever-handles"]
+
+        store.export_json()
+        written = gc.HISTORY_FILE.read_bytes(), gc.TOPICS_FILE.read_bytes()
+    finally:
+        store.close()
+
+    # Export edilen JSON'dan kurulan store aynı JSON'u üretir (byte byte)
+    gc.CONTENT_DB_FILE.unlink()
+    store = gc.ContentStore()
+    try:
+        assert store.export_history()["publishedKeywords"] == ["grab bars", "bathroom safety",
+                                                                "stairlift cost", "orphan keyword"]
+        store.export_json()
+        assert (gc.HISTORY_FILE.read_bytes(), gc.TOPICS_FILE.read_bytes()) == written
+    finally:
+        store.close()
+
+
+def test_reimport_when_json_changes(gc_paths):
+    write_sources(gc_paths)
+    gc.ContentStore().close()
+
+    topics = json.loads(gc.TOPICS_FILE.read_text(encoding='utf-8'))
+    topics["topics"][1]["status"] = "published"
+    gc.write_json_atomic(gc.TOPICS_FILE, topics)
+    store = gc.ContentStore()
+    try:
+        assert store.pending_topics() == []
+    finally:
+        store.close()
+
+
+def test_sync_posts_records_title_and_tags(gc_paths):
+    write_sources(gc_paths)
+    store = gc.ContentStore()
+    try:
+        (gc.CONTENT_DIR / "walk-in-tubs.mdx").write_text(
+            post("Walk-In Tubs: Costs and Options", "bathroom-safety", ["walk-in tub", "Tub Cost"]),
+            encoding='utf-8')
+        assert store.sync_posts() == 1
+        assert store.sync_posts() == 0
+        assert store.is_published("walk-in-tubs")
+        assert store.has_title("walk-in tubs: costs and options")
+        assert store.slugs_for_keyword("tub cost") == ["walk-in-tubs"]
+        assert "walk-in-tubs" in store.slugs_in_category("bathroom-safety")
+        assert store.export_history()["publishedTitles"][-1] == "Walk-In Tubs: Costs and Options"
+    finally:
+        store.close()
@@ -1,23 +1,116 @@
+import fs from 'fs'
+import path from 'path'
 import { NextResponse } from 'next/server'
 import { getAllPosts } from '@/lib/mdx'
+import { prefixTerms, tokenize } from '@/lib/search'
 
-export async function GET() {
+// Built by scripts/generate_content.py (update_search_index); read at request time,
+// bundled via outputFileTracingIncludes in next.config.mjs
+const indexDirectory = path.join(process.cwd(), 'content/search')
+
+// BM25 parameters
+const K1 = 1.2
+const B = 0.75
+const MAX_RESULTS = 20
+// A prefix match ("bath" -> "bathroom") scores this fraction of an exact match
+const PREFIX_WEIGHT = 0.5
+
+interface SearchResult {
+  slug: string
+  title: string
+  description: string
+  category: string
+  date: string
+  tags: string[]
+}
+
+interface IndexMeta {
+  version: number
+  totalLength: number
+  docs: Record<string, SearchResult & { length: number }>
+}
+
+type Shard = Record<string, [number, number][]>
+
+function readJson<T>(file: string): T | null {
   try {
+    return JSON.parse(fs.readFileSync(file, 'utf8'))
+  } catch {
+    return null
+  }
+}
+
+// Score with BM25, loading only the shards of the query terms; terms in the same
+// shard that extend a query term count as weaker matches
+function searchIndex(meta: IndexMeta, query: string): SearchResult[] {
+  const docCount = Object.keys(meta.docs).length
+  const avgLength = meta.totalLength / Math.max(docCount, 1)
+  const shards = new Map<string, Shard>()
+  const scores = new Map<number, number>()
+
+  for (const term of Array.from(new Set(tokenize(query)))) {
+    const prefix = term[0]
+    if (!shards.has(prefix)) {
+      shards.set(prefix, readJson<Shard>(path.join(indexDirectory, `${prefix}.json`)) || {})
+    }
+    const shard = shards.get(prefix)!
+    const matches: [string, number][] = [[term, 1]]
+    for (const extended of prefixTerms(term, shard)) {
+      matches.push([extended, PREFIX_WEIGHT])
+    }
+
+    for (const [matched, weight] of matches) {
+      const postings = shard[matched] || []
+      const idf = Math.log(1 + (docCount - postings.length + 0.5) / (postings.length + 0.5))
+
+      for (const [id, tf] of postings) {
+        const norm = tf + K1 * (1 - B + (B * meta.docs[id].length) / avgLength)
+        scores.set(id, (scores.get(id) || 0) + (weight * idf * tf * (K1 + 1)) / norm)
+      }
+    }
+  }
+
+  return Array.from(scores.entries())
+    .sort((a, b) => b[1] - a[1])
+    .slice(0, MAX_RESULTS)
+    .map(([id]) => {
+      const { slug, title, description, category, date, tags } = meta.docs[id]
+      return { slug, title, description, category, date, tags }
+    })
+}
+
+export async function GET(request: Request) {
+  const query = new URL(request.url).searchParams.get('q')?.trim() || ''
+
+  try {
+    const meta = readJson<IndexMeta>(path.join(indexDirectory, 'meta.json'))
+    if (meta?.version === 1) {
+      return NextResponse.json({
+        total: Object.keys(meta.docs).length,
+        results: query ? searchIndex(meta, query) : [],
+      })
+    }
+
+    // No prebuilt index yet - filter post metadata on the server
     const posts = await getAllPosts()
-    
-    // Return minimal data for search
-    const searchData = posts.map(post => ({
-      slug: post.slug,
-      title: post.title,
-      description: post.description,
-      category: post.category,
-      date: post.date,
-      tags: post.tags || [],
-    }))
-    
-    return NextResponse.json(searchData)
+    const searchTerms = query.toLowerCase().split(' ').filter(Boolean)
+    const results = searchTerms.length === 0 ? [] : posts
+      .filter(post => {
+        const searchText = `${post.title} ${post.description} ${post.category} ${(post.tags || []).join(' ')}`.toLowerCase()
+        return searchTerms.every(term => searchText.includes(term))
+      })
+      .map(post => ({
+        slug: post.slug,
+        title: post.title,
+        description: post.description,
+        category: post.category,
+        date: post.date,
+        tags: post.tags || [],
+      }))
+
+    return NextResponse.json({ total: posts.length, results })
   } catch (error) {
     console.error('Search API error:', error)
-    return NextResponse.json([], { status: 500 })
+    return NextResponse.json({ total: 0, results: [] }, { status: 500 })
   }
 }
@@ -14,19 +14,19 @@ interface SearchResult {
 
 export default function SearchPage() {
   const [query, setQuery] = useState('')
-  const [allPosts, setAllPosts] = useState<SearchResult[]>([])
+  const [totalPosts, setTotalPosts] = useState(0)
   const [results, setResults] = useState<SearchResult[]>([])
   const [isSearching, setIsSearching] = useState(false)
   const [isLoading, setIsLoading] = useState(true)
 
-  // Fetch all posts on mount
+  // Fetch post count on mount
   useEffect(() => {
-    async function fetchPosts() {
+    async function fetchTotal() {
       try {
         const res = await fetch('/api/search')
         if (res.ok) {
           const data = await res.json()
-          setAllPosts(data)
+          setTotalPosts(data.total)
         }
       } catch (error) {
         console.error('Failed to fetch posts:', error)
@@ -34,10 +34,10 @@ export default function SearchPage() {
         setIsLoading(false)
       }
     }
-    fetchPosts()
+    fetchTotal()
   }, [])
 
-  // Debounced search
+  // Debounced search (ranked on the server from the prebuilt index)
   useEffect(() => {
     if (!query.trim()) {
       setResults([])
@@ -45,18 +45,28 @@ export default function SearchPage() {
     }
 
     setIsSearching(true)
-    const timer = setTimeout(() => {
-      const searchTerms = query.toLowerCase().split(' ')
-      const filtered = allPosts.filter(post => {
-        const searchText = `${post.title} ${post.description} ${post.category} ${(post.tags || []).join(' ')}`.toLowerCase()
-        return searchTerms.every(term => searchText.includes(term))
-      })
-      setResults(filtered)
-      setIsSearching(false)
+    const controller = new AbortController()
+    const timer = setTimeout(async () => {
+      try {
+        const res = await fetch(`/api/search?q=${encodeURIComponent(query)}`, { signal: controller.signal })
+        if (res.ok) {
+          const data = await res.json()
+          setResults(data.results)
+        }
+        setIsSearching(false)
+      } catch (error) {
+        if (!controller.signal.aborted) {
+          console.error('Search failed:', error)
+          setIsSearching(false)
+        }
+      }
     }, 300)
 
-    return () => clearTimeout(timer)
-  }, [query, allPosts])
+    return () => {
+      clearTimeout(timer)
+      controller.abort()
+    }
+  }, [query])
 
   // Suggested searches
   const suggestions = useMemo(() => [
@@ -98,7 +108,7 @@ export default function SearchPage() {
                 type="text"
                 value={query}
                 onChange={(e) => setQuery(e.target.value)}
-                placeholder={`Search ${allPosts.length} guides...`}
+                placeholder={`Search ${totalPosts} guides...`}
                 className="w-full pl-12 pr-4 py-4 text-lg border-2 border-slate-200 dark:border-slate-700 rounded-xl bg-white dark:bg-slate-800 text-slate-800 dark:text-white placeholder-slate-400 focus:outline-none focus:border-primary-500 dark:focus:border-primary-400 transition-colors"
                 autoFocus
               />
@@ -179,7 +189,7 @@ export default function SearchPage() {
                   Find What You Need
                 </h2>
                 <p className="text-slate-500 dark:text-slate-400 max-w-md mx-auto">
-                  Search our {allPosts.length} comprehensive guides on aging-in-place technology, home modifications, and senior safety solutions.
+                  Search our {totalPosts} comprehensive guides on aging-in-place technology, home modifications, and senior safety solutions.
                 </p>
               </div>
             )}
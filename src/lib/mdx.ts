@@ -4,6 +4,9 @@ import matter from 'gray-matter'
 import readingTime from 'reading-time'
 
 const postsDirectory = path.join(process.cwd(), 'content/posts')
+// Written by scripts/generate_content.py (--manifest / after each saved post)
+const manifestPath = path.join(process.cwd(), 'content/manifest.json')
+const MANIFEST_VERSION = 3
 
 export interface PostMeta {
   slug: string
@@ -22,6 +25,43 @@ export interface Post extends PostMeta {
   content: string
 }
 
+interface ManifestEntry extends Omit<PostMeta, 'slug' | 'date'> {
+  date: string | null
+  wordCount: number
+  size: number
+  hash: string
+}
+
+// Load the post manifest, or null if it is missing/unreadable
+function loadManifest(): Record<string, ManifestEntry> | null {
+  try {
+    const manifest = JSON.parse(fs.readFileSync(manifestPath, 'utf8'))
+    return manifest.version === MANIFEST_VERSION ? manifest.posts : null
+  } catch {
+    return null
+  }
+}
+
+// Parse a post file's frontmatter (fallback when the manifest is missing or stale)
+function readPostMeta(slug: string, fullPath: string): PostMeta {
+  const fileContents = fs.readFileSync(fullPath, 'utf8')
+  const { data, content } = matter(fileContents)
+  const stats = readingTime(content)
+
+  return {
+    slug,
+    title: data.title || 'Untitled',
+    description: data.description || '',
+    date: data.date || new Date().toISOString().split('T')[0],
+    category: data.category || 'general',
+    image: data.image || null,
+    author: data.author || 'RetrofitAge Team',
+    readingTime: stats.text,
+    tags: data.tags || [],
+    featured: data.featured || false,
+  } as PostMeta
+}
+
 // Get all posts sorted by date
 export async function getAllPosts(): Promise<PostMeta[]> {
   // Check if directory exists
@@ -30,27 +70,31 @@ export async function getAllPosts(): Promise<PostMeta[]> {
     return []
   }
 
+  const manifest = loadManifest()
   const fileNames = fs.readdirSync(postsDirectory)
   const allPosts = fileNames
     .filter((name) => name.endsWith('.mdx') || name.endsWith('.md'))
     .map((fileName) => {
       const slug = fileName.replace(/\.mdx?$/, '')
       const fullPath = path.join(postsDirectory, fileName)
-      const fileContents = fs.readFileSync(fullPath, 'utf8')
-      const { data, content } = matter(fileContents)
-      const stats = readingTime(content)
+      const entry = fileName.endsWith('.mdx') ? manifest?.[slug] : undefined
+
+      // Trust the manifest on a stat alone; only unlisted/resized files are read
+      if (!entry || fs.statSync(fullPath).size !== entry.size) {
+        return readPostMeta(slug, fullPath)
+      }
 
       return {
         slug,
-        title: data.title || 'Untitled',
-        description: data.description || '',
-        date: data.date || new Date().toISOString().split('T')[0],
-        category: data.category || 'general',
-        image: data.image || null,
-        author: data.author || 'RetrofitAge Team',
-        readingTime: stats.text,
-        tags: data.tags || [],
-        featured: data.featured || false,
+        title: entry.title,
+        description: entry.description,
+        date: entry.date || new Date().toISOString().split('T')[0],
+        category: entry.category,
+        image: entry.image || null,
+        author: entry.author,
+        readingTime: entry.readingTime,
+        tags: entry.tags,
+        featured: entry.featured,
       } as PostMeta
     })
 
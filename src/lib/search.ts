@@ -0,0 +1,38 @@
+// Query/term helpers for /api/search. Kept free of Next.js imports so
+// scripts/tests/check_search.cjs can run them against the shared fixture.
+
+const STOPWORDS = new Set(
+  `a an and are as at be by can do for from has have how if in into is it its of on or
+  our that the their them they this to was what when which who why will with you your`.split(/\s+/)
+)
+
+// Prefix matching: shortest query term expanded, and at most this many expansions
+export const MIN_PREFIX_LENGTH = 3
+export const MAX_PREFIX_TERMS = 10
+
+// Must match search_terms() in scripts/generate_content.py
+// (checked by both against scripts/tests/fixtures/search-tokenize.json)
+export function tokenize(text: string): string[] {
+  const terms: string[] = []
+  for (let token of text.toLowerCase().match(/[a-z0-9]+/g) || []) {
+    if (token.length > 3 && token.endsWith('s') && !token.endsWith('ss')) {
+      token = token.slice(0, -1)
+    }
+    if (token.length > 1 && !STOPWORDS.has(token)) {
+      terms.push(token)
+    }
+  }
+  return terms
+}
+
+// Indexed terms of a first-letter shard that extend `term` ("bath" -> "bathroom"),
+// most frequent first; the exact term itself is not included
+export function prefixTerms(term: string, shard: Record<string, unknown[]>): string[] {
+  if (term.length < MIN_PREFIX_LENGTH) {
+    return []
+  }
+  return Object.keys(shard)
+    .filter((candidate) => candidate !== term && candidate.startsWith(term))
+    .sort((a, b) => shard[b].length - shard[a].length || (a < b ? -1 : 1))
+    .slice(0, MAX_PREFIX_TERMS)
+}